@@ -9,14 +9,22 @@ Integra todos os componentes do modo autônomo:
 - Segmentador
 - Controlador
 - Identificador
+
+A classe :class:`AutoConcorrente` executa as mesmas etapas em uma thread própria, com a segmentação e a
+identificação em paralelo, e sempre processa a imagem mais recente.
 """
 
 
 from interface.modulos.TLSstream import TLSclient
 from interface.modulos.interface import Interface
+from interface.modulos.instrumentacao import Instrumentacao
+from interface.modulos.log import LogFile
 from segmentacao.modulos.interpretador import Segmentador
 from controlador.modulos.controlador import Controlador
 from identificacao.modulos.identificador import Identificador
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import perf_counter_ns
+import threading
 import cv2 as cv
 import numpy as np
 
@@ -32,11 +40,16 @@ class Auto():
     segmentador de imagens, o controlador e o path do modelo do haar cascade usado para identificar o lixo.
 
     Para processar uma imagem (modo autônomo), use o método :func:`processa_imagem()`.
+
+    O tempo de cada etapa do processamento é medido pela
+    :class:`~codigo.interface.modulos.instrumentacao.Instrumentacao` retornada por
+    :meth:`retorna_instrumentacao()`. As etapas internas do segmentador, do identificador e do controlador
+    são registradas com os prefixos "segmentacao.", "identificacao." e "controlador.".
     """
 
     def __init__(
             self, interface: Interface, enviador : TLSclient, segmentador : Segmentador
-            , ctrl : Controlador, path_haar : str = None
+            , ctrl : Controlador, path_haar : str = None, instrumentacao : Instrumentacao = None
             ):
         """Inicialização da classe.
 
@@ -65,6 +78,10 @@ class Auto():
 
         path_haar : str, default None
             O path do modelo do Haar Cascade usado para identificar o lixo.
+
+        instrumentacao : Instrumentacao, default None
+            Instrumentação onde são registrados os tempos das etapas do processamento. Geralmente é a da
+            interface (ver :meth:`Interface.retorna_instrumentacao()`). Se None, é criada uma nova.
         """
         self._interface = interface
         self._enviador = enviador
@@ -77,9 +94,31 @@ class Auto():
         else:
             self._ident_lixo = None
 
-        # Imagens inicias
-        self._BGR = None
-        self._RGB = None
+        # Impede que duas imagens sejam processadas ao mesmo tempo (ver :meth:`processa_imagem()`)
+        self._processando = threading.Lock()
+
+        # Medição do tempo das etapas
+        if instrumentacao is None:
+            instrumentacao = Instrumentacao()
+
+        self._instrumentacao = instrumentacao
+        self._etapa_conversao_cor = instrumentacao.etapa("conversao_cor_auto")
+        self._etapa_segmentacao = instrumentacao.etapa("segmentacao")
+        self._etapa_identificacao = instrumentacao.etapa("identificacao")
+        self._etapa_controlador = instrumentacao.etapa("controlador")
+        self._etapa_envio = instrumentacao.etapa("envio")
+        self._etapa_apresentacao = instrumentacao.etapa("apresentacao")
+        self._etapa_frame = instrumentacao.etapa("frame")
+
+    def retorna_instrumentacao(self):
+        """Retorna a instrumentação onde são registrados os tempos das etapas do processamento.
+
+        Returns
+        -------
+        Instrumentacao
+            Instrumentação do modo autônomo.
+        """
+        return self._instrumentacao
 
     def _envia_texto(self, texto: str):
         """Envia um texto para o Wall-e.
@@ -108,6 +147,10 @@ class Auto():
         OpenCV já usa esse formato por padrão. A princípio, dever do tipo RGB. Más é possível que seja do
         tipo BGR, contanto que o parâmetro *BGR* seja definido como True.
 
+        As etapas são executadas em sequência, na thread que chamou o método. Se o processamento de uma imagem
+        ainda não terminou (chamada por outra thread), a imagem recebida é descartada. Para processar as
+        etapas em paralelo, use a classe :class:`AutoConcorrente`.
+
         Parameters
         ----------
         imagem : numpy.ndarray
@@ -120,61 +163,444 @@ class Auto():
             Se a imagem de debug deve ser exibida na interface. Caso seja false, exibe a imagem normal.
         """
         # Apenas processa a imagem se a anterior já finalizou
-        if self._BGR is None:
-            self._BGR = imagem
-        else:
+        if not self._processando.acquire(blocking=False):
             return
 
-        # Conversão de formato de imagens. Deve ser fornecido ela tanto em BGR, quanto em RGB,
-        if BGR:
-            self._RGB = cv.cvtColor(imagem, cv.COLOR_BGR2RGB)
-            self._BGR = imagem
-        else:
-            self._BGR = cv.cvtColor(imagem, cv.COLOR_RGB2BGR)
-            self._RGB = imagem
+        try:
+            inicio = perf_counter_ns()
 
-        # Segmentação
-        img_debug = self._segmentador.retorna_imagem_segmentada(self._RGB, redimensiona=True)
-        mascara = self._segmentador.retorna_mascara(None, redimensiona=True)
+            RGB, BGR = self._converte_cores(imagem, BGR)
+            mascara, img_debug = self._segmenta(RGB, debug)
+            posicao = self._identifica(BGR)
 
-        if debug:
-            # A imagem retornada pelo segmentador possui formato BGR, mas as demais operações
-            # devem ser feitas com imagens no formato BGR. Esse processamento não faz sentido
-            # no caso de *debug* ser False, já que a imagem não será usada.
-            img_debug = cv.cvtColor(img_debug, cv.COLOR_RGB2BGR)
+            if debug:
+                self._desenha_identificacao(img_debug)
+
+            self._controla(mascara, posicao, RGB, img_debug, debug)
+            self._etapa_frame.registra(perf_counter_ns() - inicio)
+
+        # Permite que o próximo frame seja processado
+        finally:
+            self._processando.release()
+
+    def _converte_cores(self, imagem, BGR):
+        """Retorna a imagem nos formatos RGB e BGR.
+
+        Parameters
+        ----------
+        imagem : numpy.ndarray
+            A imagem recebida.
+
+        BGR : bool
+            Se a imagem está no formato BGR.
+
+        Returns
+        -------
+        numpy.ndarray
+            Imagem no formato RGB.
+
+        numpy.ndarray
+            Imagem no formato BGR.
+        """
+        with self._etapa_conversao_cor:
+            if BGR:
+                return cv.cvtColor(imagem, cv.COLOR_BGR2RGB), imagem
+
+            else:
+                return imagem, cv.cvtColor(imagem, cv.COLOR_RGB2BGR)
+
+    def _segmenta(self, RGB, debug):
+        """Segmenta a imagem.
+
+        Parameters
+        ----------
+        RGB : numpy.ndarray
+            Imagem no formato RGB.
+
+        debug : bool
+            Se a imagem com a segmentação deve ser retornada.
+
+        Returns
+        -------
+        numpy.ndarray
+            Máscara de objetos colidíveis (uint8).
+
+        numpy.ndarray or None
+            Imagem com a segmentação (BGR). Se *debug* for False, retorna None.
+        """
+        with self._etapa_segmentacao:
+            # Cópia da máscara, que é sobrescrita pelo segmentador na próxima segmentação
+            mascara = np.array(self._segmentador.retorna_mascara(RGB, redimensiona=True), dtype=np.uint8)
+
+            # A imagem com a segmentação só é usada no debug. Sem debug, o identificador e o controlador não
+            # recebem uma imagem de debug e não criam nenhuma (os desenhos só são feitos quando pedidos).
+            img_debug = None
+            if debug:
+                # A imagem retornada pelo segmentador possui formato RGB, mas as demais operações
+                # devem ser feitas com imagens no formato BGR.
+                img_debug = self._segmentador.retorna_imagem_segmentada(None, redimensiona=True)
+                img_debug = cv.cvtColor(img_debug, cv.COLOR_RGB2BGR)
+
+        self._instrumentacao.registra_tempos(self._segmentador.retorna_tempos(), "segmentacao.")
+
+        return mascara, img_debug
+
+    def _identifica(self, BGR):
+        """Identifica o lixo mais próximo.
+
+        Parameters
+        ----------
+        BGR : numpy.ndarray
+            Imagem no formato BGR.
+
+        Returns
+        -------
+        tuple or None
+            Posição do lixo mais próximo na notação do controlador (cy, cx, l, a). Se não houver
+            identificador ou lixo, retorna None.
+        """
+        if self._ident_lixo is None:
+            return None
 
-        # Identificação do lixo
-        posicao = None
+        with self._etapa_identificacao:
+            self._ident_lixo.define_frame(BGR)
+            posicao = self._ident_lixo.identifica_lixo_mais_proximo(None)
+
+        self._instrumentacao.registra_tempos(self._ident_lixo.retorna_tempos(), "identificacao.")
+
+        # Troca o eixo x e y no ponto. O identificador de lixo e o controlador usam notações diferentes de pontos.
+        if posicao is not None:
+            x, y, l, a, cx, cy = posicao
+            posicao = (cy, cx, l, a)
+
+        return posicao
+
+    def _desenha_identificacao(self, img_debug):
+        """Desenha a identificação do último frame na imagem de debug.
+
+        A identificação não é refeita, apenas desenhada. Por isso, pode ser feita após a segmentação, mesmo
+        que a identificação tenha sido executada em paralelo a ela.
+
+        Parameters
+        ----------
+        img_debug : numpy.ndarray
+            Imagem de debug (BGR). É alterada.
+        """
         if self._ident_lixo is not None:
-            self._ident_lixo.define_frame(self._BGR, img_debug)
-            posicao = self._ident_lixo.identifica_lixo_mais_proximo(None, debug=debug)
+            self._ident_lixo.define_frame(None, img_debug)
+            self._ident_lixo.identifica_lixo_mais_proximo(None, debug=True)
 
-            # Troca o eixo x e y no ponto. O identificador de lixo e o controlador usam notações diferentes de pontos.
-            if posicao is not None:
-                x, y, l, a, cx, cy = posicao
-                posicao = (cy, cx, l, a)
+    def _controla(self, mascara, posicao, RGB, img_debug, debug):
+        """Aplica o controlador, envia o comando ao Wall-e e apresenta o frame na interface.
 
-        # Controlador
-        mascara = np.uint8(mascara)
-        self._ctrl.define_mapa(mascara, img_debug)
-        self._ctrl.mostra_colisoes(None, debug=debug)
-        linear, angular, sinalizacao = self._ctrl.calcula_direcao(None, posicao, debug=debug)
+        Parameters
+        ----------
+        mascara : numpy.ndarray
+            Máscara de objetos colidíveis.
+
+        posicao : tuple or None
+            Posição do lixo mais próximo na notação do controlador.
+
+        RGB : numpy.ndarray
+            Imagem no formato RGB. É apresentada na interface se *debug* for False.
+
+        img_debug : numpy.ndarray or None
+            Imagem de debug (BGR).
+
+        debug : bool
+            Se a imagem de debug deve ser exibida na interface.
+        """
+        with self._etapa_controlador:
+            self._ctrl.define_mapa(mascara, img_debug)
+            self._ctrl.mostra_colisoes(None, debug=debug)
+            linear, angular, sinalizacao = self._ctrl.calcula_direcao(None, posicao, debug=debug)
+
+        self._instrumentacao.registra_tempos(self._ctrl.retorna_tempos(), "controlador.")
 
         # Caso a sinalização esteja ativa, avisa para o Wall-e sinalizar o lixo. Caso contrário,
         # envia a velocidade linear e angular para o Wall-e.
-        if sinalizacao:
-            self._envia_texto("lixo")
-        else:
-            self._envia_texto(f"{linear},{angular}")
+        with self._etapa_envio:
+            if sinalizacao:
+                self._envia_texto("lixo")
+            else:
+                self._envia_texto(f"{linear},{angular}")
 
         # Apresentação na interface
+        with self._etapa_apresentacao:
+            if debug:
+                img_debug = cv.cvtColor(self._ctrl.retorna_imagem_debug(), cv.COLOR_BGR2RGB)
+                self._interface.atualiza_frame(img_debug)
+
+            else:
+                self._interface.atualiza_frame(RGB)
+
+
+class AutoConcorrente(Auto):
+    """Modo autônomo com as etapas executadas em paralelo.
+
+    Possui a mesma interface da classe :class:`Auto`, mas o método :meth:`processa_imagem()` não processa a
+    imagem: apenas a guarda e retorna imediatamente. As imagens são processadas por uma thread própria, sempre
+    a mais recente recebida. As imagens recebidas enquanto outra aguarda o processamento são descartadas (ver
+    :meth:`retorna_contadores()`).
+
+    O processamento é dividido em dois estágios, executados como uma linha de montagem:
+
+    1. Segmentação e identificação do lixo, em paralelo, em duas threads de trabalho. A inferência do
+       Tensorflow Lite e a classificação do Haar Cascade liberam o GIL, então são executadas ao mesmo tempo.
+    2. Controlador, envio do comando e apresentação na interface, na thread do modo autônomo.
+
+    O estágio 2 de uma imagem é executado enquanto o estágio 1 da imagem seguinte está em andamento. Assim,
+    o tempo por imagem é aproximadamente o maior entre os tempos da segmentação, da identificação e do
+    controlador, e não a soma deles. O segmentador e o identificador só são usados pelas threads do estágio 1,
+    e o controlador só pela thread do modo autônomo.
+
+    No modo de debug, a identificação é desenhada na imagem da segmentação. O desenho espera a segmentação
+    terminar, mas a classificação do Haar Cascade não.
+
+    Se o processamento de uma imagem falhar (por exemplo, por uma exceção do segmentador), o erro é registrado
+    no log e a imagem é contada como descartada. A thread continua processando as imagens seguintes.
+
+    A thread é iniciada na instanciação. Para finalizá-la, use o método :meth:`finaliza()`.
+
+    >>> auto = AutoConcorrente(interface, enviador, segmentador, ctrl, PATH_HAAR)
+    >>> auto.processa_imagem(imagem)  # Retorna imediatamente
+    >>> auto.finaliza()
+    """
+
+    def __init__(
+            self, interface: Interface, enviador : TLSclient, segmentador : Segmentador
+            , ctrl : Controlador, path_haar : str = None, instrumentacao : Instrumentacao = None
+            ):
+        """Inicialização da classe e da thread do modo autônomo.
+
+        Os parâmetros são os mesmos da classe :class:`Auto`. Veja o método :meth:`Auto.__init__()`.
+        """
+        super().__init__(interface, enviador, segmentador, ctrl, path_haar, instrumentacao)
+
+        # Imagem mais recente à espera do processamento: (imagem, BGR, debug)
+        self._condicao = threading.Condition()
+        self._proxima = None
+        self._ativo = True
+
+        self._n_recebidos = 0
+        self._n_processados = 0
+        self._n_descartados = 0
+
+        # Registro dos erros de processamento (apenas na saída padrão)
+        self._log = LogFile(prefixo="[AutoConcorrente] ")
+
+        # Threads de trabalho do estágio 1 (segmentação e identificação)
+        self._threads_trabalho = ThreadPoolExecutor(max_workers=2, thread_name_prefix="auto-trabalho")
+
+        self._thread = threading.Thread(target=self._loop_processamento, daemon=True)
+        self._thread.start()
+
+    def processa_imagem(self, imagem, BGR=False, debug=False):
+        """Envia uma imagem para o processamento do modo autônomo.
+
+        A imagem é guardada e processada pela thread do modo autônomo. Se outra imagem estava à espera do
+        processamento, ela é descartada. O método retorna imediatamente. Os parâmetros são os mesmos do
+        método :meth:`Auto.processa_imagem()`.
+
+        A imagem não deve ser alterada após ser enviada.
+
+        Parameters
+        ----------
+        imagem : numpy.ndarray
+            A imagem a ser processada.
+
+        BGR : bool, default False
+            Se a imagem está no formato BGR.
+
+        debug : bool, default False
+            Se a imagem de debug deve ser exibida na interface. Caso seja false, exibe a imagem normal.
+        """
+        with self._condicao:
+            # A thread foi finalizada. A imagem não seria processada.
+            if not self._ativo:
+                return
+
+            if self._proxima is not None:
+                self._n_descartados += 1
+
+            self._n_recebidos += 1
+            self._proxima = (imagem, BGR, debug)
+            self._condicao.notify_all()
+
+    def retorna_contadores(self):
+        """Retorna a quantidade de imagens processadas e descartadas.
+
+        Returns
+        -------
+        int
+            Quantidade de imagens processadas (enviadas ao controlador).
+
+        int
+            Quantidade de imagens descartadas por terem sido substituídas por uma mais recente.
+        """
+        with self._condicao:
+            return self._n_processados, self._n_descartados
+
+    def aguarda_vaga(self):
+        """Espera até que nenhuma imagem esteja à espera do processamento.
+
+        Após o retorno, a próxima imagem enviada não substitui outra. Útil para enviar imagens o mais rápido
+        possível sem descartá-las (por exemplo, ao reproduzir um vídeo).
+        """
+        with self._condicao:
+            self._condicao.wait_for(lambda: self._proxima is None or not self._ativo)
+
+    def aguarda_conclusao(self):
+        """Espera até que todas as imagens recebidas sejam processadas ou descartadas.
+        """
+        with self._condicao:
+            self._condicao.wait_for(
+                    lambda: self._n_processados + self._n_descartados == self._n_recebidos or not self._ativo
+                    )
+
+    def finaliza(self, espera=True):
+        """Finaliza a thread do modo autônomo.
+
+        As imagens à espera do processamento são descartadas.
+
+        Parameters
+        ----------
+        espera : bool, default True
+            Se True, espera a thread terminar a imagem em processamento.
+        """
+        with self._condicao:
+            self._ativo = False
+            self._condicao.notify_all()
+
+        if espera:
+            self._thread.join()
+
+    def _loop_processamento(self):
+        """Loop da thread do modo autônomo.
+
+        Aguarda uma nova imagem e executa o estágio 1 dela nas threads de trabalho. Enquanto isso, executa
+        o estágio 2 da imagem anterior. Se não houver uma nova imagem, executa o estágio 2 da anterior sem
+        esperar.
+        """
+        # Resultado do estágio 1 que aguarda o estágio 2
+        pendente = None
+
+        try:
+            while True:
+                with self._condicao:
+                    while self._ativo and self._proxima is None and pendente is None:
+                        self._condicao.wait()
+
+                    if not self._ativo:
+                        break
+
+                    proxima, self._proxima = self._proxima, None
+                    self._condicao.notify_all()
+
+                # Nenhuma imagem nova. Termina a anterior.
+                if proxima is None:
+                    self._finaliza_imagem(pendente)
+                    pendente = None
+                    continue
+
+                imagem, BGR, debug = proxima
+                inicio = perf_counter_ns()
+
+                # Estágio 1 (threads de trabalho)
+                futuros = None
+                try:
+                    RGB, BGR = self._converte_cores(imagem, BGR)
+                    futuro_segmentacao = self._threads_trabalho.submit(self._segmenta, RGB, debug)
+                    futuro_identificacao = self._threads_trabalho.submit(
+                            self._identifica_e_desenha, BGR, futuro_segmentacao, debug
+                            )
+                    futuros = (futuro_segmentacao, futuro_identificacao)
+
+                except Exception:
+                    self._descarta_imagem("Erro no estágio 1 do processamento da imagem!")
+
+                # Estágio 2 da imagem anterior (thread do modo autônomo)
+                if pendente is not None:
+                    self._finaliza_imagem(pendente)
+                    pendente = None
+
+                if futuros is None:
+                    continue
+
+                # Espera as duas threads de trabalho, mesmo se uma falhar, para que o segmentador e o
+                # identificador não sejam usados pela próxima imagem enquanto ainda estão em uso
+                wait(futuros)
+
+                try:
+                    mascara, img_debug = futuro_segmentacao.result()
+                    posicao = futuro_identificacao.result()
+
+                except Exception:
+                    self._descarta_imagem("Erro no estágio 1 do processamento da imagem!")
+                    continue
+
+                pendente = (mascara, posicao, RGB, img_debug, debug, inicio)
+
+        except Exception:
+            self._log.register("Erro na thread do modo autônomo! Finalizando a thread...", exception=True)
+
+        finally:
+            self._threads_trabalho.shutdown()
+
+            # Libera quem aguarda a thread (aguarda_vaga(), aguarda_conclusao()). As imagens recebidas depois
+            # disso não são processadas.
+            with self._condicao:
+                self._ativo = False
+                self._condicao.notify_all()
+
+    def _descarta_imagem(self, mensagem):
+        """Registra o erro do processamento de uma imagem no log e conta a imagem como descartada.
+
+        Deve ser chamado no tratamento da exceção.
+        """
+        self._log.register(mensagem, exception=True)
+
+        with self._condicao:
+            self._n_descartados += 1
+            self._condicao.notify_all()
+
+    def _identifica_e_desenha(self, BGR, futuro_segmentacao, debug):
+        """Identifica o lixo e, no modo de debug, desenha a identificação na imagem da segmentação.
+
+        Executado em uma thread de trabalho. O desenho espera a segmentação, feita na outra thread.
+
+        Returns
+        -------
+        tuple or None
+            Posição do lixo mais próximo na notação do controlador.
+        """
+        posicao = self._identifica(BGR)
+
         if debug:
-            img_debug = cv.cvtColor(self._ctrl.retorna_imagem_debug(), cv.COLOR_BGR2RGB)
-            self._interface.atualiza_frame(img_debug)
+            mascara, img_debug = futuro_segmentacao.result()
+            self._desenha_identificacao(img_debug)
 
-        else:
-            self._interface.atualiza_frame(self._RGB)
+        return posicao
 
-        # Permite que o próximo frame seja processado
-        self._BGR = None
-        self._RGB = None
+    def _finaliza_imagem(self, pendente):
+        """Executa o estágio 2 (controlador, envio e apresentação) de uma imagem.
+
+        Parameters
+        ----------
+        pendente : tuple
+            Resultado do estágio 1: (mascara, posicao, RGB, img_debug, debug, inicio).
+        """
+        mascara, posicao, RGB, img_debug, debug, inicio = pendente
+
+        try:
+            self._controla(mascara, posicao, RGB, img_debug, debug)
+
+        except Exception:
+            self._descarta_imagem("Erro no estágio 2 do processamento da imagem!")
+            return
+
+        self._etapa_frame.registra(perf_counter_ns() - inicio)
+
+        with self._condicao:
+            self._n_processados += 1
+            self._condicao.notify_all()
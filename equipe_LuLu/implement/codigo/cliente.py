@@ -33,6 +33,9 @@ PATH_HAAR = "identificacao/cascade-leite.xml"
 
 DEBUG = True
 
+# Se True, a segmentação e a identificação são executadas em paralelo, em threads próprias
+CONCORRENTE = True
+
 
 if __name__ == "__main__":
     # IP do Wall-e
@@ -107,8 +110,12 @@ if __name__ == "__main__":
     app = QtWidgets.QApplication()
     interface = Interface("interface/interface.ui", recebedor_video, enviador_comandos)
     interface.define_video_callback_lista([video_callback])
+    interface.arquivo_instrumentacao = log_pasta + "instrumentacao.json"
     interface.show()
 
-    auto = autonomo.Auto(interface, enviador_comandos, segmentador, ctrl, PATH_HAAR)
+    if CONCORRENTE:
+        auto = autonomo.AutoConcorrente(interface, enviador_comandos, segmentador, ctrl, PATH_HAAR, interface.retorna_instrumentacao())
+    else:
+        auto = autonomo.Auto(interface, enviador_comandos, segmentador, ctrl, PATH_HAAR, interface.retorna_instrumentacao())
 
     sys.exit(app.exec())
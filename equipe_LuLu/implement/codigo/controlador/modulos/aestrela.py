@@ -7,8 +7,10 @@ Para utilizar o algorítimo, deve-se criar um objeto da classe :class:`AEstrela`
 """
 
 
+from collections import OrderedDict
 import cv2 as cv
 import numpy as np
+import heapq
 import math
 import time
 
@@ -40,11 +42,27 @@ class AEstrela():
     na implementação. O parâmetro é o *passo*, definido ao instanciar a classe. Veja
     :meth:`__init__()` para mais informações;
 
-    O custo é computado usando a função heurística baseada na distância entre dois pontos.
+    O custo é computado usando a função heurística baseada na distância entre dois pontos. Ela pode ser
+    a distância euclidiana ou a distância octil. O campo heurístico de todo o mapa é computado de uma só
+    vez para cada destino e guardado em um cache. Veja :meth:`__init__()` para mais informações.
+
+    A lista aberta é uma fila de prioridade (heap binário), e o custo acumulado e o pai de cada
+    posição são salvos em vetores do Numpy indexados pela posição achatada do mapa
+    (``indice = y*n_colunas + x``). Assim, tanto a busca quanto a reconstrução do caminho
+    escalam com O(N log N) no número de posições do mapa.
+
+    O mapa é envolvido por uma borda de paredes com um bloco de espessura. Dessa forma, os vizinhos
+    de qualquer posição livre sempre pertencem ao mapa, e eles podem ser obtidos somando deslocamentos
+    pré-computados ao índice achatado, sem checar os limites do mapa. Os custos e a função heurística
+    dos oito vizinhos são computados de uma só vez com operações vetorizadas do Numpy.
 
     Também é possível usar uma matriz para adicionar valores específicos a função
     de custo em cada ponto do mapa. Veja a documentação do método :meth:`define_mapas()`.
 
+    Além do A*, a busca pode ser feita com o Jump Point Search (JPS), que salta sobre as regiões livres
+    onde o mapa de custo é zero. Veja :meth:`__init__()` e :meth:`_obtem_caminho_jps()` para mais
+    informações.
+
     É possível alterar os mapas e pontos de início/fim de um objeto sem ter que instanciá-lo
     novamente.
 
@@ -61,6 +79,14 @@ class AEstrela():
     Se deseja saber a direção inicial que deve ser seguida para alcançar o ponto de destino, use o método
     :meth:`retorna_direcao_inicial()`.
 
+    Antes de cada busca, é checado se o destino pertence à mesma região livre (componente conexa) que o
+    ponto inicial. Se não pertencer, o caminho é None e nenhuma posição é expandida. Veja o método
+    :meth:`destino_alcancavel()`.
+
+    A busca pode ser limitada por uma quantidade máxima de posições expandidas ou por um prazo. Se o limite
+    for atingido, é retornado o caminho até a posição checada mais próxima do destino. Para saber se o
+    último caminho está completo, use o método :meth:`retorna_busca_completa()`.
+
     Warnings
     --------
     Esse algorítimo foi pensado para ser usado máscaras de algorítimos de segmentação semântica. Então
@@ -72,19 +98,72 @@ class AEstrela():
     ajuste o método :meth:`_obtem_caminho()`.
     """
 
-    def __init__(self, passo=10):
+    def __init__(self, passo=10, heuristica="euclidiana", tamanho_cache=8, metodo="aestrela"):
         """Configura o algorítimo A*.
 
         O parâmetro *passo* é um peso relacionado ao custo de se movimentar de uma posição para outra adjacente.
         Por exemplo, ao mover da posição (0, 1) para (0, 2), será adicionado um custo de *passo* a esse caminho.
 
+        A função heurística é definida pelo parâmetro *heuristica*. Pode ser "euclidiana" (distância em linha
+        reta até o destino) ou "octil" (distância percorrendo apenas passos retos e diagonais, que é exatamente
+        o custo do caminho em um mapa sem paredes e sem mapa de custo).
+
+        O campo heurístico (valor da função heurística em todas as posições do mapa) é computado de uma só
+        vez para cada destino. Os últimos *tamanho_cache* campos computados são guardados em um cache (LRU)
+        indexado pela posição de destino e pelo formato do mapa. Assim, gerar caminhos sucessivos até o mesmo
+        objeto não recomputa a função heurística, mesmo que o mapa mude. Se *tamanho_cache* for 0, o cache
+        não é usado.
+
+        O método de busca é definido pelo parâmetro *metodo*. Pode ser "aestrela" (A*, que checa os oito
+        vizinhos de cada posição) ou "jps" (Jump Point Search, que salta em linha reta sobre as regiões livres
+        sem custo adicional e usa o A* no restante do mapa). Os dois métodos retornam caminhos de mesmo custo.
+
         Parameters
         ----------
         passo : int
             Peso relacionado ao custo de se movimentar de uma posição para outra adjacente.
+
+        heuristica : str, default "euclidiana"
+            Função heurística usada: "euclidiana" ou "octil".
+
+        tamanho_cache : int, default 8
+            Quantidade de campos heurísticos guardados no cache.
+
+        metodo : str, default "aestrela"
+            Método de busca usado: "aestrela" ou "jps".
         """
+        if heuristica not in ("euclidiana", "octil"):
+            raise ValueError(f"Função heurística desconhecida: {heuristica}")
+
+        if metodo not in ("aestrela", "jps"):
+            raise ValueError(f"Método de busca desconhecido: {metodo}")
+
         self._passo = passo
+        self._heuristica = heuristica
+        self._metodo = metodo
         self._mapa = None
+        self._n_expandidos = 0
+        self._busca_completa = True
+
+        # Cache dos campos heurísticos. As chaves são do tipo (pos_fim, formato_mapa)
+        self._tamanho_cache = tamanho_cache
+        self._cache_heuristica = OrderedDict()
+
+        # Direções dos vizinhos de uma posição, no formato (dy, dx)
+        self._direcoes = np.array([
+                (1, 0), (-1, 0), (0, 1), (0, -1),
+                (1, 1), (1, -1), (-1, 1), (-1, -1)
+                ])
+
+        # Custo do passo para cada direção. Se está na diagonal, o passo é 0.414 vezes maior
+        # (a diagonal de um quadrado é 1.414 vezes o seu lado).
+        eh_diagonal = np.all(self._direcoes != 0, axis=1)
+        self._passos = np.where(eh_diagonal, passo*1.414, float(passo))
+
+        # Direções seguidas ao expandir uma posição do interior de uma região uniforme no JPS, indexadas
+        # pela direção em que ela foi alcançada. Uma direção reta continua reta, e uma diagonal se
+        # divide na própria diagonal e nas suas duas componentes retas.
+        self._direcoes_naturais = [(0,), (1,), (2,), (3,), (4, 0, 2), (5, 0, 3), (6, 1, 2), (7, 1, 3)]
 
     def define_mapas(self, mapa, mapa_custo=None):
         """Define o mapa do ambiente onde será traçado o caminho.
@@ -120,13 +199,45 @@ class AEstrela():
         else:
             self._mapa_custo = None
 
+        # Mapa com uma borda de paredes. A largura da borda é necessária para converter as posições
+        # (y, x) do mapa original para o índice achatado do mapa com borda.
+        self._largura_borda = self._mapa_formato[1] + 2
+        self._mapa_borda = np.pad(self._mapa, 1, constant_values=1)
+
+        # Mapa de custo com borda, achatado
+        if self._mapa_custo is not None:
+            self._custo_borda = np.pad(self._mapa_custo.astype(np.float64), 1).ravel()
+
+        else:
+            self._custo_borda = np.zeros(self._mapa_borda.size)
+
+        # Deslocamento do índice achatado para cada um dos vizinhos
+        self._deslocamentos = self._direcoes[:, 0]*self._largura_borda + self._direcoes[:, 1]
+
+        # Posição (y, x) no mapa original de cada índice achatado do mapa com borda
+        ys, xs = np.indices(self._mapa_borda.shape)
+        self._ys = (ys - 1).ravel()
+        self._xs = (xs - 1).ravel()
+
+        # Custo acumulado inicial. As paredes recebem custo -inf para que nunca sejam consideradas
+        # um caminho mais barato e, portanto, nunca entrem na lista aberta.
+        self._custo_g_inicial = np.where(self._mapa_borda.ravel() == 1, -np.inf, np.inf)
+
+        # Rótulo da região livre (componente conexa) de cada posição do mapa com borda. As paredes recebem
+        # o rótulo 0. A conectividade 8 é a mesma usada pela busca, que permite movimentos na diagonal.
+        _, componentes = cv.connectedComponents(1 - self._mapa_borda, connectivity=8, ltype=cv.CV_32S)
+        self._componentes = componentes.ravel()
+
+        if self._metodo == "jps":
+            self._prepara_jps()
+
         # Limpa os resultados
         self._mapa_checado = None
         self._vetor_caminho = None
         self._pos_inicio = None
         self._pos_fim = None
 
-    def gera_caminho(self, pos_inicio, pos_fim):
+    def gera_caminho(self, pos_inicio, pos_fim, max_expansoes=None, prazo=None):
         """Gera o melhor caminho do ponto inicial até o final no mapa.
 
         Retorna uma lista com esse caminho. Da posição inicial até a posição anterior ao ponto final.
@@ -135,6 +246,14 @@ class AEstrela():
         As posições de início e de fim devem ser uma tupla do tipo (pos_y, pos_x). Os pontos da lista
         retornada também são desse formato.
 
+        A busca pode ser limitada pelos parâmetros *max_expansoes* (quantidade máxima de posições expandidas)
+        e *prazo* (instante, no relógio de :func:`time.perf_counter()`, em que a busca deve ser interrompida).
+        Se um dos limites for atingido antes de alcançar o destino, é retornado o caminho parcial até a
+        posição expandida com a menor função heurística, ou seja, a mais próxima do destino. Nesse caso,
+        :meth:`retorna_busca_completa()` retorna False.
+
+        O caminho fica salvo até que o mapa ou as posições mudem, mesmo que seja parcial.
+
         Parameters
         ----------
         pos_inicial : tuple
@@ -143,6 +262,12 @@ class AEstrela():
         pos_fim : tuple
             Posição de destino do caminho no mapa.
 
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Se None, não há limite.
+
+        prazo : float, default None
+            Instante em que a busca deve ser interrompida. Se None, não há limite.
+
         Returns
         -------
         list
@@ -155,32 +280,47 @@ class AEstrela():
         # Salva as posições iniciais e finais
         self._pos_inicio = pos_inicio
         self._pos_fim = pos_fim
+        self._busca_completa = True
 
-        # A posição final será salva como um atributo para não ter que ser passada como argumento aos
-        # demais métodos.
-        self._pos_fim = pos_fim
-
-        # A lista aberta consiste em uma lista com todos os pontos (posições) que devem ser checados para
-        # obter o caminho. Cada elemento da lista deve conter as seguintes informações: a posição do ponto,
-        # o ponto pai (para poder gerar o caminho), e o custo associado a esse ponto.
-        self._lista_aberta = [(pos_inicio, None, 1.0)]
+        # O custo acumulado (g) e o pai de cada posição são salvos em vetores indexados pela posição
+        # achatada do mapa com borda. O pai -1 indica que a posição não possui antecessor.
+        self._custo_g = self._custo_g_inicial.copy()
+        self._pai = np.full(self._custo_g.size, -1, dtype=np.int32)
 
-        # Lista onde para todas as posições que já foram checadas devem estar. Após serem checadas, elas são
-        # removidas da lista aberta e colocadas nessa lista. Essa lista será usada para traçar o caminho no
-        # mapa após ele ser definido.
-        self._lista_fechada = []
+        # A lista aberta é um heap com os pontos que ainda devem ser checados. Cada elemento é uma tupla
+        # do tipo (custo_total, indice), em que o custo total é o custo acumulado somado à função heurística.
+        self._lista_aberta = []
 
-        # Mapa com todas a posições que não devem mais ser checadas (paredes e as já checadas)
-        self._mapa_checado = self._mapa.copy()
+        # Mapa com todas a posições que já foram adicionadas à lista aberta (e as paredes). É uma visão
+        # do mapa achatado com borda, que é atualizado durante a busca.
+        self._mapa_checado_borda = self._mapa_borda.ravel().copy()
+        self._mapa_checado = self._mapa_checado_borda.reshape(self._mapa_borda.shape)[1:-1, 1:-1]
         self._mapa_checado[pos_inicio] = 1  # Adiciona uma parede no ponto inicial para não ser checado futuramente
 
+        # Se o destino está em outra região do mapa, não existe caminho até ele
+        self._n_expandidos = 0
+        if not self.destino_alcancavel(pos_inicio, pos_fim):
+            self._vetor_caminho = None
+            return None
+
+        # Limites da busca
+        if max_expansoes is None:
+            max_expansoes = math.inf
+
+        if prazo is None:
+            prazo = math.inf
+
         # Define o caminho e gera seu vetor
-        caminho = self._obtem_caminho(pos_inicio)
+        if self._metodo == "jps":
+            caminho = self._obtem_caminho_jps(pos_inicio, max_expansoes, prazo)
+
+        else:
+            caminho = self._obtem_caminho(pos_inicio, max_expansoes, prazo)
         self._vetor_caminho = self._gera_vetor_caminho(caminho)
 
         return self._vetor_caminho
 
-    def gera_caminho_smoothing(self, pos_inicio, pos_fim):
+    def gera_caminho_smoothing(self, pos_inicio, pos_fim, max_expansoes=None, prazo=None):
         """Gera o melhor caminho do ponto inicial até o final no mapa, com smoothing.
 
         Funciona da mesma forma que o método :meth:`gera_caminho()`, mas o caminho será ajustado
@@ -195,17 +335,23 @@ class AEstrela():
         pos_fim : tuple
             Posição de destino do caminho no mapa.
 
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Veja :meth:`gera_caminho()`.
+
+        prazo : float, default None
+            Instante em que a busca deve ser interrompida. Veja :meth:`gera_caminho()`.
+
         Returns
         -------
         list
             Lista com os pontos do caminho.
         """
-        vetor_caminho = self.gera_caminho(pos_inicio, pos_fim)
+        vetor_caminho = self.gera_caminho(pos_inicio, pos_fim, max_expansoes, prazo)
         vetor_caminho = self._vetor_smoothing(vetor_caminho, 25)
 
         return vetor_caminho
 
-    def retorna_direcao_inicial(self, pos_inicio, pos_fim, rad=True):
+    def retorna_direcao_inicial(self, pos_inicio, pos_fim, rad=True, max_expansoes=None, prazo=None):
         """Retorna a direção inicial que deve ser seguida para percorrer o caminho.
 
         Retorna um ângulo em radiano ou em graus, dependendo do parâmetro *rad*. Ele corresponde ao ângulo,
@@ -216,6 +362,10 @@ class AEstrela():
 
         Fonte: autoria própria
 
+        A direção é a mesma obtida ligando o primeiro e o terceiro ponto do caminho suavizado por
+        :meth:`gera_caminho_smoothing()`, mas apenas esses dois pontos são computados. Veja o método
+        :meth:`_direcao_vetor()`.
+
         Parameters
         ----------
         pos_inicio : tuple
@@ -227,32 +377,24 @@ class AEstrela():
         rad : bool, default True
             Se True, retorna o angulo em radiano. Se False, retorna o angulo em graus.
 
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Veja :meth:`gera_caminho()`.
+
+        prazo : float, default None
+            Instante em que a busca deve ser interrompida. Veja :meth:`gera_caminho()`.
+
         Returns
         -------
         float or None
             Ângulo da direção inicial em radiano ou em graus. Se não foi possível
             definir a direção, retorna None.
         """
-        vetor_caminho = self.gera_caminho_smoothing(pos_inicio, pos_fim)
-
-        # Se não conseguiu traçar um caminho, retorna None
-        if vetor_caminho == None:
-            return None
+        vetor_caminho = self.gera_caminho(pos_inicio, pos_fim, max_expansoes, prazo)
 
-        # Se o caminho é muito pequeno, retorna None
-        if len(vetor_caminho) < 3:
+        # Ângulo entre os pontos em radiano. Se não conseguiu traçar um caminho, retorna None
+        angulo = self._direcao_vetor(vetor_caminho, 25)
+        if angulo is None:
             return None
-        
-        # Distância entre os pontos
-        p_fim = np.int16(vetor_caminho[2])
-        p_inicio = np.int16(vetor_caminho[0])
-
-        dx = p_fim[1]-p_inicio[1]
-        dy = p_fim[0]-p_inicio[0]
-        d_pontos = math.sqrt(dx**2 + dy**2)
-
-        # Ângulo entre os pontos em radiano
-        angulo = math.acos(dx/d_pontos)
 
         if rad:
             return angulo
@@ -261,7 +403,7 @@ class AEstrela():
             # Conversão para graus
             return angulo*180/math.pi
 
-    def gera_caminho_mapa(self, pos_inicio, pos_fim):
+    def gera_caminho_mapa(self, pos_inicio, pos_fim, max_expansoes=None, prazo=None):
         """Gera um mapa do caminho percorrido com o algorítimo A*.
 
         O caminho gerado pelo método :meth:`gera_caminho()` é usado para gerar um mapa. Esse mapa
@@ -278,16 +420,22 @@ class AEstrela():
         pos_fim : tuple
             Posição de destino do caminho no mapa.
 
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Veja :meth:`gera_caminho()`.
+
+        prazo : float, default None
+            Instante em que a busca deve ser interrompida. Veja :meth:`gera_caminho()`.
+
         Returns
         -------
         numpy.ndarray
             Mapa com o caminho percorrido.
         """
-        vetor_caminho = self.gera_caminho(pos_inicio, pos_fim)
+        vetor_caminho = self.gera_caminho(pos_inicio, pos_fim, max_expansoes, prazo)
 
         return self._gera_mapa_caminho(vetor_caminho)
 
-    def gera_caminho_mapa_smoothing(self, pos_inicio, pos_fim):
+    def gera_caminho_mapa_smoothing(self, pos_inicio, pos_fim, max_expansoes=None, prazo=None):
         """Gera um mapa do caminho percorrido com o algorítimo A*, com smoothing.
 
         Funciona da mesma forma que o método :meth:`gera_caminho_mapa`, mas o caminho será ajustado
@@ -301,12 +449,18 @@ class AEstrela():
         pos_fim : tuple
             Posição de destino do caminho no mapa.
 
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Veja :meth:`gera_caminho()`.
+
+        prazo : float, default None
+            Instante em que a busca deve ser interrompida. Veja :meth:`gera_caminho()`.
+
         Returns
         -------
         numpy.ndarray
             Mapa com o caminho percorrido.
         """
-        vetor_caminho = self.gera_caminho_smoothing(pos_inicio, pos_fim)
+        vetor_caminho = self.gera_caminho_smoothing(pos_inicio, pos_fim, max_expansoes, prazo)
 
         return self._gera_mapa_caminho_smoothing(vetor_caminho)
 
@@ -325,80 +479,406 @@ class AEstrela():
         """
         return self._mapa_checado
 
-    def _obtem_caminho(self, pos_atual):
+    def retorna_n_expandidos(self):
+        """Retorna a quantidade de posições expandidas na última busca.
+
+        Uma posição é expandida quando é retirada da lista aberta e seus vizinhos são checados. Esse é
+        um método para comparar o custo de cada busca com o de outros traçadores de caminho.
+
+        Returns
+        -------
+        int
+            Quantidade de posições expandidas.
+        """
+        return self._n_expandidos
+
+    def destino_alcancavel(self, pos_inicio, pos_fim):
+        """Informa se existe um caminho entre as posições, sem executar a busca.
+
+        As regiões livres do mapa são rotuladas uma única vez por mapa em :meth:`define_mapas()`. Como o
+        caminho termina na posição anterior ao destino, ele existe se algum dos vizinhos do destino está
+        na mesma região do ponto inicial. São checadas apenas essas oito posições.
+
+        Parameters
+        ----------
+        pos_inicio : tuple
+            Posição de início no mapa.
+
+        pos_fim : tuple
+            Posição de destino do caminho no mapa.
+
+        Returns
+        -------
+        bool
+            True se o destino pode ser alcançado a partir do ponto inicial.
+        """
+        inicio = self._pos2indice(pos_inicio)
+        fim = self._pos2indice(pos_fim)
+
+        if inicio == -1 or fim == -1:
+            return False
+
+        rotulo = self._componentes[inicio]
+
+        # O ponto inicial está em uma parede
+        if rotulo == 0:
+            return False
+
+        return bool(np.any(self._componentes[fim - self._deslocamentos] == rotulo))
+
+    def retorna_busca_completa(self):
+        """Informa se a última busca foi completa.
+
+        A busca é incompleta quando o limite de posições expandidas ou o prazo definidos em
+        :meth:`gera_caminho()` foram atingidos antes de alcançar o destino. Nesse caso, o caminho
+        retornado é parcial: termina na posição checada mais próxima do destino.
+
+        Returns
+        -------
+        bool
+            True se a busca terminou (encontrando um caminho ou não), False se foi interrompida.
+        """
+        return self._busca_completa
+
+    def _obtem_caminho(self, pos_atual, max_expansoes=math.inf, prazo=math.inf):
         """Define o menor caminho entre os pontos.
 
-        Retorna um tupla do tipo (posicao_atual, posicao_pai, custo). A 'posicao_atual' é
-        uma tupla contendo a posição (y, x) do último ponto andes de conectar com o ponto
-        de destino. A 'posicao_pai' é uma tupla da posição (y, x) do ponto pai (antecedente) ao
-        ponto retornado. E o 'custo' é o valor do custo dessa posição (definida pela função
-        de custo).
+        Retorna o índice (posição achatada do mapa com borda) do último ponto antes de conectar com o
+        ponto de destino. O caminho completo pode ser reconstruído a partir dele pelo vetor de pais
+        (ver o método :meth:`_gera_vetor_caminho()`).
+
+        Os pontos são retirados da lista aberta (heap) em ordem de custo total. Um ponto pode ser
+        adicionado mais de uma vez ao heap se for encontrado um caminho mais barato até ele. As cópias
+        antigas são ignoradas ao serem retiradas, já que o ponto estará marcado como fechado.
+
+        Os oito vizinhos de cada ponto são processados de uma só vez. A borda de paredes do mapa garante
+        que eles sempre existem. As paredes e os pontos fechados (já checados) possuem custo acumulado
+        -inf. Assim, uma única comparação com o novo custo descarta todos eles, e apenas os vizinhos
+        cujo custo foi melhorado são adicionados ao heap.
+
+        Se o limite de posições expandidas ou o prazo forem atingidos, a busca é interrompida e é retornado
+        o índice da posição expandida com a menor função heurística. O prazo é checado a cada 32 posições
+        expandidas, para não consultar o relógio a cada iteração.
 
         Parameters
         ----------
         pos_atual : tuple
             Posição atual no mapa.
 
+        max_expansoes : int or float, default math.inf
+            Quantidade máxima de posições expandidas.
+
+        prazo : float, default math.inf
+            Instante, no relógio de :func:`time.perf_counter()`, em que a busca deve ser interrompida.
+
         Returns
         -------
-        tuple or None
-            Tupla contendo as informações da posição anterior a de destino. Se não encontrou
-            um caminho, retorna None.
+        int or None
+            Índice da posição anterior a de destino. Se não encontrou um caminho, retorna None.
         """
         # Se o ponto inicial não puder ser checado, retorna None
+        self._n_expandidos = 0
         if self._mapa[pos_atual] == 1:
             return None
 
-        while True:
-            # Se a lista aberta está vazia, significa que não foi possível traçar um caminho
-            if len(self._lista_aberta) == 0:
-                return None
+        inicio = self._pos2indice(pos_atual)
+        fim = self._pos2indice(self._pos_fim)
+
+        # Pontos vizinhos ao ponto final. Ao checar um deles, o caminho foi encontrado.
+        if fim == -1:
+            vizinhos_fim = set()
+        else:
+            vizinhos_fim = set((fim - self._deslocamentos).tolist())
+
+        # Atributos usados a cada iteração
+        custo_g = self._custo_g
+        custo_borda = self._custo_borda
+        pai = self._pai
+        checado = self._mapa_checado_borda
+        deslocamentos = self._deslocamentos
+        passos = self._passos
+        lista_aberta = self._lista_aberta
+        heuristica = self._campo_heuristico(self._pos_fim)
+        inf_negativo = -np.inf
+
+        n_expandidos = 0
+
+        # Posição expandida mais próxima do destino, retornada se a busca for interrompida
+        melhor = inicio
+        melhor_heuristica = math.inf
+
+        custo_g[inicio] = 0.0
+        heapq.heappush(lista_aberta, (heuristica[inicio], inicio))
+
+        # Se a lista aberta esvaziar, significa que não foi possível traçar um caminho
+        while lista_aberta:
+            # Obtém o elemento de menor custo
+            _, indice = heapq.heappop(lista_aberta)
+
+            # Cópia antiga de um ponto que já foi checado
+            custo_atual = custo_g[indice]
+            if custo_atual == inf_negativo:
+                continue
+
+            # Encontrou o ponto final
+            if indice in vizinhos_fim:
+                self._n_expandidos = n_expandidos
+                return indice
+
+            # Interrompe a busca se atingiu um dos limites
+            if n_expandidos >= max_expansoes or ((n_expandidos & 31) == 0 and time.perf_counter() > prazo):
+                self._n_expandidos = n_expandidos
+                self._busca_completa = False
+                return melhor
+
+            # Fecha o ponto atual
+            custo_g[indice] = inf_negativo
+            n_expandidos += 1
+
+            if heuristica[indice] < melhor_heuristica:
+                melhor = indice
+                melhor_heuristica = heuristica[indice]
+
+            # Custo acumulado de todos os vizinhos passando pelo ponto atual. Apenas os vizinhos com um
+            # caminho mais barato são adicionados à lista aberta
+            vizinhos = deslocamentos + indice
+            custo = custo_borda[vizinhos] + (passos + custo_atual)
+            melhores = custo < custo_g[vizinhos]
+
+            vizinhos = vizinhos[melhores]
+            if vizinhos.size == 0:
+                continue
+
+            custo = custo[melhores]
+
+            custo_g[vizinhos] = custo
+            pai[vizinhos] = indice
+            checado[vizinhos] = 1
+
+            custo_total = custo + heuristica[vizinhos]
+            for item in zip(custo_total.tolist(), vizinhos.tolist()):
+                heapq.heappush(lista_aberta, item)
+
+        self._n_expandidos = n_expandidos
+
+        return None
+
+    def _prepara_jps(self):
+        """Computa os mapas auxiliares usados pelo Jump Point Search.
+
+        Uma posição é uniforme quando não é uma parede e o mapa de custo é zero nela. Ela é interior
+        quando ela e todos os seus oito vizinhos são uniformes. O JPS só salta sobre as posições
+        interiores.
+
+        Para cada uma das quatro direções retas, é computada a quantidade de passos entre cada posição e
+        a primeira posição não interior nessa direção. Assim, um salto em linha reta é feito com uma
+        única consulta, sem percorrer as posições do caminho.
+
+        Os mapas são salvos como listas do Python, que são mais rápidas que os arrays do Numpy para
+        acessar um elemento por vez.
+        """
+        uniforme = (self._mapa_borda == 0) & (self._custo_borda.reshape(self._mapa_borda.shape) == 0)
+        interior = cv.erode(uniforme.astype(np.uint8), np.ones((3, 3), np.uint8)) == 1
+
+        def passos_direita(interior):
+            # Coluna da primeira posição não interior a partir de cada posição (inclusive)
+            colunas = np.arange(interior.shape[1])
+            proxima = np.where(interior, interior.shape[1], colunas)
+            proxima = np.minimum.accumulate(proxima[:, ::-1], axis=1)[:, ::-1]
+
+            # O salto começa na coluna seguinte. A borda de paredes garante que a posição existe.
+            passos = np.full(interior.shape, interior.shape[1], dtype=np.int64)
+            passos[:, :-1] = proxima[:, 1:]
+
+            return passos - colunas
 
-            # Ordena a lista conforme o custo para obter o elemento com menor custo
-            self._lista_aberta.sort(key=lambda var: var[2])
-            ponto = self._lista_aberta[0]
+        # Mesma ordem das direções retas de *self._direcoes*: (1, 0), (-1, 0), (0, 1), (0, -1)
+        alcance = [
+                passos_direita(interior.T).T,
+                passos_direita(interior[::-1].T).T[::-1],
+                passos_direita(interior),
+                passos_direita(interior[:, ::-1])[:, ::-1],
+                ]
 
-            # Remove o ponto atual da lista aberta e adiciona à fechada
-            self._lista_aberta.pop(0)
-            self._lista_fechada.append(ponto)
+        self._interior = interior.ravel().tolist()
+        self._alcance = [passos.ravel().tolist() for passos in alcance]
 
-            # Novas posições (pontos)
-            direcoes = [(1, 0), (-1, 0), (0, 1), (0, -1)] + [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-            novas_posicoes = [tuple(np.array(ponto[0]) + np.array(direcao)) for direcao in direcoes]
+    def _obtem_caminho_jps(self, pos_atual, max_expansoes=math.inf, prazo=math.inf):
+        """Define o menor caminho entre os pontos usando o Jump Point Search.
 
-            # Informação se é um deslocamento diagonal
-            diagonal = [x[0] != 0 and x[1] != 0 for x in direcoes]
-            novas_posicoes = zip(novas_posicoes, diagonal)
+        Funciona da mesma forma que o método :meth:`_obtem_caminho()`, mas nem todos os vizinhos de uma
+        posição são adicionados à lista aberta.
 
-            for nova_posicao in novas_posicoes:
-                eh_diagonal = nova_posicao[1]
-                nova_posicao = nova_posicao[0]
+        Em uma região sem paredes e com custo uniforme, existem vários caminhos de mesmo custo entre duas
+        posições. O JPS considera apenas um deles: o que segue em linha reta (ou na diagonal) até ser
+        obrigado a mudar de direção. Uma posição interior (ver :meth:`_prepara_jps()`) alcançada por um
+        movimento reto continua apenas nessa direção, e uma alcançada na diagonal continua na diagonal e
+        nas suas duas componentes retas. Os movimentos retos saltam sobre todas as posições interiores até
+        a primeira posição não interior, que é adicionada à lista aberta como um ponto de salto.
 
-                # Encontrou o ponto final
-                if nova_posicao == self._pos_fim:
-                    return ponto
+        As posições não interiores (próximas das paredes ou com custo adicional) são expandidas como no
+        A*, com os oito vizinhos. Assim, o mapa de custo é respeitado e o custo do caminho é o mesmo
+        obtido pelo A*.
 
-                # Adiciona os vizinhos à lista aberta
-                elif self._checa_pos_valida(nova_posicao):
-                    custo = self._computa_custo(nova_posicao, ponto[2], eh_diagonal)
-                    self._lista_aberta.append((nova_posicao, ponto[0], custo))
-                    self._mapa_checado[nova_posicao] = 1
+        Os saltos também param nos vizinhos do ponto final, que encerram a busca. Os limites da busca
+        funcionam da mesma forma que no método :meth:`_obtem_caminho()`.
+
+        Parameters
+        ----------
+        pos_atual : tuple
+            Posição atual no mapa.
+
+        max_expansoes : int or float, default math.inf
+            Quantidade máxima de posições expandidas.
+
+        prazo : float, default math.inf
+            Instante, no relógio de :func:`time.perf_counter()`, em que a busca deve ser interrompida.
+
+        Returns
+        -------
+        int or None
+            Índice da posição anterior a de destino. Se não encontrou um caminho, retorna None.
+        """
+        # Se o ponto inicial não puder ser checado, retorna None
+        self._n_expandidos = 0
+        if self._mapa[pos_atual] == 1:
+            return None
+
+        inicio = self._pos2indice(pos_atual)
+        fim = self._pos2indice(self._pos_fim)
+
+        # Pontos vizinhos ao ponto final. Ao checar um deles, o caminho foi encontrado.
+        if fim == -1:
+            vizinhos_fim = set()
+            y_fim = None
+
+        else:
+            vizinhos_fim = set((fim - self._deslocamentos).tolist())
+            y_fim, x_fim = self._pos_fim
+
+        # Atributos usados a cada iteração. Listas do Python são mais rápidas para acessar um elemento
+        # por vez.
+        custo_g = self._custo_g_inicial.tolist()
+        pai = [-1]*len(custo_g)
+        direcao_pai = [-1]*len(custo_g)
+        custo_borda = self._custo_borda.tolist()
+        checado = self._mapa_checado_borda
+        interior = self._interior
+        alcance = self._alcance
+        direcoes = self._direcoes.tolist()
+        deslocamentos = self._deslocamentos.tolist()
+        passos = self._passos.tolist()
+        direcoes_naturais = self._direcoes_naturais
+        todas_direcoes = range(8)
+        largura = self._largura_borda
+        heuristica = self._campo_heuristico(self._pos_fim).tolist()
+        inf_negativo = -math.inf
+
+        self._pai = pai
+        n_expandidos = 0
+
+        # Posição expandida mais próxima do destino, retornada se a busca for interrompida
+        melhor = inicio
+        melhor_heuristica = math.inf
+
+        custo_g[inicio] = 0.0
+        lista_aberta = [(heuristica[inicio], inicio)]
+
+        # Se a lista aberta esvaziar, significa que não foi possível traçar um caminho
+        while lista_aberta:
+            # Obtém o elemento de menor custo
+            _, indice = heapq.heappop(lista_aberta)
+
+            # Cópia antiga de um ponto que já foi checado
+            custo_atual = custo_g[indice]
+            if custo_atual == inf_negativo:
+                continue
+
+            # Encontrou o ponto final
+            if indice in vizinhos_fim:
+                self._n_expandidos = n_expandidos
+                return indice
+
+            # Interrompe a busca se atingiu um dos limites
+            if n_expandidos >= max_expansoes or ((n_expandidos & 31) == 0 and time.perf_counter() > prazo):
+                self._n_expandidos = n_expandidos
+                self._busca_completa = False
+                return melhor
+
+            # Fecha o ponto atual
+            custo_g[indice] = inf_negativo
+            n_expandidos += 1
+
+            if heuristica[indice] < melhor_heuristica:
+                melhor = indice
+                melhor_heuristica = heuristica[indice]
+
+            # Direções checadas. O ponto inicial e as posições não interiores checam todas.
+            k_pai = direcao_pai[indice]
+            if k_pai == -1 or not interior[indice]:
+                direcoes_checadas = todas_direcoes
+
+            else:
+                direcoes_checadas = direcoes_naturais[k_pai]
+
+            for k in direcoes_checadas:
+                deslocamento = deslocamentos[k]
+                vizinho = indice + deslocamento
+
+                # Parede ou ponto fechado
+                if custo_g[vizinho] == inf_negativo:
+                    continue
+
+                # Salto em linha reta sobre as posições interiores
+                n_passos = 1
+                if k < 4 and interior[vizinho]:
+                    n_passos += alcance[k][vizinho]
+
+                    # O salto para no primeiro vizinho do ponto final que encontrar. Os vizinhos ocupam
+                    # três passos seguidos da linha do salto, a partir do passo *primeiro*.
+                    if y_fim is not None:
+                        y, x = divmod(indice, largura)
+                        dy, dx = direcoes[k]
+                        primeiro = None
+                        if dy == 0 and abs(y - 1 - y_fim) <= 1:
+                            primeiro = dx*(x_fim - x + 1) - 1
+
+                        elif dx == 0 and abs(x - 1 - x_fim) <= 1:
+                            primeiro = dy*(y_fim - y + 1) - 1
+
+                        if primeiro is not None and primeiro + 2 >= 1:
+                            n_passos = min(n_passos, max(primeiro, 1))
+
+                    vizinho = indice + n_passos*deslocamento
+                    if custo_g[vizinho] == inf_negativo:
+                        continue
+
+                # Apenas um caminho mais barato é adicionado à lista aberta
+                custo = custo_atual + n_passos*passos[k] + custo_borda[vizinho]
+                if custo < custo_g[vizinho]:
+                    custo_g[vizinho] = custo
+                    pai[vizinho] = indice
+                    direcao_pai[vizinho] = k
+                    checado[vizinho] = 1
+                    heapq.heappush(lista_aberta, (custo + heuristica[vizinho], vizinho))
+
+        self._n_expandidos = n_expandidos
+
+        return None
 
     def _gera_vetor_caminho(self, penultimo_ponto):
         """Gera e retorna um vetor com todos os pontos do caminho.
 
-        O primeiro elemento do vetor é o ponto inicial. O último é o ponto de destino (final).
+        O primeiro elemento do vetor é o ponto inicial. O último é o ponto anterior ao de destino.
 
-        Ao gerar o caminho, as posições checadas são colocadas no vetor de checados 'vetor_fechado'.
-        Assim, é possível acessar a 'posição_pai' por meio desse vetor. Como os elementos desse vetor
-        possuem a estrutura (posicao_inicial, posicao_pai, custo), mesma usada no método
-        :meth:`_obtem_caminho()`, é possível, recursivamente, acessar todos os pontos do caminho
-        saltando entre os elementos do 'vetor_fechado'.
+        Ao gerar o caminho, o pai de cada posição é salvo no vetor de pais. Assim, é possível acessar
+        o antecessor de qualquer ponto diretamente pelo seu índice, saltando de pai em pai até o
+        ponto inicial (que não possui pai).
 
         Parameters
         ----------
-        penultimo_ponto : tuple
-            Ponto anterior ao ponto final. Informações da posição anterior ao ponto final.
+        penultimo_ponto : int
+            Índice (posição achatada do mapa com borda) do ponto anterior ao ponto final.
 
         Returns
         -------
@@ -406,72 +886,82 @@ class AEstrela():
             Lista com todos os pontos do caminho. Se não foi possível traçar um caminho, retorna None.
         """
         # Se não conseguiu traçar um caminho, retorna None
-        if penultimo_ponto == None:
+        if penultimo_ponto is None:
             return None
 
         vetor_caminho = []
-        pos = penultimo_ponto
-        while pos[1] != None:
+        indice = penultimo_ponto
+        while indice != -1:
             # Adiciona a posição atual ao vetor
-            vetor_caminho.append(pos[0])
-
-            # Altera a variável 'pos' para o pai (antecessor) dela
-            pos = [ x for x in self._lista_fechada if x[0] == pos[1]]
-            pos = pos[0]
-
-        else:
-            # Posição do ponto inicial
-            vetor_caminho.append(pos[0])
-
-            # É necessário inverter o vetor antes de retornar para que ele comece pelo ponto
-            # inicial e termine no de destino.
-            return vetor_caminho[::-1]
+            vetor_caminho.append(self._indice2pos(indice))
+
+            # Altera o índice para o pai (antecessor) dele
+            anterior = indice
+            indice = self._pai[indice]
+
+            # No JPS, o pai pode estar a vários passos de distância, sempre em linha reta ou na diagonal.
+            # As posições intermediárias são adicionadas ao vetor.
+            if self._metodo == "jps" and indice != -1:
+                y, x = self._indice2pos(anterior)
+                y_pai, x_pai = self._indice2pos(indice)
+                dy, dx = (y_pai > y) - (y_pai < y), (x_pai > x) - (x_pai < x)
+                for n in range(1, max(abs(y_pai - y), abs(x_pai - x))):
+                    vetor_caminho.append((y + n*dy, x + n*dx))
+
+        # É necessário inverter o vetor antes de retornar para que ele comece pelo ponto
+        # inicial e termine no de destino.
+        return vetor_caminho[::-1]
+
+    def _vetor_smoothing(self, vetor, n_pontos, passo=7):
+        """Aplica o algorítimo de suavização aos pontos de um vetor.
 
-    def _ponto_smoothing(self, vetor, indice, n_pontos):
-        """Aplica o algorítimo de suavização a um ponto.
+        Cada ponto suavizado é a média de *n_pontos* pontos consecutivos do vetor. As janelas começam
+        antes do primeiro ponto e terminam depois do último, e apenas os pontos que existem entram na
+        média. É retornado um ponto suavizado a cada *passo* janelas.
 
-        O ponto a ser suavizado é o determinado pelo *indice* do *vetor*. O algorítimo de suavização
-        é baseado na média dos seus *n_pontos* adjacentes.
+        As somas de todas as janelas são computadas de uma só vez pela convolução do vetor (um array
+        (N, 2) do Numpy) com um kernel de *n_pontos* uns. A quantidade de pontos de cada janela é obtida
+        da mesma forma, com um vetor de uns.
 
         Parameters
         ----------
         vetor : list
             Vetor com os pontos.
 
-        indice : int
-            Índice do ponto no *vetor*.
-
         n_pontos : int
             Quantidade de pontos adjacentes usados na suavização.
 
+        passo : int, default 7
+            Distância, em pontos do vetor, entre dois pontos suavizados.
+
         Returns
         -------
-        tuple
-            Ponto suavizado.
+        list
+            Lista com os pontos suavizados.
         """
-        valor = (0, 0)
-        divisor = 0
-        offset = int((n_pontos-1)/2)
-        vetor_tamanho = len(vetor)
+        # Se não conseguiu traçar um caminho, retorna None
+        if vetor == None:
+            return None
 
-        # Calcula a média dos elementos próximos do índice (quantidade de elementos próximos é definida por *n_pontos*)
-        for n in range(n_pontos):
-            i = indice + n - offset
+        pontos = np.array(vetor, dtype=np.int64).reshape(-1, 2)
+        kernel = np.ones(n_pontos, dtype=np.int64)
 
-            # Adiciona o ponto ao valor da média apenas se ele existir
-            if i >= 0 and i<vetor_tamanho:
-                divisor += 1
-                valor = (valor[0]+vetor[i][0], valor[1]+vetor[i][1])
+        # A posição k da convolução completa é a janela que termina no ponto k do vetor
+        somas = np.stack([np.convolve(pontos[:, 0], kernel), np.convolve(pontos[:, 1], kernel)], axis=1)
+        quantidades = np.convolve(np.ones(len(pontos), dtype=np.int64), kernel)
 
-        # Divide pelo valor de divisor para obter a média
-        valor = (int(valor[0]/divisor), int(valor[1]/divisor))
+        # A divisão inteira arredonda para baixo, assim como a conversão para int das coordenadas
+        # (sempre positivas)
+        novo_vetor = somas[::passo] // quantidades[::passo, np.newaxis]
 
-        return valor
+        return [tuple(ponto) for ponto in novo_vetor.tolist()]
 
-    def _vetor_smoothing(self, vetor, n_pontos):
-        """Aplica o algorítimo de suavização aos pontos de um vetor.
+    def _direcao_vetor(self, vetor, n_pontos, passo=7):
+        """Computa a direção inicial de um vetor de pontos.
 
-        O algorítimo de suavização é o mesmo usado pelo método :meth:`_ponto_smoothing()`.
+        A direção é a do primeiro até o terceiro ponto do vetor suavizado por :meth:`_vetor_smoothing()`.
+        O primeiro ponto suavizado é o primeiro ponto do vetor, e o terceiro é a média dos pontos da
+        janela que termina no ponto de índice 2*\ *passo*. Apenas esses pontos são computados.
 
         Parameters
         ----------
@@ -481,29 +971,43 @@ class AEstrela():
         n_pontos : int
             Quantidade de pontos adjacentes usados na suavização.
 
+        passo : int, default 7
+            Distância, em pontos do vetor, entre dois pontos suavizados.
+
         Returns
         -------
-        list
-            Lista com os pontos suavizados.
+        float or None
+            Ângulo da direção em radiano. Se o vetor for None, ou se os dois pontos forem iguais,
+            retorna None.
         """
-        # Se não conseguiu traçar um caminho, retorna None
         if vetor == None:
             return None
 
-        novo_vetor = []
-        offset = int((n_pontos-1)/2)
+        # Janela do terceiro ponto suavizado
+        fim_janela = min(2*passo, len(vetor) - 1)
+        inicio_janela = max(2*passo - n_pontos + 1, 0)
+
+        janela = vetor[inicio_janela:fim_janela + 1]
+        y_fim = sum(ponto[0] for ponto in janela)//len(janela)
+        x_fim = sum(ponto[1] for ponto in janela)//len(janela)
 
-        # Cada elemento do vetor
-        for indice in range(-offset, len(vetor) + offset, 7):
-            novo_vetor.append(self._ponto_smoothing(vetor, indice, n_pontos))
+        y_inicio, x_inicio = vetor[0]
 
-        return novo_vetor
+        dx = x_fim - x_inicio
+        dy = y_fim - y_inicio
+        d_pontos = math.sqrt(dx**2 + dy**2)
+
+        # Os pontos são iguais, então não há direção
+        if d_pontos == 0:
+            return None
+
+        return math.acos(dx/d_pontos)
 
     def _vetor_smoothing_media_movel(self, vetor, n_pontos):
         """Aplica o algorítimo de suavização aos pontos de um vetor. Usa média móvel.
 
         Funciona de forma similar ao método :meth:`_vetor_smoothing()`, mas o algorítimo de suavização
-        não é o mesmo do método :meth:`_ponto_smoothing()`. Utiliza média móvel ao invés disso.
+        não é o mesmo. Utiliza média móvel ao invés disso.
 
         Parameters
         ----------
@@ -601,99 +1105,108 @@ class AEstrela():
 
         return mapa
 
-    def _checa_pos_valida(self, pos):
-        """Checa se uma posição é valida para entrar na lista aberta.
-
-        A posição deve ser uma tupla do tipo (y, x).
-
-        Fatores considerados ao checar a validade:
+    def _pos2indice(self, pos):
+        """Converte uma posição (y, x) do mapa para o índice achatado do mapa com borda.
 
-        * se a posição é uma parede (ou já esteve na lista aberta)
-        * se a posição pertence ao mapa (não está extrapolando os limites)
+        Se a posição estiver fora do mapa, retorna -1. Nenhum ponto do mapa possui esse índice.
 
         Parameters
         ----------
         pos : tuple
-            Posição que será testada.
+            Posição no mapa.
 
         Returns
         -------
-        bool
-            Se a posição é valida para entrar na lista aberta (não é colidível).
+        int
+            Índice achatado da posição no mapa com borda.
         """
-        # Se está fora da região do mapa, é considerada inválida
+        # Se está fora da região do mapa, não possui índice
         if (pos[0] >= self._mapa_formato[0] or pos[0] < 0) or (pos[1] >= self._mapa_formato[1] or pos[1] < 0):
-            return False
+            return -1
 
-        elif self._mapa_checado[pos] == 1:
-            return False
-
-        else:
-            return True
+        return (pos[0] + 1)*self._largura_borda + pos[1] + 1
 
-    def _computa_custo(self, posicao_atual, custo_anterior, passo_diagonal=False):
-        """Computa o custo associado a uma posição do mapa.
+    def _indice2pos(self, indice):
+        """Converte um índice achatado do mapa com borda para a posição (y, x) do mapa.
 
-        O custo associado a uma posição é dado pelos seguintes fatores:
+        Parameters
+        ----------
+        indice : int
+            Índice achatado da posição no mapa com borda.
 
-        - Custo da posição anterior (pai)
-        - Custo do passo (mudança de posição)
-        - Custo da função heurística
-        - Custo da matriz de custo extra
+        Returns
+        -------
+        tuple
+            Posição no mapa.
+        """
+        y, x = divmod(int(indice), self._largura_borda)
 
-        O custo associado ao passo é definido ao instanciar o objeto. Veja o método
-        :meth:`__init__()` para mais detalhes.
+        return (y - 1, x - 1)
 
-        A matriz de custo extra é definida pelo método :meth:`define_mapas()`.
+    def _campo_heuristico(self, pos_fim):
+        """Retorna a função heurística de todos os pontos do mapa.
 
-        Se o passo (mudança de posição) ocorre na diagonal, o custo do passo é 0.414 vezes maior
-        (a diagonal de um quadrado é 1.414 vezes o seu lado).
+        O resultado é um vetor indexado pelo índice achatado do mapa com borda, de forma que a busca
+        apenas consulta os valores. Ele é obtido do cache, se o campo para esse destino e formato de mapa
+        já foi computado. Caso contrário, é computado pelo método :meth:`_computa_campo_heuristico()` e
+        adicionado ao cache, removendo o campo usado há mais tempo se o cache estiver cheio.
 
         Parameters
         ----------
-        posicao_atual : tuple
-            Posição atual do ponto.
-
-        custo_anterior : float
-            Custo do ponto anterior.
-
-        passo_diagonal : bool
-            Se o passo ocorre na diagonal.
+        pos_fim : tuple
+            Posição de destino do caminho no mapa.
 
         Returns
         -------
-        float
-            Custo do ponto atual.
+        numpy.ndarray
+            Custo associado a função heurística de cada ponto do mapa com borda.
         """
-        custo = custo_anterior + self._funcao_heuristica(posicao_atual) + self._passo
+        chave = (tuple(pos_fim), self._mapa_borda.shape)
 
-        # Se está na diagonal, o passo é 0.414 vezes maior
-        if passo_diagonal:
-            custo += self._passo*0.414
+        # Campo já computado
+        campo = self._cache_heuristica.get(chave)
+        if campo is not None:
+            self._cache_heuristica.move_to_end(chave)
+            return campo
 
-        # Aplica o mapa de custo
-        if self._mapa_custo is not None:
-            custo += self._mapa_custo[posicao_atual]
+        campo = self._computa_campo_heuristico(pos_fim)
+
+        if self._tamanho_cache > 0:
+            # O campo é compartilhado entre as buscas, então não pode ser alterado
+            campo.flags.writeable = False
+            self._cache_heuristica[chave] = campo
 
-        return custo
+            # Remove o campo usado há mais tempo
+            if len(self._cache_heuristica) > self._tamanho_cache:
+                self._cache_heuristica.popitem(last=False)
 
-    def _funcao_heuristica(self, pos_atual):
-        """Função heurística do modelo.
+        return campo
 
-        A função heurística aplicada nesse algorítimo consiste na distância entre os
-        dois pontos (atual e final).
+    def _computa_campo_heuristico(self, pos_fim):
+        """Computa a função heurística de todos os pontos do mapa.
+
+        A função heurística aplicada nesse algorítimo consiste na distância entre os dois pontos (atual e
+        final), multiplicada pelo custo do passo. A distância pode ser euclidiana ou octil, conforme definido
+        ao instanciar a classe. Em ambos os casos, ela nunca é maior que o custo real do caminho restante.
 
         Parameters
         ----------
-        pos_atual : tuple
-            Posição do ponto cujo custo da função heurística será computado.
+        pos_fim : tuple
+            Posição de destino do caminho no mapa.
 
         Returns
         -------
-        float
-            Custo associado a função heurística.
+        numpy.ndarray
+            Custo associado a função heurística de cada ponto do mapa com borda.
         """
-        return math.sqrt(
-                (pos_atual[0] - self._pos_fim[0])**2 +   # Distância do eixo y
-                abs(pos_atual[1] - self._pos_fim[1])**2  # Distância do eixo x
-                )
+        dy = np.abs(self._ys - pos_fim[0])
+        dx = np.abs(self._xs - pos_fim[1])
+
+        if self._heuristica == "octil":
+            # Passos diagonais enquanto for possível, e o restante em linha reta
+            return self._passo*(np.maximum(dy, dx) + 0.414*np.minimum(dy, dx))
+
+        # A distância euclidiana da diagonal (1.41421...) é um pouco maior que o custo do passo diagonal
+        # (1.414). A escala garante que a heurística nunca diminua mais que o custo de um passo
+        # (heurística consistente), condição necessária para os traçadores incrementais.
+        return (self._passo*1.414/math.sqrt(2))*np.sqrt(dy*dy + dx*dx)
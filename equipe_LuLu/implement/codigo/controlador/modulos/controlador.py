@@ -10,6 +10,8 @@ modo autônomo. Além de definir se o Wall-e deve ativar a sinalização.
 
 from simple_pid import PID
 from .aestrela import AEstrela
+from .ocupacao import GradeOcupacao
+from .desenho import RegistroDesenho
 import numpy as np
 import cv2 as cv
 import time
@@ -51,7 +53,9 @@ class Controlador():
 
     Agora quanto aos parâmetros opcionais, é possível especificar os parâmetros usados para expandir os mapas
     de regiões colidíveis com o método :meth:`parametros_expansao()` e os parâmetros usados para gerar a matriz
-    de custo por meio do método :meth:`parametros_custo()`
+    de custo por meio do método :meth:`parametros_custo()`. Os limites de tempo e de posições expandidas do
+    traçador de caminho são definidos pelo método :meth:`parametros_tracador()`. A fusão dos mapas de frames
+    sucessivos, que reduz o ruído da segmentação, é ativada pelo método :meth:`parametros_ocupacao()`.
 
     São aplicados dois controladores PID nas velocidades linear e angula (um para cada). Seus parâmetros
     podem ser configurados pelos métodos :meth:`parametros_PID_linear()` e :meth:`parametros_PID_angular()`. Se
@@ -63,12 +67,14 @@ class Controlador():
     Para verificar onde está ocorrendo a colisão, use o método :meth:`mostra_colisoes()`.
 
     Para checar o processamento do mapa atual, use o método :meth:`retorna_processamento_mapa()`.
+
+    O tempo de cada etapa do processamento do mapa atual é retornado pelo método :meth:`retorna_tempos()`.
     """
 
     def __init__(
             self, formato_mapa : tuple = (60, 60),
             posicoes_esquerda : list = None, blocos_tamanho : int = 3,
-            distancia_minima : int = 0
+            distancia_minima : int = 0, tracador_caminho : AEstrela = None
             ):
         """Inicialização do controlador.
 
@@ -93,6 +99,16 @@ class Controlador():
         parâmetro *distancia_minima*. Se a distância entre o objeto e o Wall-e for menor que *distancia_minima*, a
         sinalização será acionada conforme descrito no método :meth:`_calcula_sinalizacao()`.
 
+        O traçador de caminho pode ser definido pelo parâmetro *tracador_caminho*. Deve ser um objeto com a interface
+        da classe :class:`~codigo.controlador.modulos.aestrela.AEstrela`, como o traçador incremental
+        :class:`~codigo.controlador.modulos.lpaestrela.LPAEstrela`. Se for None, é usado o A*. Para mapas maiores
+        que 60x60, como 120x120 ou 240x240, é recomendado o traçador hierárquico
+        :class:`~codigo.controlador.modulos.hierarquico.AEstrelaHierarquico`.
+
+        Os parâmetros padrão da expansão e do mapa de custo (ver :meth:`parametros_expansao()` e
+        :meth:`parametros_custo()`) foram ajustados para mapas de 60x60. Para outros formatos, os kernels e sigmas
+        são escalados proporcionalmente à altura do mapa.
+
         Parameters
         ----------
         formato_mapa : tuple
@@ -106,6 +122,9 @@ class Controlador():
 
         distancia_minima : int
             Distância mínima entre os objetos detectados e o Wall-e.
+
+        tracador_caminho : AEstrela, default None
+            Traçador de caminho usado para alcançar o objeto. Se None, usa o A*.
         """
         # Atributos
         self._formato_mapa = formato_mapa
@@ -113,22 +132,78 @@ class Controlador():
         self._pos_inicial = (formato_mapa[0] - 1, formato_mapa[1]//2)  # Posição inicial
         self._distancia_minima = distancia_minima
 
-        # Atributos padrão do ajuste do mapa (deve funcionar bem para mapas de 60 por 60)
-        self._expansao_kernel = (19, 19)
-        self._expansao_sigma = 5
+        # Atributos padrão do ajuste do mapa. Foram ajustados para mapas de 60 por 60, e os kernels e
+        # sigmas são escalados proporcionalmente para outros formatos.
+        escala = formato_mapa[0]/60
+        kernel_expansao = 2*round(9*escala) + 1
+        kernel_custo = 2*round(10*escala) + 1
+
+        self._expansao_kernel = (kernel_expansao, kernel_expansao)
+        self._expansao_sigma = 5*escala
         self._expansao_offset = 0.8
-        self._custo_kernel = (21, 21)
-        self._custo_sigma = 7
+        self._custo_kernel = (kernel_custo, kernel_custo)
+        self._custo_sigma = 7*escala
         self._custo_multiplicador = 5.0
+        self._expansao_limiar = self._calcula_limiar_expansao(self._expansao_offset)
+
+        # Atributos do ajuste do mapa pela transformada de distância. Equivalem aproximadamente aos do
+        # filtro gaussiano perto de paredes extensas.
+        self._expansao_metodo = "gaussiano"
+        self._expansao_raio = 4*escala
+        self._custo_metodo = "gaussiano"
+        self._custo_alcance = 14*escala
+
+        # Área de trabalho do processamento do mapa. Os buffers são reaproveitados a cada frame para não
+        # alocar novos arrays. Veja o método :meth:`define_mapa()`.
+        altura, largura = formato_mapa
+        self._buffer_redimensionado = np.empty(formato_mapa, dtype=np.uint8)
+        self._buffer_escalado = np.empty(formato_mapa, dtype=np.uint8)
+        self._buffer_desfocado = np.empty(formato_mapa, dtype=np.uint8)
+        self._buffer_expandido = np.empty(formato_mapa, dtype=np.uint8)
+        self._buffer_expandido_original = np.empty(formato_mapa, dtype=np.uint8)
+        self._buffer_custo = np.empty(formato_mapa, dtype=np.float32)
+        self._buffer_distancia = np.empty(formato_mapa, dtype=np.float32)
+        self._buffer_integral = np.empty((altura + 1, largura + 1), dtype=np.int32)
+
+        # Imagem de debug. Os desenhos são registrados e só são feitos quando a imagem é pedida (ver o
+        # método :meth:`retorna_imagem_debug()`). A imagem vazia é criada apenas no primeiro pedido.
+        self._registro_debug = RegistroDesenho()
+        self._buffer_debug = None
+
+        # Grade de ocupação (fusão temporal dos mapas). Desativada por padrão.
+        self._grade_ocupacao = None
+
+        # Indica se os buffers do mapa expandido, do mapa de custo e da imagem integral correspondem ao mapa
+        # atual e aos parâmetros atuais. Nesse caso, podem ser reaproveitados se o mapa não mudar.
+        self._processamento_valido = False
+
+        # Indica se a região do objeto foi removida do buffer do mapa expandido. Nesse caso, o mapa expandido
+        # original está em _buffer_expandido_original.
+        self._expandido_alterado = False
+
+        # Versão do processamento do mapa (incrementada a cada novo processamento) e a chave (versão e região
+        # removida) dos mapas passados ao traçador de caminho. Se a chave não mudar, os mapas do traçador
+        # não precisam ser redefinidos.
+        self._versao_mapa = 0
+        self._chave_tracador = None
+
+        # Tempo das etapas do processamento do mapa atual (ns)
+        self._tempos = {}
 
         # Controle da velocidade linear e angular
         self._vel_linear = 0.0
         self._vel_angular = 0.0
         self._PID_linear = None
         self._PID_angular = None
+        self._PID_relogio = None
 
         # Configuração do traçador de caminho
-        self._tracador_caminho = AEstrela()
+        if tracador_caminho is None:
+            tracador_caminho = AEstrela()
+
+        self._tracador_caminho = tracador_caminho
+        self._tracador_max_expansoes = None
+        self._tracador_tempo_maximo = 0.05
 
         # Configuração da checagem de colisão
         if posicoes_esquerda is not None:
@@ -149,42 +224,99 @@ class Controlador():
             # self._blocos[self._n_blocos//2:] são os blocos da direita.
             self._n_blocos = len(self._blocos)
 
+            # Índices dos cantos de cada bloco na imagem integral (ver o método :meth:`_checa_colisoes()`).
+            # A imagem integral possui uma linha e uma coluna a mais que o mapa. Os blocos são recortados
+            # nos limites do mapa.
+            altura, largura = formato_mapa
+            blocos = np.array(self._blocos).reshape(-1, 2)
+            y0 = np.clip(blocos[:, 0], 0, altura)
+            x0 = np.clip(blocos[:, 1], 0, largura)
+            y1 = np.clip(blocos[:, 0] + blocos_tamanho, 0, altura)
+            x1 = np.clip(blocos[:, 1] + blocos_tamanho, 0, largura)
+
+            self._blocos_cantos = np.stack([
+                    y1*(largura + 1) + x1,  # Inferior direito
+                    y0*(largura + 1) + x1,  # Superior direito
+                    y1*(largura + 1) + x0,  # Inferior esquerdo
+                    y0*(largura + 1) + x0   # Superior esquerdo
+                    ])
+            self._blocos_area = (y1 - y0)*(x1 - x0)
+
         # Limpa os atributos da iteração
         self._reinicia_iteracao()
 
-    def parametros_expansao(self, kernel : tuple, sigma : int, offset : float):
+    def parametros_expansao(
+            self, kernel : tuple = None, sigma : int = None, offset : float = None,
+            metodo : str = None, raio : float = None
+            ):
         """Configura os parâmetros usados para expandir a imagem.
 
-        A expansão do mapa é feita por meio de um filtro gaussiano. Os parâmetros ajustados por esse método
-        são referentes a esse filtro. O parâmetro *kernel* é o tamanho do kernel, e o parâmetro *sigma* é o
-        sigma do filtro gaussiano.
+        A expansão do mapa pode ser feita de duas formas, escolhidas pelo parâmetro *metodo*:
+
+        * "gaussiano" (padrão): por meio de um filtro gaussiano. O parâmetro *kernel* é o tamanho do kernel,
+          e o parâmetro *sigma* é o sigma do filtro gaussiano. O parâmetro *offset* é o valor de offset
+          aplicados aos valores do mapa. Naturalmente, o valor de uma posição do mapa varia de 0.0 até 1.0.
+          O offset é aplicado a esse valor. Apenas se passar de 1.0, será considerado região colidível.
+        * "distancia": por meio da transformada de distância (:func:`cv.distanceTransform`). As posições
+          a até *raio* posições (distância euclidiana) de uma parede são consideradas colidíveis. O tempo
+          de processamento não depende do raio, diferente do filtro gaussiano, cujo tempo cresce com o
+          kernel. É indicado para mapas maiores que 60x60.
 
-        O parâmetro *offset* é o valor de offset aplicados aos valores do mapa. Naturalmente, o valor de
-        uma posição do mapa varia de 0.0 até 1.0. O offset é aplicado a esse valor. Apenas se passar de 1.0,
-        será considerado região colidível.
+        Os parâmetros None mantêm o valor atual.
 
         Parameters
         ----------
-        kernel : tuple
+        kernel : tuple, default None
             Tamanho do kernel do filtro gaussiano usado para expandir o mapa.
 
-        sigma : int
+        sigma : int, default None
             Sigma do filtro gaussiano usado para expandir o mapa.
 
-        offset : float
+        offset : float, default None
             Offset aplicado aos valores do mapa. Se o valor de um ponto passar de 1.0, será considerado colidível.
+
+        metodo : str, default None
+            Método de expansão: "gaussiano" ou "distancia".
+
+        raio : float, default None
+            Raio da expansão pela transformada de distância, em posições do mapa.
         """
-        self._expansao_kernel = kernel
-        self._expansao_sigma = sigma
-        self._expansao_offset = offset
+        if metodo is not None and metodo not in ("gaussiano", "distancia"):
+            raise ValueError(f"Método de expansão desconhecido: {metodo}")
+
+        self._processamento_valido = False
+
+        if kernel is not None:
+            self._expansao_kernel = kernel
+
+        if sigma is not None:
+            self._expansao_sigma = sigma
 
-    def parametros_custo(self, kernel : tuple, sigma : int, multiplicador : float):
+        if offset is not None:
+            self._expansao_offset = offset
+            self._expansao_limiar = self._calcula_limiar_expansao(offset)
+
+        if metodo is not None:
+            self._expansao_metodo = metodo
+
+        if raio is not None:
+            self._expansao_raio = raio
+
+    def parametros_custo(
+            self, kernel : tuple = None, sigma : int = None, multiplicador : float = None,
+            metodo : str = None, alcance : float = None
+            ):
         """Configura os parâmetros usados para expandir a imagem.
 
         O mapa de custo é gerado e forma semelhante à expansão do mapa (ver método :meth:`parametros_expansao()`).
         Também é usado um filtro gaussiano. A diferença é não haver um offset aplicado a cada ponto, mas sim
         uma operação de multiplicação. O valor multiplicado ao mapa é definido pelo parâmetro *multiplicador*.
 
+        Se o parâmetro *metodo* for "distancia", o filtro gaussiano é substituído pela transformada de
+        distância do mapa expandido. O custo de uma posição é ``255*multiplicador*(1 - d/alcance)``, em que
+        *d* é a distância até a parede mais próxima, e é zero a partir do *alcance*. Assim como na expansão,
+        o tempo de processamento não depende do alcance. Os parâmetros None mantêm o valor atual.
+
         O mapa de custo trabalha com valores de ponto flutuante. Diferente do mapa de colisões.
 
         O mapa de custo é aplicado diretamente ao algorítmo A-estrela pelo método
@@ -202,10 +334,114 @@ class Controlador():
 
         multiplicador : float
             Multiplicador aplicado aos valores do mapa de custo.
+
+        metodo : str, default None
+            Método de geração do mapa de custo: "gaussiano" ou "distancia".
+
+        alcance : float, default None
+            Distância, em posições do mapa, a partir da qual o custo é zero no método "distancia".
         """
-        self._custo_kernel = kernel
-        self._custo_sigma = sigma
-        self._custo_multiplicador = multiplicador
+        if metodo is not None and metodo not in ("gaussiano", "distancia"):
+            raise ValueError(f"Método do mapa de custo desconhecido: {metodo}")
+
+        self._processamento_valido = False
+
+        if kernel is not None:
+            self._custo_kernel = kernel
+
+        if sigma is not None:
+            self._custo_sigma = sigma
+
+        if multiplicador is not None:
+            self._custo_multiplicador = multiplicador
+
+        if metodo is not None:
+            self._custo_metodo = metodo
+
+        if alcance is not None:
+            self._custo_alcance = alcance
+
+    def parametros_tracador(self, max_expansoes : int = None, tempo_maximo : float = 0.05):
+        """Configura os limites da busca do traçador de caminho.
+
+        Se o objeto estiver longe ou em uma região inalcançável, o traçador pode demorar mais que o tempo
+        de um frame. Os limites garantem que um frame ruim não atrase os comandos enviados ao Wall-e.
+
+        O parâmetro *tempo_maximo* é o tempo máximo, em segundos, para computar a direção do objeto. O
+        parâmetro *max_expansoes* é a quantidade máxima de posições expandidas pelo traçador. Se algum
+        dos limites for atingido, a direção é computada a partir do caminho parcial até a posição mais
+        próxima do objeto. Veja o método :meth:`~codigo.controlador.modulos.aestrela.AEstrela.gera_caminho()`.
+
+        Por padrão, o tempo máximo é de 0.05 segundos e não há limite de posições expandidas.
+
+        Parameters
+        ----------
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Se None, não há limite.
+
+        tempo_maximo : float, default 0.05
+            Tempo máximo, em segundos, para traçar o caminho. Se None, não há limite.
+        """
+        self._tracador_max_expansoes = max_expansoes
+        self._tracador_tempo_maximo = tempo_maximo
+
+    def parametros_ocupacao(
+            self, ativa : bool = True, ganho_ocupado : float = 1.5, ganho_livre : float = -0.5, limite : float = 2.0
+            ):
+        """Configura a fusão temporal dos mapas recebidos.
+
+        Sem a fusão, cada mapa substitui o anterior, e o ruído da segmentação de um único frame pode mudar o
+        caminho traçado. Com a fusão ativa, os mapas recebidos são combinados em uma grade de ocupação
+        (:class:`~codigo.controlador.modulos.ocupacao.GradeOcupacao`), e o controlador usa o mapa da grade.
+        Os parâmetros *ganho_ocupado*, *ganho_livre* e *limite* são os da grade.
+
+        Com a fusão ativa, se nenhuma posição do mapa mudar em relação ao frame anterior, o mapa expandido,
+        o mapa de custo e a checagem de colisão reaproveitam o processamento anterior. As posições alteradas
+        são retornadas pelo método :meth:`retorna_posicoes_alteradas()`.
+
+        Configurar a fusão apaga o histórico da grade.
+
+        Parameters
+        ----------
+        ativa : bool, default True
+            Se False, desativa a fusão.
+
+        ganho_ocupado : float, default 1.5
+            Valor somado ao log-odds das posições que são paredes no mapa recebido.
+
+        ganho_livre : float, default -0.5
+            Valor somado ao log-odds das posições livres no mapa recebido.
+
+        limite : float, default 2.0
+            Valor máximo do módulo do log-odds.
+        """
+        if ativa:
+            self._grade_ocupacao = GradeOcupacao(self._formato_mapa, ganho_ocupado, ganho_livre, limite)
+
+        else:
+            self._grade_ocupacao = None
+
+        self._processamento_valido = False
+
+    def parametros_relogio_PID(self, relogio : callable = None):
+        """Define o relógio usado pelos controladores PID.
+
+        Os controladores PID usam o tempo entre duas chamadas para calcular os termos integral e derivativo.
+        Por padrão, é usado o relógio do sistema (:func:`time.monotonic()`). Em uma simulação, em que os passos
+        são executados mais rápido que o tempo real, deve ser fornecido o relógio da simulação. Os controladores
+        existentes são reiniciados.
+
+        Parameters
+        ----------
+        relogio : callable, default None
+            Função sem parâmetros que retorna o instante atual, em segundos. Se None, usa o relógio do sistema.
+        """
+        self._PID_relogio = relogio
+
+        for pid in (self._PID_linear, self._PID_angular):
+            if pid is not None:
+                pid.time_fn = relogio if relogio is not None else time.monotonic
+                pid.reset()
 
     def parametros_PID_linear(self, Kp : float, Ki : float, Kd : float):
         """Configura os parâmetros usados pelo PID da velocidade linear.
@@ -225,7 +461,7 @@ class Controlador():
         """
         # Se não existir o PID, cria-o
         if self._PID_linear == None:
-            self._PID_linear = PID(Kp, Ki, Kd)
+            self._PID_linear = PID(Kp, Ki, Kd, time_fn=self._PID_relogio)
             self._PID_linear.output_limits = (-100, 100)
 
         else:
@@ -249,7 +485,7 @@ class Controlador():
         """
         # Se não existir o PID, cria-o
         if self._PID_angular == None:
-            self._PID_angular = PID(Kp, Ki, Kd)
+            self._PID_angular = PID(Kp, Ki, Kd, time_fn=self._PID_relogio)
             self._PID_angular.output_limits = (-100, 100)
 
         else:
@@ -396,7 +632,10 @@ class Controlador():
 
         # Caminho traçado pelo A*
         self._tracador_caminho.define_mapas(self._mapa_expandido, self._custo)
-        mapa_caminho = self._tracador_caminho.gera_caminho_mapa_smoothing(self._pos_inicial, pos_objeto)
+        self._chave_tracador = None
+        mapa_caminho = self._tracador_caminho.gera_caminho_mapa_smoothing(
+                self._pos_inicial, pos_objeto, self._tracador_max_expansoes, self._prazo_tracador()
+                )
         mapa_checados = self._tracador_caminho.retorna_mapa_checados()
 
         # Se não consegue traçar um caminho
@@ -420,9 +659,16 @@ class Controlador():
         Se o *mapa* for None, não será atualizado. Será utilizado o mapa anterior. For fornecido um novo mapa,
         o fluxo do controlador é reiniciado, inclusindo a antiga imagem de debug.
 
+        O processamento não aloca novos arrays: os resultados são escritos em buffers criados em :meth:`__init__()`
+        pelos parâmetros *dst* do OpenCV e *out* do Numpy. A expansão do mapa é um filtro gaussiano seguido de um
+        limiar (ver :meth:`_calcula_limiar_expansao()`), e o mapa de custo é outro filtro gaussiano seguido de uma
+        multiplicação (ou transformadas de distância, ver :meth:`parametros_expansao()` e :meth:`parametros_custo()`).
+        Como os buffers são reaproveitados, os mapas de um frame são sobrescritos no frame seguinte.
+
         É possível passar uma image de debug pelo parâmetro *imagem_debug* para que o controlador possa
-        mostrar as informações. Se não for fornecida, será criado uma imagem de debug vazia. A imagem de debug
-        deve ser estar de acordo com o padrão do OpenCV e ser do tipo BGR.
+        mostrar as informações. Se não for fornecida, será usada uma imagem de debug vazia. A imagem de debug
+        deve ser estar de acordo com o padrão do OpenCV e ser do tipo BGR. Os desenhos só são feitos na
+        imagem quando ela é pedida pelo método :meth:`retorna_imagem_debug()`.
 
         Parameters
         ----------
@@ -437,29 +683,55 @@ class Controlador():
         if mapa is not None:
             # Apaga os dados da iteracao anterior
             self._reinicia_iteracao()
+            inicio = time.perf_counter_ns()
 
             # salva o formato original do mapa
             self._formato_mapa_recebido = mapa.shape
 
             # Ajusta a mapa para ser usada no algorítimo controlador
             if mapa.shape != self._formato_mapa:
-                mapa = cv.resize(mapa, self._formato_mapa)
+                mapa = cv.resize(mapa, self._formato_mapa, dst=self._buffer_redimensionado)
+
+            # Funde o mapa aos anteriores. Se nada mudou, o processamento do frame anterior é reaproveitado.
+            reaproveita = False
+            if self._grade_ocupacao is not None:
+                mapa = self._grade_ocupacao.atualiza(mapa)
+                reaproveita = self._processamento_valido and not self._grade_ocupacao.houve_alteracao()
 
             self._mapa = mapa
 
-            # Aumenta a área das regiões colidíveis (paredes)
-            self._mapa_expandido = cv.GaussianBlur(mapa*255, self._expansao_kernel, self._expansao_sigma)
-            self._mapa_expandido = np.floor(self._mapa_expandido/255 + self._expansao_offset)
-            self._mapa_expandido = np.array(self._mapa_expandido, dtype=np.uint8)
+            if reaproveita:
+                self._integral = self._buffer_integral
+                self._custo = self._buffer_custo
 
-            # Mapa de custo
-            self._custo = cv.GaussianBlur(self._mapa_expandido*255, self._custo_kernel, self._custo_sigma)
-            self._custo = self._custo.astype(np.float32)*self._custo_multiplicador
+                # Desfaz a remoção da região do objeto do frame anterior
+                if self._expandido_alterado:
+                    np.copyto(self._buffer_expandido, self._buffer_expandido_original)
+                    self._expandido_alterado = False
 
-            # Limpa a imagem de debug
+                self._mapa_expandido = self._buffer_expandido
+
+            else:
+                self._versao_mapa += 1
+                self._expandido_alterado = False
+
+                # Imagem integral (tabela de somas de área) do mapa, usada na checagem de colisão
+                self._integral = cv.integral(mapa, sum=self._buffer_integral, sdepth=cv.CV_32S)
+
+                # Aumenta a área das regiões colidíveis (paredes)
+                self._mapa_expandido = self._expande_mapa(mapa)
+
+                # Mapa de custo
+                self._custo = self._computa_custo(self._mapa_expandido)
+
+            # O processamento só pode ser reaproveitado se os mapas vierem da grade de ocupação
+            self._processamento_valido = self._grade_ocupacao is not None
+            self._tempos["mapa"] = time.perf_counter_ns() - inicio
+
+            # Descarta os desenhos do frame anterior. A imagem de debug vazia só é criada quando for pedida.
+            self._registro_debug.limpa()
             if imagem_debug is None:
-                self._imagem_debug = np.zeros(self._formato_mapa + (3,), dtype=np.uint8)
-                self._formato_img_debug = self._imagem_debug.shape
+                self._formato_img_debug = self._formato_mapa + (3,)
 
         # Usa a imagem de debug definida
         if imagem_debug is not None:
@@ -490,18 +762,154 @@ class Controlador():
         """
         return np.zeros(fomato, dtype=np.uint8)
 
+    def retorna_posicoes_alteradas(self):
+        """Retorna as posições do mapa que mudaram em relação ao frame anterior.
+
+        Só está disponível com a fusão temporal ativa (ver :meth:`parametros_ocupacao()`).
+
+        Returns
+        -------
+        numpy.ndarray or None
+            Máscara (uint8) com 1 nas posições alteradas do mapa (antes da expansão). Se a fusão estiver
+            desativada, retorna None.
+        """
+        if self._grade_ocupacao is None:
+            return None
+
+        return self._grade_ocupacao.retorna_alteradas()
+
+    def retorna_tempos(self):
+        """Retorna o tempo de cada etapa do processamento do mapa atual.
+
+        As etapas são "mapa" (redimensionamento, fusão, expansão e mapa de custo, em :meth:`define_mapa()`),
+        "tracador" (traçador de caminho até o objeto) e "pid" (controladores PID). Apenas as etapas executadas
+        para o mapa atual estão presentes.
+
+        Returns
+        -------
+        dict
+            Dicionário com o nome de cada etapa e sua duração em nanossegundos.
+        """
+        return self._tempos
+
     def retorna_imagem_debug(self):
         """Retorna a imagem de debug.
 
         Retorna a imagem de debug com os resultados do processamento do mapa. Veja o método
         :meth:`_desenha_debug_colisoes()` e :meth:`_desenha_debug_direcao()` para mais informações.
 
+        Os desenhos registrados desde o último pedido são feitos na imagem por esse método. Se nenhuma imagem
+        de debug foi fornecida ao :meth:`define_mapa()`, a imagem vazia é criada no primeiro pedido. Ela é
+        reaproveitada e sobrescrita nos frames seguintes. Use uma cópia para guardá-la.
+
         Returns
         -------
         numpy.ndarray
             Imagem de debug.
         """
-        return self._imagem_debug
+        # Imagem de debug vazia
+        if self._imagem_debug is None:
+            if self._buffer_debug is None:
+                self._buffer_debug = np.empty(self._formato_mapa + (3,), dtype=np.uint8)
+
+            self._buffer_debug.fill(0)
+            self._imagem_debug = self._buffer_debug
+
+        return self._registro_debug.rasteriza(self._imagem_debug)
+
+    def _expande_mapa(self, mapa):
+        """Aumenta a área das regiões colidíveis (paredes) do mapa.
+
+        No método "gaussiano", o mapa desfocado é comparado diretamente com o limiar. No método "distancia",
+        é computada a distância de cada posição livre até a parede mais próxima. Veja o método
+        :meth:`parametros_expansao()`.
+
+        Parameters
+        ----------
+        mapa : numpy.ndarray
+            Mapa no formato do controlador.
+
+        Returns
+        -------
+        numpy.ndarray
+            Mapa expandido. É o buffer ``_buffer_expandido``.
+        """
+        if self._expansao_metodo == "distancia":
+            # A transformada de distância mede a distância até a posição zero mais próxima (as paredes)
+            cv.compare(mapa, 0, cv.CMP_EQ, dst=self._buffer_escalado)
+            cv.distanceTransform(self._buffer_escalado, cv.DIST_L2, cv.DIST_MASK_PRECISE, dst=self._buffer_distancia)
+            cv.compare(self._buffer_distancia, self._expansao_raio, cv.CMP_LE, dst=self._buffer_expandido)
+            np.bitwise_and(self._buffer_expandido, 1, out=self._buffer_expandido)
+
+        else:
+            np.multiply(mapa, 255, out=self._buffer_escalado, casting="unsafe")
+            cv.GaussianBlur(self._buffer_escalado, self._expansao_kernel, self._expansao_sigma, dst=self._buffer_desfocado)
+            cv.threshold(self._buffer_desfocado, self._expansao_limiar, 1, cv.THRESH_BINARY, dst=self._buffer_expandido)
+
+        return self._buffer_expandido
+
+    def _computa_custo(self, mapa_expandido):
+        """Computa o mapa de custo a partir do mapa expandido.
+
+        Veja o método :meth:`parametros_custo()`.
+
+        Parameters
+        ----------
+        mapa_expandido : numpy.ndarray
+            Mapa expandido.
+
+        Returns
+        -------
+        numpy.ndarray
+            Mapa de custo (float32). É o buffer ``_buffer_custo``.
+        """
+        custo = self._buffer_custo
+
+        if self._custo_metodo == "distancia":
+            cv.compare(mapa_expandido, 0, cv.CMP_EQ, dst=self._buffer_escalado)
+            cv.distanceTransform(self._buffer_escalado, cv.DIST_L2, cv.DIST_MASK_PRECISE, dst=custo)
+
+            # Decaimento linear: 255*multiplicador nas paredes e zero a partir do alcance
+            np.multiply(custo, -1/self._custo_alcance, out=custo)
+            np.add(custo, 1, out=custo)
+            np.maximum(custo, 0, out=custo)
+            np.multiply(custo, 255*self._custo_multiplicador, out=custo)
+
+        else:
+            np.multiply(mapa_expandido, 255, out=self._buffer_escalado)
+            cv.GaussianBlur(self._buffer_escalado, self._custo_kernel, self._custo_sigma, dst=self._buffer_desfocado)
+            # O multiplicador é arredondado para float32, como na multiplicação de arrays float32 do Numpy
+            multiplicador = float(np.float32(self._custo_multiplicador))
+            cv.multiply(self._buffer_desfocado, multiplicador, dst=custo, dtype=cv.CV_32F)
+
+        return custo
+
+    def _calcula_limiar_expansao(self, offset):
+        """Computa o limiar equivalente à expansão do mapa.
+
+        Uma posição do mapa desfocado (uint8) com valor *v* é colidível se ``floor(v/255 + offset) >= 1``.
+        Como essa expressão cresce com *v*, ela equivale a comparar *v* com um limiar. O limiar é obtido
+        avaliando a expressão para todos os 256 valores possíveis, então o resultado é idêntico ao da
+        expressão original.
+
+        Parameters
+        ----------
+        offset : float
+            Offset aplicado aos valores do mapa. Veja :meth:`parametros_expansao()`.
+
+        Returns
+        -------
+        float
+            Limiar usado por :func:`cv.threshold()`: os valores maiores que ele são colidíveis.
+        """
+        valores = np.arange(256)
+        colidiveis = np.flatnonzero(np.floor(valores/255 + offset) >= 1)
+
+        # Nenhum valor é colidível
+        if colidiveis.size == 0:
+            return 255.5
+
+        return colidiveis[0] - 0.5
 
     def _reinicia_iteracao(self):
         """Reinicia a iteração do controlador.
@@ -522,6 +930,7 @@ class Controlador():
         self._colisoes = None
         self._debug_colisoes_adicionado = False
         self._regiao_removida = False
+        self._regiao_objeto = None
 
         # Checagem de direção
         self._linear = None
@@ -536,6 +945,9 @@ class Controlador():
         # Debug
         self._imagem_debug = None
 
+        # Tempo das etapas
+        self._tempos.clear()
+
     def _pos_original2mapa(self, pos: tuple):
         """Transforma uma posição da imagem original para a do mapa.
 
@@ -605,40 +1017,19 @@ class Controlador():
 
         return y, x
 
-    def _checa_colisao_bloco(self, pos: tuple, tamanho):
-        """Checa se houve colisão em um bloco.
-
-        A posição onde será checado deve ser uma tupla do tipo (y, x) indicando o ponto superior esquerdo do bloco.
-        O tamanho do bloco é dado pelo parâmetro *tamanho*. Esse é o valor da altura e largura do bloco.
-
-        Parameters
-        ----------
-        pos : tuple
-            Posição do bloco.
-
-        tamanho : int
-            Tamanho do bloco. Altura e largura.
-
-        Returns
-        -------
-        True se houve colisão, False caso contrário.
-        """
-        # Extrai a região que será checada do mapa
-        regiao = self._mapa[pos[0]:pos[0]+tamanho, pos[1]:pos[1]+tamanho]
-
-        # Calcula a média dos valores dessa região
-        regiao = np.reshape(regiao, -1)
-        media = np.mean(regiao)
-
-        # Considerá que colidiu se mais da metade da região for colidível
-        return media > 0.5
-
     def _checa_colisoes(self):
         """Checa as colisões no mapa.
 
         As posições checadas são as definidas ao instanciar o objeto. Assim como o tamanho do bloco.
 
-        Verifica as colisões e retorna uma lista com o identificador de cada colisão (True ou False).
+        Verifica as colisões e retorna uma lista com o identificador de cada colisão (True ou False). Considera
+        que um bloco colidiu se mais da metade da sua região for colidível.
+
+        A quantidade de posições colidíveis de cada bloco é obtida da imagem integral do mapa, computada uma
+        única vez por mapa em :meth:`define_mapa()`. Cada posição da imagem integral contém a soma de todas as
+        posições do mapa acima e à esquerda dela. Assim, a soma de um bloco é obtida com quatro consultas,
+        nos seus cantos, independente do tamanho do bloco. As consultas de todos os blocos são feitas de uma
+        só vez com os índices dos cantos computados em :meth:`__init__()`.
 
         Returns
         -------
@@ -650,10 +1041,12 @@ class Controlador():
         if self._colisoes is not None:
             return self._colisoes
 
-        # Checa a colisão
-        colisoes = []
-        for pos in self._blocos:
-            colisoes.append(self._checa_colisao_bloco(pos, self._blocos_tamanho))
+        # Soma das posições colidíveis de cada bloco
+        d, b, c, a = self._integral.ravel()[self._blocos_cantos]
+        soma = d - b - c + a
+
+        # Checa a colisão. Um bloco fora do mapa (área 0) não colide.
+        colisoes = (2*soma > self._blocos_area).tolist()
 
         # Salva as colisões no atributo
         self._colisoes = colisoes
@@ -664,16 +1057,12 @@ class Controlador():
         """Desenha as colisões na imagem de debug.
 
         As regiões colidindo são marcadas com amarelo, e as regiões não colidindo marcadas com azul.
-        A imagem de debug é retornada.
-
-        Returns
-        -------
-        numpy.ndarray
-            Imagem de debug.
+        Os desenhos são registrados e feitos apenas quando a imagem de debug for pedida (ver
+        :meth:`retorna_imagem_debug()`).
         """
         # Não adiciona o debug das colisões mais de uma vez
         if self._debug_colisoes_adicionado:
-            return self._imagem_debug
+            return
 
         colisoes = self._checa_colisoes()
 
@@ -697,12 +1086,10 @@ class Controlador():
             pos_inicial = self._pos_mapa2dbg(info[0])
             pos_final = self._pos_mapa2dbg(pos_final)
 
-            cv.rectangle(self._imagem_debug, pos_inicial[::-1], pos_final[::-1], cor, cv.FILLED)
+            self._registro_debug.adiciona(cv.rectangle, pos_inicial[::-1], pos_final[::-1], cor, cv.FILLED)
 
         self._debug_colisoes_adicionado = True
 
-        return self._imagem_debug
-
     def _calcula_sinalizacao(self, pos_objeto: tuple = None):
         """Verifica se o Wall-e deve acionar a sinalização.
         
@@ -834,6 +1221,7 @@ class Controlador():
                     self._alcancar_objeto = True  # Mostra o caminho no modo de debug
 
         # Aplica os PID à velocidade linear e angular
+        inicio = time.perf_counter_ns()
         if self._PID_linear != None:
             self._PID_linear.setpoint = linear  # Velocidade linear desejada
 
@@ -846,6 +1234,8 @@ class Controlador():
             self._vel_angular = self._PID_angular(self._vel_angular)
             angular = int(self._vel_angular)
 
+        self._tempos["pid"] = time.perf_counter_ns() - inicio
+
         # Identificação do lixo. Se estiver muito próximo, o Wall-e deve parar
         if self._calcula_sinalizacao(pos_objeto):
             linear = 0
@@ -893,8 +1283,14 @@ class Controlador():
         if x < 0:
             w, x = w+x, 0
 
+        # Guarda o mapa expandido original, para que possa ser reaproveitado no próximo frame
+        if not self._expandido_alterado:
+            np.copyto(self._buffer_expandido_original, self._mapa_expandido)
+            self._expandido_alterado = True
+
         # Remove a região
         self._mapa_expandido[y:y+h, x:x+w] = np.zeros((h, w), dtype=np.uint8)
+        self._regiao_objeto = (y, x, h, w)
 
     def _calcula_direcao_objeto(self, pos_final):
         """Calcula a direção que deve percorrer para alcançar um objeto.
@@ -915,9 +1311,23 @@ class Controlador():
         if self._direcao is not None and self._pos_final == pos_final:
             return self._direcao
 
-        # Calcula a direção do que o Wall-e deve se mover. O traçador retorna None se não conseguir traçar um caminho
-        self._tracador_caminho.define_mapas(self._mapa_expandido, self._custo)
-        direcao = self._tracador_caminho.retorna_direcao_inicial(self._pos_inicial, pos_final, rad=True)
+        # O prazo inclui a preparação dos mapas do traçador
+        inicio = time.perf_counter_ns()
+        prazo = self._prazo_tracador()
+
+        # Os mapas do traçador só são redefinidos se mudaram desde a última busca, ou se ela foi interrompida
+        # por um dos limites (o caminho seria reaproveitado sem continuar a busca)
+        chave = (self._versao_mapa, self._regiao_objeto)
+        if chave != self._chave_tracador or not self._tracador_caminho.retorna_busca_completa():
+            self._tracador_caminho.define_mapas(self._mapa_expandido, self._custo)
+            self._chave_tracador = chave
+
+        # Calcula a direção do que o Wall-e deve se mover. O traçador retorna None se não conseguir traçar um caminho.
+        # Se atingir um dos limites, a direção é a do caminho parcial.
+        direcao = self._tracador_caminho.retorna_direcao_inicial(
+                self._pos_inicial, pos_final, True, self._tracador_max_expansoes, prazo
+                )
+        self._tempos["tracador"] = time.perf_counter_ns() - inicio
 
         # Salva a direção e posição em atributos
         self._direcao = direcao
@@ -925,6 +1335,22 @@ class Controlador():
 
         return direcao
 
+    def _prazo_tracador(self):
+        """Retorna o instante em que o traçador de caminho deve interromper a busca.
+
+        O instante é dado no relógio de :func:`time.perf_counter()`, a partir do tempo máximo definido
+        em :meth:`parametros_tracador()`.
+
+        Returns
+        -------
+        float or None
+            Prazo da busca. Se não houver tempo máximo, retorna None.
+        """
+        if self._tracador_tempo_maximo is None:
+            return None
+
+        return time.perf_counter() + self._tracador_tempo_maximo
+
     def _desenha_debug_direcao(self, pos_objeto):
         """Desenha a direção do caminho que deve seguir na imagem de debug.
 
@@ -938,20 +1364,17 @@ class Controlador():
 
         Se estiver sinalizando a identificação do lixo, escreve a mensagem "Sinalizando!" com letras azuis.
 
+        Os desenhos são registrados e feitos apenas quando a imagem de debug for pedida (ver
+        :meth:`retorna_imagem_debug()`).
+
         Parameters
         ----------
         pos_objeto : tuple
             Posição de destino do caminho. Onde está o objeto que deve ser seguido.
-
-        Returns
-        -------
-        np.ndarray
-            Imagem de debug com o indicador da velocidade linear e angular que o Wall-e deve seguir.
-            Se conseguiu traçar um caminho entre o ponto de início e a *pos_objeto*, mostra esse caminho também.
         """
         # Não adiciona o debug da direção mais de uma vez
         if self._debug_direcao_adicionado:
-            return self._imagem_debug
+            return
 
         # Caminho traçado pelo A* (apenas se conseguiu traçar)
         if self._alcancar_objeto:
@@ -961,7 +1384,7 @@ class Controlador():
             mapa_caminho = cv.cvtColor(mapa_caminho*255, cv.COLOR_GRAY2BGR)
             mapa_caminho = cv.resize(mapa_caminho, (self._formato_img_debug[:2][::-1]))
 
-            self._imagem_debug = cv.bitwise_or(self._imagem_debug, mapa_caminho)
+            self._registro_debug.sobrepoe(mapa_caminho)
 
         # Ajusta o tamanho da reta
         dx = - self._angular * self._formato_mapa[1] // 500
@@ -983,30 +1406,30 @@ class Controlador():
         # convertê-los antes de desenhar a linha
         espessura_linha = self._formato_img_debug[0] // 60 + 1
         raio_circulo = self._formato_img_debug[0] // 50 + 1
-        cv.line(self._imagem_debug, pos_meio[::-1], pos_final[::-1], (255, 0, 255), espessura_linha)
-        cv.circle(self._imagem_debug, pos_meio[::-1], raio_circulo, (255, 0, 255), cv.FILLED)
+        self._registro_debug.adiciona(cv.line, pos_meio[::-1], pos_final[::-1], (255, 0, 255), espessura_linha)
+        self._registro_debug.adiciona(cv.circle, pos_meio[::-1], raio_circulo, (255, 0, 255), cv.FILLED)
 
         if pos_objeto is not None:
             # Desenha um '+' na posição do objeto
             pos_marcador = self._pos_mapa2dbg(pos_objeto[:2])
-            cv.drawMarker(
-                    self._imagem_debug, pos_marcador[::-1], (200, 0, 200),
+            self._registro_debug.adiciona(
+                    cv.drawMarker, pos_marcador[::-1], (200, 0, 200),
                     cv.MARKER_CROSS, espessura_linha*3, espessura_linha
                     )
 
             # Desenha um retângulo ao redor do marcador
             pos_inicial = (pos_marcador[0]-pos_objeto[2]//2, pos_marcador[1]-pos_objeto[3]//2)
             pos_final = (pos_marcador[0]+pos_objeto[2]//2, pos_marcador[1]+pos_objeto[3]//2)
-            cv.rectangle(self._imagem_debug, pos_inicial[::-1], pos_final[::-1], (200, 0, 200), espessura_linha//4+1)
+            self._registro_debug.adiciona(
+                    cv.rectangle, pos_inicial[::-1], pos_final[::-1], (200, 0, 200), espessura_linha//4+1
+                    )
 
         # Escreve uma mensagem de sinalização quando o Wall-e está próximo do lixo
         if self._calcula_sinalizacao(pos_objeto):
             escala_fonte = self._formato_img_debug[1] / 500
-            cv.putText(
-                    self._imagem_debug, "Sinalizando!", (10, 30), cv.FONT_HERSHEY_SIMPLEX,
+            self._registro_debug.adiciona(
+                    cv.putText, "Sinalizando!", (10, 30), cv.FONT_HERSHEY_SIMPLEX,
                     escala_fonte, (255, 0, 0), espessura_linha//4+1, cv.LINE_AA
                     )
 
         self._debug_direcao_adicionado = True
-
-        return self._imagem_debug
@@ -0,0 +1,95 @@
+#!/bin/env python3
+
+
+"""Registro de comandos de desenho da imagem de debug.
+
+Define a classe :class:`RegistroDesenho`, usada pelo
+:class:`~codigo.controlador.modulos.controlador.Controlador` para adiar os desenhos da imagem de debug até
+que ela seja pedida.
+"""
+
+
+import cv2 as cv
+
+
+class RegistroDesenho():
+    """Fila de comandos de desenho aplicados a uma imagem apenas quando ela é pedida.
+
+    Cada comando é uma função de desenho que recebe a imagem como primeiro argumento, como as funções do
+    OpenCV (:func:`cv.rectangle`, :func:`cv.line`, :func:`cv.putText`, etc.), e os demais argumentos. O
+    comando é guardado por :meth:`adiciona()` e só é executado por :meth:`rasteriza()`, na ordem em que foi
+    adicionado. Assim, se a imagem de debug nunca for pedida, nenhuma imagem é criada ou desenhada.
+
+    >>> registro = RegistroDesenho()
+    >>> registro.adiciona(cv.rectangle, (0, 0), (10, 10), (255, 0, 0), cv.FILLED)
+    >>> imagem = registro.rasteriza(np.zeros((60, 60, 3), dtype=np.uint8))
+    """
+
+    def __init__(self):
+        """Cria um registro vazio.
+        """
+        self._comandos = []
+
+    def adiciona(self, funcao, *args, **kwargs):
+        """Adiciona um comando de desenho ao registro.
+
+        Parameters
+        ----------
+        funcao : callable
+            Função de desenho. Será chamada como ``funcao(imagem, *args, **kwargs)``.
+
+        *args, **kwargs
+            Argumentos da função, exceto a imagem.
+        """
+        self._comandos.append((funcao, args, kwargs))
+
+    def sobrepoe(self, imagem_sobreposta):
+        """Adiciona um comando que une a imagem a outra por uma operação OR bit a bit.
+
+        Parameters
+        ----------
+        imagem_sobreposta : numpy.ndarray
+            Imagem com o mesmo formato e tipo da imagem que será desenhada.
+        """
+        self._comandos.append((_sobrepoe, (imagem_sobreposta,), {}))
+
+    def limpa(self):
+        """Descarta os comandos registrados.
+        """
+        self._comandos.clear()
+
+    def vazio(self):
+        """Retorna se não há comandos registrados.
+
+        Returns
+        -------
+        bool
+            True se não há comandos.
+        """
+        return not self._comandos
+
+    def rasteriza(self, imagem):
+        """Executa os comandos registrados na imagem e os descarta.
+
+        Parameters
+        ----------
+        imagem : numpy.ndarray
+            Imagem onde os comandos serão desenhados. É alterada.
+
+        Returns
+        -------
+        numpy.ndarray
+            A própria imagem, com os desenhos.
+        """
+        for funcao, args, kwargs in self._comandos:
+            funcao(imagem, *args, **kwargs)
+
+        self._comandos.clear()
+
+        return imagem
+
+
+def _sobrepoe(imagem, imagem_sobreposta):
+    """Une a imagem sobreposta a imagem, sem criar uma nova imagem.
+    """
+    cv.bitwise_or(imagem, imagem_sobreposta, dst=imagem)
@@ -0,0 +1,266 @@
+#!/bin/env python3
+
+
+"""Implementação de um traçador de caminho hierárquico (multirresolução).
+
+Para utilizar o algorítimo, deve-se criar um objeto da classe :class:`AEstrelaHierarquico`. Ela possui a
+mesma interface da classe :class:`~codigo.controlador.modulos.aestrela.AEstrela` e pode substituí-la no
+:class:`~codigo.controlador.modulos.controlador.Controlador`.
+"""
+
+
+from .aestrela import AEstrela
+import numpy as np
+import cv2 as cv
+
+
+class AEstrelaHierarquico(AEstrela):
+    """Traça o caminho primeiro em um mapa reduzido e depois o refina na resolução original.
+
+    O custo do A* cresce com a quantidade de posições do mapa, então mapas maiores que 60x60 deixam
+    o controlador lento. Essa classe reduz o mapa por um fator (*fator*), traça o caminho no mapa
+    reduzido e, na resolução original, busca apenas dentro de um corredor ao redor desse caminho.
+
+    No mapa reduzido, cada posição corresponde a um bloco de *fator* x *fator* posições do mapa original.
+    O bloco é uma parede se mais da metade das suas posições forem paredes, e o seu custo é a média do
+    mapa de custo do bloco. Como um passo no mapa reduzido atravessa *fator* posições, o passo e o custo
+    são multiplicados pelo fator.
+
+    O corredor é formado pelos blocos do caminho reduzido, expandidos em *raio_corredor* blocos para
+    cada lado. As posições fora do corredor são tratadas como paredes na busca refinada.
+
+    O caminho obtido não é necessariamente o menor do mapa original, mas é o menor dentro do corredor.
+    Se o mapa reduzido fechar uma passagem estreita, ou se o corredor não contiver um caminho, a busca
+    é feita no mapa original inteiro. Assim, o caminho só é None se realmente não existir.
+
+    >>> tracador = AEstrelaHierarquico(fator=4)
+    >>> controlador = Controlador((120, 120), posicoes_esquerda, 6, 30, tracador_caminho=tracador)
+    """
+
+    def __init__(
+            self, passo=10, heuristica="euclidiana", tamanho_cache=8, metodo="aestrela",
+            fator=4, raio_corredor=2
+            ):
+        """Configura o traçador hierárquico.
+
+        Os quatro primeiros parâmetros são os mesmos da classe
+        :class:`~codigo.controlador.modulos.aestrela.AEstrela` e valem para a busca na resolução original.
+        O mapa reduzido sempre usa o A*.
+
+        Parameters
+        ----------
+        passo : int
+            Peso relacionado ao custo de se movimentar de uma posição para outra adjacente.
+
+        heuristica : str, default "euclidiana"
+            Função heurística usada: "euclidiana" ou "octil".
+
+        tamanho_cache : int, default 8
+            Quantidade de campos heurísticos guardados no cache.
+
+        metodo : str, default "aestrela"
+            Método de busca usado na resolução original: "aestrela" ou "jps".
+
+        fator : int, default 4
+            Fator de redução do mapa. Deve ser pelo menos 2.
+
+        raio_corredor : int, default 2
+            Quantidade de blocos do mapa reduzido adicionados ao redor do caminho reduzido.
+        """
+        super().__init__(passo, heuristica, tamanho_cache, metodo)
+
+        if fator < 2:
+            raise ValueError(f"O fator de redução deve ser pelo menos 2: {fator}")
+
+        self._fator = fator
+        self._raio_corredor = raio_corredor
+
+        # Traçador do mapa reduzido
+        self._tracador_reduzido = AEstrela(passo*fator, heuristica, tamanho_cache)
+
+    def define_mapas(self, mapa, mapa_custo=None):
+        """Define o mapa do ambiente onde será traçado o caminho.
+
+        Funciona da mesma forma que o método
+        :meth:`~codigo.controlador.modulos.aestrela.AEstrela.define_mapas()`. Também gera os mapas
+        reduzidos.
+
+        Parameters
+        ----------
+        mapa : numpy.ndarray
+            Mapa da região onde será traçado o caminho.
+
+        mapa_custo : numpy.ndarray
+            Mapa de valores a serem somados a função de custo. Deve ter as mesmas dimensões que o *mapa*.
+        """
+        super().define_mapas(mapa, mapa_custo)
+
+        # Custo acumulado inicial do mapa inteiro. A busca refinada usa uma cópia com o corredor.
+        self._custo_g_mapa = self._custo_g_inicial
+
+        # Os blocos incompletos da borda inferior e direita são completados com paredes (no mapa) e com
+        # custo zero (no mapa de custo)
+        fator = self._fator
+        altura, largura = self._mapa_formato
+        self._formato_reduzido = (-(-altura//fator), -(-largura//fator))
+        preenchimento = ((0, self._formato_reduzido[0]*fator - altura), (0, self._formato_reduzido[1]*fator - largura))
+
+        mapa_blocos = np.pad(self._mapa.astype(np.float32), preenchimento, constant_values=1)
+        mapa_reduzido = np.uint8(self._media_blocos(mapa_blocos) > 0.5)
+
+        if self._mapa_custo is not None:
+            custo_blocos = np.pad(self._mapa_custo.astype(np.float64), preenchimento)
+            custo_reduzido = self._media_blocos(custo_blocos)*fator
+
+        else:
+            custo_reduzido = None
+
+        self._tracador_reduzido.define_mapas(mapa_reduzido, custo_reduzido)
+
+    def gera_caminho(self, pos_inicio, pos_fim, max_expansoes=None, prazo=None):
+        """Gera o caminho do ponto inicial até o final no mapa.
+
+        Funciona da mesma forma que o método
+        :meth:`~codigo.controlador.modulos.aestrela.AEstrela.gera_caminho()`. O caminho é traçado no
+        mapa reduzido e refinado dentro do corredor. Se não for possível, é traçado no mapa inteiro.
+
+        Os limites *max_expansoes* e *prazo* valem para o método inteiro: a busca no mapa reduzido, a busca
+        no corredor e a busca no mapa inteiro compartilham o mesmo prazo, e cada uma recebe apenas as
+        expansões que sobraram das anteriores. Se a busca no mapa reduzido for interrompida, o corredor é
+        descartado e a busca é feita diretamente no mapa inteiro, com o que restar dos limites.
+
+        A quantidade de posições expandidas (ver :meth:`retorna_n_expandidos()`) soma as posições expandidas
+        em todas as buscas, inclusive no mapa reduzido.
+
+        Parameters
+        ----------
+        pos_inicial : tuple
+            Posição de início no mapa.
+
+        pos_fim : tuple
+            Posição de destino do caminho no mapa.
+
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Se None, não há limite.
+
+        prazo : float, default None
+            Instante, no relógio de :func:`time.perf_counter()`, em que a busca deve ser interrompida.
+            Se None, não há limite.
+
+        Returns
+        -------
+        list
+            Lista com os pontos do caminho.
+        """
+        # Se o caminho já foi traçado, não é necessário traçá-lo novamente
+        if self._pos_inicio == pos_inicio and self._pos_fim == pos_fim:
+            return self._vetor_caminho
+
+        fator = self._fator
+        inicio_reduzido = (pos_inicio[0]//fator, pos_inicio[1]//fator)
+        fim_reduzido = (pos_fim[0]//fator, pos_fim[1]//fator)
+
+        # Se o caminho reduzido já foi traçado, o traçador reduzido não expande nenhuma posição. Um caminho
+        # reduzido parcial não é reaproveitado, pois a busca atual pode ter limites maiores.
+        reduzido = self._tracador_reduzido
+        if not reduzido.retorna_busca_completa():
+            reduzido._pos_inicio = None
+
+        reaproveitado = reduzido._pos_inicio == inicio_reduzido and reduzido._pos_fim == fim_reduzido
+
+        caminho_reduzido = reduzido.gera_caminho(inicio_reduzido, fim_reduzido, max_expansoes, prazo)
+        n_expandidos = 0 if reaproveitado else reduzido.retorna_n_expandidos()
+
+        # Busca refinada dentro do corredor. Se a busca reduzida foi interrompida, o caminho reduzido é
+        # parcial e não serve para formar o corredor.
+        if caminho_reduzido is not None and reduzido.retorna_busca_completa():
+            corredor = self._gera_corredor(caminho_reduzido + [fim_reduzido])
+
+            self._custo_g_inicial = np.where(corredor, self._custo_g_mapa, -np.inf)
+            restantes = self._expansoes_restantes(max_expansoes, n_expandidos)
+            vetor_caminho = super().gera_caminho(pos_inicio, pos_fim, restantes, prazo)
+            self._custo_g_inicial = self._custo_g_mapa
+            n_expandidos += self._n_expandidos
+
+            # Encontrou um caminho ou atingiu um dos limites da busca
+            if vetor_caminho is not None or not self._busca_completa:
+                self._n_expandidos = n_expandidos
+                return vetor_caminho
+
+        # O corredor não contém um caminho ou a busca reduzida foi interrompida. Busca no mapa inteiro.
+        self._pos_inicio = None
+        restantes = self._expansoes_restantes(max_expansoes, n_expandidos)
+        vetor_caminho = super().gera_caminho(pos_inicio, pos_fim, restantes, prazo)
+        self._n_expandidos += n_expandidos
+
+        return vetor_caminho
+
+    def _expansoes_restantes(self, max_expansoes, n_expandidos):
+        """Computa a quantidade de expansões que sobraram para a próxima busca.
+
+        Parameters
+        ----------
+        max_expansoes : int
+            Quantidade máxima de posições expandidas no método :meth:`gera_caminho()`. Se None, não há limite.
+
+        n_expandidos : int
+            Quantidade de posições já expandidas pelas buscas anteriores.
+
+        Returns
+        -------
+        int
+            Quantidade de expansões restantes, ou None se não há limite.
+        """
+        if max_expansoes is None:
+            return None
+
+        return max(max_expansoes - n_expandidos, 0)
+
+    def _media_blocos(self, mapa):
+        """Computa a média de cada bloco de *fator* x *fator* posições.
+
+        Parameters
+        ----------
+        mapa : numpy.ndarray
+            Mapa com dimensões múltiplas do fator de redução.
+
+        Returns
+        -------
+        numpy.ndarray
+            Mapa reduzido com a média de cada bloco.
+        """
+        fator = self._fator
+        altura, largura = self._formato_reduzido
+
+        return mapa.reshape(altura, fator, largura, fator).mean(axis=(1, 3))
+
+    def _gera_corredor(self, caminho_reduzido):
+        """Gera o corredor da busca refinada a partir do caminho no mapa reduzido.
+
+        Os blocos do caminho são expandidos em *raio_corredor* blocos e ampliados para a resolução
+        original.
+
+        Parameters
+        ----------
+        caminho_reduzido : list
+            Pontos do caminho no mapa reduzido.
+
+        Returns
+        -------
+        numpy.ndarray
+            Vetor achatado do mapa com borda. True indica uma posição dentro do corredor.
+        """
+        corredor = np.zeros(self._formato_reduzido, dtype=np.uint8)
+        for pos in caminho_reduzido:
+            # O destino pode estar fora do mapa reduzido
+            if 0 <= pos[0] < corredor.shape[0] and 0 <= pos[1] < corredor.shape[1]:
+                corredor[pos] = 1
+
+        tamanho = 2*self._raio_corredor + 1
+        corredor = cv.dilate(corredor, np.ones((tamanho, tamanho), np.uint8))
+
+        # Amplia para a resolução original e recorta os blocos incompletos
+        corredor = np.repeat(np.repeat(corredor, self._fator, axis=0), self._fator, axis=1)
+        corredor = corredor[:self._mapa_formato[0], :self._mapa_formato[1]]
+
+        return np.pad(corredor, 1).ravel() == 1
@@ -0,0 +1,471 @@
+#!/bin/env python3
+
+
+"""Implementação do algorítimo de busca incremental LPA* (Lifelong Planning A*).
+
+Para utilizar o algorítimo, deve-se criar um objeto da classe :class:`LPAEstrela`. Ela possui a mesma
+interface da classe :class:`~codigo.controlador.modulos.aestrela.AEstrela` e pode substituí-la no
+:class:`~codigo.controlador.modulos.controlador.Controlador`.
+"""
+
+
+from .aestrela import AEstrela
+import numpy as np
+import heapq
+import math
+import time
+
+
+class LPAEstrela(AEstrela):
+    """Implementa o algorítimo LPA*, uma versão incremental do A*.
+
+    O A* traça o caminho do zero sempre que o mapa muda. Entre frames consecutivos, porém, as máscaras
+    de segmentação diferem em poucas posições. O LPA* mantém o estado da busca (custos acumulados e lista
+    aberta) entre as chamadas e, ao receber um novo mapa, repara apenas as posições afetadas pelas posições
+    alteradas do mapa e do mapa de custo.
+
+    O ponto inicial do Wall-e é fixo no mapa do controlador, então a busca é enraizada nele. Se o ponto
+    inicial mudar, ou o formato do mapa mudar, a busca é reiniciada. Se apenas o destino mudar, os custos
+    acumulados são reaproveitados e apenas as prioridades da lista aberta são recomputadas.
+
+    Cada posição possui dois custos: o custo acumulado *g* e o custo *rhs*, que é o menor custo obtido a
+    partir dos vizinhos. Uma posição é consistente quando os dois são iguais. A lista aberta contém apenas
+    as posições inconsistentes.
+
+    A interface é a mesma da classe :class:`~codigo.controlador.modulos.aestrela.AEstrela`. O mapa é definido
+    por :meth:`define_mapas()` e o caminho é gerado por :meth:`gera_caminho()`. O mapa retornado por
+    :meth:`retorna_mapa_checados()` contém as paredes e as posições expandidas na última chamada, e a
+    quantidade delas é dada por :meth:`retorna_n_expandidos()`. Assim, é possível comparar o custo de cada
+    frame com o do A*.
+
+    >>> tracador = LPAEstrela()
+    >>> controlador = Controlador((60, 60), posicoes_esquerda, 3, 10, tracador_caminho=tracador)
+
+    Warnings
+    --------
+    Assim como no A*, o ponto de destino pode estar sobre uma parede. O custo de entrar nele não considera
+    o mapa de custo, e o caminho retornado termina na posição anterior a ele.
+    """
+
+    def __init__(self, passo=10, heuristica="euclidiana", tamanho_cache=8):
+        """Configura o algorítimo LPA*.
+
+        Os parâmetros são os mesmos da classe :class:`~codigo.controlador.modulos.aestrela.AEstrela`.
+
+        Parameters
+        ----------
+        passo : int
+            Peso relacionado ao custo de se movimentar de uma posição para outra adjacente.
+
+        heuristica : str, default "euclidiana"
+            Função heurística usada: "euclidiana" ou "octil".
+
+        tamanho_cache : int, default 8
+            Quantidade de campos heurísticos guardados no cache.
+        """
+        super().__init__(passo, heuristica, tamanho_cache)
+
+        self._custo_entrada_mapa = None
+        self._reinicia_busca()
+
+    def define_mapas(self, mapa, mapa_custo=None):
+        """Define o mapa do ambiente onde será traçado o caminho.
+
+        Funciona da mesma forma que o método
+        :meth:`~codigo.controlador.modulos.aestrela.AEstrela.define_mapas()`, mas o estado da busca
+        é mantido. As posições cujo custo de entrada mudou em relação ao mapa anterior são guardadas
+        e reparadas na próxima chamada de :meth:`gera_caminho()`.
+
+        Parameters
+        ----------
+        mapa : numpy.ndarray
+            Mapa da região onde será traçado o caminho.
+
+        mapa_custo : numpy.ndarray
+            Mapa de valores a serem somados a função de custo. Deve ter as mesmas dimensões que o *mapa*.
+        """
+        super().define_mapas(mapa, mapa_custo)
+
+        # Custo de entrar em cada posição do mapa com borda. As paredes não podem ser acessadas.
+        custo_entrada = self._custo_borda.copy()
+        custo_entrada[self._mapa_borda.ravel() == 1] = np.inf
+
+        # Se o formato do mapa mudou, a busca anterior não pode ser reaproveitada
+        if self._custo_entrada_mapa is None or self._custo_entrada_mapa.shape != custo_entrada.shape:
+            self._reinicia_busca()
+
+        else:
+            alteradas = np.flatnonzero(custo_entrada != self._custo_entrada_mapa)
+            self._alteradas.extend(alteradas.tolist())
+
+        self._custo_entrada_mapa = custo_entrada
+
+        # O destino pode ser acessado mesmo se for uma parede
+        self._custo_entrada = custo_entrada.copy()
+        if self._fim_busca != -1:
+            self._custo_entrada[self._fim_busca] = 0.0
+
+    def gera_caminho(self, pos_inicio, pos_fim, max_expansoes=None, prazo=None):
+        """Gera o melhor caminho do ponto inicial até o final no mapa.
+
+        Funciona da mesma forma que o método
+        :meth:`~codigo.controlador.modulos.aestrela.AEstrela.gera_caminho()`. Repara a busca anterior
+        com as alterações do mapa e do destino antes de extrair o caminho.
+
+        Se a busca for interrompida por um dos limites, o estado dela é mantido e a próxima chamada
+        continua de onde parou. Assim, um destino distante é alcançado ao longo de alguns frames.
+
+        Parameters
+        ----------
+        pos_inicial : tuple
+            Posição de início no mapa.
+
+        pos_fim : tuple
+            Posição de destino do caminho no mapa.
+
+        max_expansoes : int, default None
+            Quantidade máxima de posições expandidas. Se None, não há limite.
+
+        prazo : float, default None
+            Instante, no relógio de :func:`time.perf_counter()`, em que a busca deve ser interrompida.
+            Se None, não há limite.
+
+        Returns
+        -------
+        list
+            Lista com os pontos do caminho.
+        """
+        # Se o caminho já foi traçado, não é necessário traçá-lo novamente
+        if self._pos_inicio == pos_inicio and self._pos_fim == pos_fim:
+            return self._vetor_caminho
+
+        self._pos_inicio = pos_inicio
+        self._pos_fim = pos_fim
+        self._vetor_caminho = None
+        self._busca_completa = True
+
+        # Mapa com as paredes e as posições expandidas nessa chamada
+        self._mapa_checado_borda = self._mapa_borda.ravel().copy()
+        self._mapa_checado = self._mapa_checado_borda.reshape(self._mapa_borda.shape)[1:-1, 1:-1]
+        self._n_expandidos = 0
+
+        inicio = self._pos2indice(pos_inicio)
+        fim = self._pos2indice(pos_fim)
+
+        # Se um dos pontos for inválido ou se o destino estiver em outra região do mapa, não é possível
+        # traçar um caminho. O estado da busca é mantido para as próximas chamadas.
+        if not self.destino_alcancavel(pos_inicio, pos_fim):
+            return None
+
+        # Uma nova posição inicial invalida toda a busca anterior
+        if inicio != self._inicio_busca:
+            self._inicia_busca(inicio)
+
+        if fim != self._fim_busca:
+            self._altera_destino(fim)
+
+        # Repara as posições alteradas do mapa
+        for indice in self._alteradas:
+            self._atualiza_posicao(indice)
+
+        self._alteradas = []
+
+        # Limites da busca
+        if max_expansoes is None:
+            max_expansoes = math.inf
+
+        if prazo is None:
+            prazo = math.inf
+
+        if not self._computa_caminho_mais_curto(max_expansoes, prazo):
+            self._busca_completa = False
+            self._vetor_caminho = self._gera_vetor_caminho_parcial()
+
+            return self._vetor_caminho
+
+        # Se não alcançou o destino, não há caminho
+        if self._g[fim] == np.inf:
+            return None
+
+        self._vetor_caminho = self._gera_vetor_caminho(fim)
+
+        return self._vetor_caminho
+
+    def _reinicia_busca(self):
+        """Apaga o estado da busca.
+
+        A próxima chamada de :meth:`gera_caminho()` reinicia a busca do zero.
+        """
+        self._g = None
+        self._rhs = None
+        self._lista_aberta = []
+        self._na_lista_aberta = {}
+        self._alteradas = []
+        self._inicio_busca = -1
+        self._fim_busca = -1
+        self._n_expandidos = 0
+
+    def _inicia_busca(self, inicio):
+        """Inicia uma nova busca a partir do ponto *inicio*.
+
+        Parameters
+        ----------
+        inicio : int
+            Índice achatado do ponto inicial no mapa com borda.
+        """
+        fim = self._fim_busca
+
+        self._reinicia_busca()
+        self._fim_busca = fim
+        self._inicio_busca = inicio
+
+        self._g = np.full(self._custo_entrada.size, np.inf)
+        self._rhs = np.full(self._custo_entrada.size, np.inf)
+        self._rhs[inicio] = 0.0
+
+        # O ponto inicial é o único inconsistente no início da busca
+        if fim != -1:
+            self._insere(inicio)
+
+    def _altera_destino(self, fim):
+        """Altera o ponto de destino da busca.
+
+        O custo de entrada do destino anterior volta ao do mapa, e o do novo destino é zerado. Como a
+        função heurística depende do destino, as prioridades da lista aberta são recomputadas.
+
+        Parameters
+        ----------
+        fim : int
+            Índice achatado do ponto de destino no mapa com borda.
+        """
+        anterior = self._fim_busca
+        self._fim_busca = fim
+
+        if anterior != -1:
+            self._custo_entrada[anterior] = self._custo_entrada_mapa[anterior]
+            self._alteradas.append(anterior)
+
+        self._custo_entrada[fim] = 0.0
+        self._alteradas.append(fim)
+
+        # Novo campo heurístico e novas prioridades
+        self._h = self._campo_heuristico(self._pos_fim)
+        self._reconstroi_lista_aberta()
+
+        # O ponto inicial ainda não foi adicionado à lista aberta
+        if anterior == -1:
+            self._insere(self._inicio_busca)
+
+    def _reconstroi_lista_aberta(self):
+        """Recomputa as prioridades da lista aberta e remove as cópias antigas do heap."""
+        self._na_lista_aberta = {u: self._chave(u) for u in self._na_lista_aberta}
+        self._lista_aberta = [chave + (u,) for u, chave in self._na_lista_aberta.items()]
+        heapq.heapify(self._lista_aberta)
+
+    def _chave(self, indice):
+        """Computa a prioridade de uma posição na lista aberta.
+
+        A prioridade é uma tupla (menor_custo + heurística, menor_custo), em que o menor custo é o
+        menor valor entre o *g* e o *rhs* da posição.
+
+        Parameters
+        ----------
+        indice : int
+            Índice achatado da posição no mapa com borda.
+
+        Returns
+        -------
+        tuple
+            Prioridade da posição.
+        """
+        custo = min(self._g[indice], self._rhs[indice])
+
+        return (float(custo + self._h[indice]), float(custo))
+
+    def _insere(self, indice):
+        """Adiciona uma posição inconsistente à lista aberta, ou a remove se estiver consistente.
+
+        A remoção do heap é preguiçosa: apenas o dicionário de posições na lista aberta é atualizado,
+        e as cópias antigas são ignoradas ao serem retiradas.
+
+        Parameters
+        ----------
+        indice : int
+            Índice achatado da posição no mapa com borda.
+        """
+        if self._g[indice] != self._rhs[indice]:
+            chave = self._chave(indice)
+            self._na_lista_aberta[indice] = chave
+            heapq.heappush(self._lista_aberta, chave + (indice,))
+
+        else:
+            self._na_lista_aberta.pop(indice, None)
+
+    def _atualiza_posicao(self, indice):
+        """Recomputa o *rhs* de uma posição e a coloca ou retira da lista aberta.
+
+        O *rhs* é o menor custo para alcançar a posição passando por um de seus vizinhos. As paredes
+        (incluindo a borda do mapa) não podem ser acessadas, então seu *rhs* é infinito.
+
+        Parameters
+        ----------
+        indice : int
+            Índice achatado da posição no mapa com borda.
+        """
+        if indice != self._inicio_busca:
+            custo = self._custo_entrada[indice]
+
+            if custo == np.inf:
+                self._rhs[indice] = np.inf
+
+            else:
+                vizinhos = self._deslocamentos + indice
+                self._rhs[indice] = custo + np.min(self._g[vizinhos] + self._passos)
+
+        self._insere(indice)
+
+    def _computa_caminho_mais_curto(self, max_expansoes=math.inf, prazo=math.inf):
+        """Expande as posições inconsistentes até que o custo do destino esteja correto.
+
+        Uma posição cujo custo diminuiu (*g* > *rhs*) recebe o novo custo e propaga ele para os vizinhos
+        de uma só vez, como no A*. Uma posição cujo custo aumentou tem o custo apagado e ela e seus
+        vizinhos são recomputados.
+
+        A busca é interrompida se a quantidade de posições expandidas chegar a *max_expansoes* ou se o
+        relógio de :func:`time.perf_counter()` passar do *prazo*. O prazo é checado a cada 32 posições
+        expandidas.
+
+        Parameters
+        ----------
+        max_expansoes : int or float, default math.inf
+            Quantidade máxima de posições expandidas.
+
+        prazo : float, default math.inf
+            Instante em que a busca deve ser interrompida.
+
+        Returns
+        -------
+        bool
+            True se o custo do destino está correto, False se a busca foi interrompida.
+        """
+        g = self._g
+        rhs = self._rhs
+        custo_entrada = self._custo_entrada
+        deslocamentos = self._deslocamentos
+        passos = self._passos
+        lista_aberta = self._lista_aberta
+        na_lista_aberta = self._na_lista_aberta
+        checado = self._mapa_checado_borda
+        fim = self._fim_busca
+
+        while lista_aberta:
+            k1, k2, indice = lista_aberta[0]
+
+            # Cópia antiga de uma posição
+            if na_lista_aberta.get(indice) != (k1, k2):
+                heapq.heappop(lista_aberta)
+                continue
+
+            # O custo do destino está correto e nenhuma posição pode melhorá-lo. A tolerância evita que
+            # erros de arredondamento encerrem a busca antes de processar uma posição de mesma prioridade.
+            if k1 > self._chave(fim)[0] + 1e-6 and g[fim] == rhs[fim]:
+                break
+
+            # Interrompe a busca se atingiu um dos limites
+            n_expandidos = self._n_expandidos
+            if n_expandidos >= max_expansoes or ((n_expandidos & 31) == 0 and time.perf_counter() > prazo):
+                return False
+
+            heapq.heappop(lista_aberta)
+            del na_lista_aberta[indice]
+
+            self._n_expandidos += 1
+            checado[indice] = 1
+
+            vizinhos = deslocamentos + indice
+
+            if g[indice] > rhs[indice]:
+                g[indice] = rhs[indice]
+
+                # Propaga o novo custo para os vizinhos que ficaram mais baratos
+                custo = custo_entrada[vizinhos] + (passos + g[indice])
+                melhores = custo < rhs[vizinhos]
+
+                vizinhos = vizinhos[melhores]
+                rhs[vizinhos] = custo[melhores]
+
+                for vizinho in vizinhos.tolist():
+                    self._insere(vizinho)
+
+            else:
+                g[indice] = np.inf
+
+                self._atualiza_posicao(indice)
+                for vizinho in vizinhos.tolist():
+                    self._atualiza_posicao(vizinho)
+
+        # Remove as cópias antigas se o heap crescer demais
+        if len(lista_aberta) > 2*len(na_lista_aberta) + 64:
+            self._reconstroi_lista_aberta()
+
+        return True
+
+    def _gera_vetor_caminho(self, fim):
+        """Gera e retorna um vetor com todos os pontos do caminho.
+
+        O caminho é reconstruído a partir do destino, escolhendo sempre o vizinho com o menor custo
+        acumulado somado ao custo do passo. O primeiro elemento do vetor é o ponto inicial, e o último
+        é o ponto anterior ao de destino.
+
+        Parameters
+        ----------
+        fim : int
+            Índice achatado do ponto de destino no mapa com borda.
+
+        Returns
+        -------
+        list or None
+            Lista com todos os pontos do caminho. Se não foi possível traçar um caminho, retorna None.
+        """
+        vetor_caminho = []
+        indice = fim
+
+        # O caminho não pode ser maior que a quantidade de posições do mapa
+        for _ in range(self._g.size):
+            vizinhos = self._deslocamentos + indice
+            indice = int(vizinhos[np.argmin(self._g[vizinhos] + self._passos)])
+            vetor_caminho.append(self._indice2pos(indice))
+
+            if indice == self._inicio_busca:
+                # É necessário inverter o vetor para que ele comece pelo ponto inicial
+                return vetor_caminho[::-1]
+
+        return None
+
+    def _gera_vetor_caminho_parcial(self):
+        """Gera o vetor do caminho até a posição mais próxima do destino, após uma busca interrompida.
+
+        Entre as posições consistentes e alcançadas (com *g* finito e igual ao *rhs*), é escolhida a de
+        menor função heurística. O caminho termina nela.
+
+        Returns
+        -------
+        list or None
+            Lista com todos os pontos do caminho parcial. Se não foi possível traçar um caminho,
+            retorna None.
+        """
+        alcancadas = np.flatnonzero((self._g == self._rhs) & (self._g < np.inf))
+
+        # Apenas o ponto inicial foi alcançado
+        if alcancadas.size == 0:
+            return [self._indice2pos(self._inicio_busca)]
+
+        melhor = int(alcancadas[np.argmin(self._h[alcancadas])])
+        if melhor == self._inicio_busca:
+            return [self._indice2pos(melhor)]
+
+        vetor_caminho = self._gera_vetor_caminho(melhor)
+        if vetor_caminho is None:
+            return None
+
+        return vetor_caminho + [self._indice2pos(melhor)]
@@ -0,0 +1,152 @@
+#!/bin/env python3
+
+
+"""Grade de ocupação com fusão temporal dos mapas segmentados.
+
+Define a classe :class:`GradeOcupacao`, que combina as máscaras de segmentação de frames sucessivos para
+reduzir o ruído de um único frame. Pode ser usada diretamente ou pelo
+:class:`~codigo.controlador.modulos.controlador.Controlador` (ver o método
+:meth:`~codigo.controlador.modulos.controlador.Controlador.parametros_ocupacao()`).
+"""
+
+
+import numpy as np
+import cv2 as cv
+
+
+class GradeOcupacao():
+    """Funde as máscaras de segmentação de frames sucessivos em um mapa de ocupação.
+
+    Cada posição do mapa guarda o log-odds (logaritmo da razão de chances) de estar ocupada. A cada frame,
+    o log-odds de uma posição é somado a *ganho_ocupado* se a máscara indicar uma parede, e a *ganho_livre*
+    (negativo) caso contrário. O valor é limitado ao intervalo [-*limite*, *limite*], para que a grade
+    continue respondendo a mudanças reais do ambiente. Uma posição é uma parede se o seu log-odds for
+    positivo.
+
+    Com os valores padrão, uma posição que está livre há alguns frames precisa ser vista como parede em dois
+    frames seguidos para virar parede, e uma parede precisa ser vista livre em quatro frames seguidos para ser
+    liberada. Assim, o ruído de um único frame não altera o mapa, e o Wall-e é conservador ao liberar
+    regiões. No primeiro frame (ou após :meth:`reinicia()`), o mapa é igual à máscara.
+
+    A grade também informa quais posições do mapa mudaram em relação ao frame anterior (ver
+    :meth:`retorna_alteradas()` e :meth:`houve_alteracao()`). Se o ambiente estiver estável, o
+    processamento seguinte pode ser evitado.
+
+    Todos os arrays são criados na instanciação e reaproveitados. O mapa retornado por :meth:`atualiza()` é
+    sobrescrito dois frames depois (o mapa do frame anterior é usado para encontrar as posições alteradas).
+
+    >>> grade = GradeOcupacao((60, 60))
+    >>> mapa = grade.atualiza(mascara)
+    >>> if grade.houve_alteracao():
+    >>>     ...
+    """
+
+    def __init__(self, formato_mapa : tuple, ganho_ocupado : float = 1.5, ganho_livre : float = -0.5, limite : float = 2.0):
+        """Inicialização da grade de ocupação.
+
+        Parameters
+        ----------
+        formato_mapa : tuple
+            Formato das máscaras e do mapa, do tipo (n_linhas, n_colunas).
+
+        ganho_ocupado : float, default 1.5
+            Valor somado ao log-odds das posições indicadas como parede pela máscara. Deve ser positivo.
+
+        ganho_livre : float, default -0.5
+            Valor somado ao log-odds das posições indicadas como livres pela máscara. Deve ser negativo.
+
+        limite : float, default 2.0
+            Valor máximo do módulo do log-odds.
+        """
+        if ganho_ocupado <= 0 or ganho_livre >= 0:
+            raise ValueError(f"Os ganhos devem ser positivo (ocupado) e negativo (livre): {ganho_ocupado}, {ganho_livre}")
+
+        self._formato_mapa = formato_mapa
+        self._ganho_ocupado = ganho_ocupado
+        self._ganho_livre = ganho_livre
+        self._limite = limite
+
+        self._log_odds = np.zeros(formato_mapa, dtype=np.float32)
+        self._mascara = np.zeros(formato_mapa, dtype=np.uint8)
+        self._mapa = np.zeros(formato_mapa, dtype=np.uint8)
+        self._mapa_anterior = np.zeros(formato_mapa, dtype=np.uint8)
+        self._alteradas = np.zeros(formato_mapa, dtype=np.uint8)
+
+        self.reinicia()
+
+    def reinicia(self):
+        """Apaga o histórico da grade. O próximo mapa será igual à próxima máscara.
+        """
+        self._log_odds.fill(0)
+        self._mapa.fill(0)
+        self._alteradas.fill(1)
+        self._n_alteradas = self._alteradas.size
+        self._primeiro_frame = True
+
+    def atualiza(self, mascara : np.ndarray):
+        """Funde a máscara de um novo frame à grade.
+
+        Parameters
+        ----------
+        mascara : numpy.ndarray
+            Máscara de segmentação no formato da grade. Valores diferentes de zero são paredes.
+
+        Returns
+        -------
+        numpy.ndarray
+            Mapa de ocupação (uint8), com 1 nas paredes e 0 nas posições livres.
+        """
+        if mascara.shape != self._formato_mapa:
+            raise ValueError(f"Formato da máscara diferente do formato da grade: {mascara.shape}")
+
+        # Troca os buffers. O mapa atual passa a ser o anterior.
+        self._mapa, self._mapa_anterior = self._mapa_anterior, self._mapa
+
+        # Soma o ganho livre em todas as posições e a diferença para o ganho ocupado nas paredes
+        cv.compare(mascara, 0, cv.CMP_NE, dst=self._mascara)
+        cv.add(self._log_odds, self._ganho_livre, dst=self._log_odds)
+        cv.add(self._log_odds, self._ganho_ocupado - self._ganho_livre, dst=self._log_odds, mask=self._mascara)
+        np.clip(self._log_odds, -self._limite, self._limite, out=self._log_odds)
+
+        cv.compare(self._log_odds, 0, cv.CMP_GT, dst=self._mapa)
+        np.bitwise_and(self._mapa, 1, out=self._mapa)
+
+        # Posições alteradas. No primeiro frame, todas são consideradas alteradas.
+        if self._primeiro_frame:
+            self._primeiro_frame = False
+
+        else:
+            cv.absdiff(self._mapa, self._mapa_anterior, dst=self._alteradas)
+            self._n_alteradas = cv.countNonZero(self._alteradas)
+
+        return self._mapa
+
+    def retorna_mapa(self):
+        """Retorna o mapa de ocupação do último frame.
+
+        Returns
+        -------
+        numpy.ndarray
+            Mapa de ocupação (uint8), com 1 nas paredes e 0 nas posições livres.
+        """
+        return self._mapa
+
+    def retorna_alteradas(self):
+        """Retorna as posições do mapa que mudaram em relação ao frame anterior.
+
+        Returns
+        -------
+        numpy.ndarray
+            Máscara (uint8) com 1 nas posições alteradas.
+        """
+        return self._alteradas
+
+    def houve_alteracao(self):
+        """Retorna se alguma posição do mapa mudou em relação ao frame anterior.
+
+        Returns
+        -------
+        bool
+            True se alguma posição mudou.
+        """
+        return self._n_alteradas > 0
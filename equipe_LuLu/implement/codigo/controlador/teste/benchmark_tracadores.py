@@ -0,0 +1,254 @@
+#!/bin/env python3
+
+
+"""Benchmark dos traçadores de caminho e do controlador, sem interface gráfica.
+
+São usados dois tipos de mapa:
+
+* Mapas sintéticos, gerados de forma reproduzível (semente *SEMENTE*) para cada formato de
+  *FORMATOS_MAPA* e densidade de obstáculos de *DENSIDADES*.
+* Máscaras de segmentação gravadas: todas as imagens do diretório *MASCARAS_PATH*, redimensionadas
+  para cada formato de *FORMATOS_MAPA*.
+
+Como o controlador recebe um mapa novo a cada frame, cada mapa é transformado em uma sequência de
+*N_QUADROS* quadros: um obstáculo de tamanho *TAMANHO_OBSTACULO* (em um mapa 60x60, escalado para os
+outros formatos) se desloca uma posição na horizontal a cada quadro (ver :func:`gera_quadros`). Assim,
+os traçadores incrementais, como o LPA*, são medidos reparando o caminho após uma mudança no mapa, e não
+reaproveitando o mesmo mapa.
+
+Em cada mapa, o caminho é traçado da região inferior central até *N_DESTINOS* destinos sorteados
+(alcançáveis ou não) por todos os traçadores de caminho de :func:`cria_tracadores`, em todos os quadros
+da sequência. O mapa expandido e o mapa de custo dados aos traçadores são obtidos pelo controlador (ver
+:func:`test.processa_mapa`). Também é medido o método
+:meth:`~codigo.controlador.modulos.controlador.Controlador.calcula_direcao()` completo, incluindo o
+processamento do mapa, na mesma sequência de quadros.
+
+Para cada grupo de mapas e traçador, são reportadas as latências p50/p95/p99, a quantidade de posições
+expandidas e o custo médio dos caminhos. Os resultados são salvos em JSON no arquivo *SAIDA_PATH*. Se
+o arquivo *REFERENCIA_PATH* existir (o resultado de uma versão anterior), também é mostrada a razão entre
+as latências p50 atuais e as de referência, para encontrar regressões.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.aestrela as aestrela
+import modulos.lpaestrela as lpaestrela
+import modulos.hierarquico as hierarquico
+import numpy as np
+import cv2 as cv
+import glob
+import json
+import os
+import platform
+import time
+
+
+# Parâmetros do script
+MASCARAS_PATH = "imagens-teste"
+SAIDA_PATH = "benchmark-tracadores.json"
+REFERENCIA_PATH = "benchmark-tracadores-referencia.json"
+FORMATOS_MAPA = [(60, 60), (120, 120)]
+DENSIDADES = [0.05, 0.15, 0.3]
+N_MAPAS_SINTETICOS = 3
+N_DESTINOS = 5
+N_QUADROS = 8
+TAMANHO_OBSTACULO = 4
+SEMENTE = 0
+
+
+def cria_tracadores():
+    """Retorna os traçadores de caminho comparados, indexados pelo nome.
+    """
+    return {
+            "aestrela": aestrela.AEstrela(),
+            "jps": aestrela.AEstrela(metodo="jps"),
+            "lpaestrela": lpaestrela.LPAEstrela(),
+            "hierarquico": hierarquico.AEstrelaHierarquico(),
+            }
+
+
+def gera_mapa_sintetico(formato, densidade, gerador):
+    """Gera um mapa com obstáculos em blocos e círculos, com a região inicial livre.
+    """
+    altura, largura = formato
+
+    # Blocos de obstáculos com um sexto da resolução
+    blocos = np.uint8(gerador.random((altura//6, largura//6)) < densidade)
+    mapa = cv.resize(blocos, (largura, altura), interpolation=cv.INTER_NEAREST)
+
+    # Obstáculos circulares
+    for _ in range(int(densidade*20)):
+        centro = (int(gerador.integers(largura)), int(gerador.integers(altura)))
+        raio = int(gerador.integers(2, max(3, altura//12)))
+        cv.circle(mapa, centro, raio, 1, -1)
+
+    # O Wall-e fica na região inferior central do mapa
+    mapa[-altura//6:, largura//2 - largura//10:largura//2 + largura//10] = 0
+
+    return mapa
+
+
+def gera_quadros(mapa):
+    """Gera a sequência de quadros de um mapa, com um obstáculo que se desloca na horizontal.
+
+    O obstáculo fica no meio do mapa e se desloca uma posição a cada quadro, simulando o que acontece com
+    o mapa segmentado durante a movimentação do robô.
+    """
+    altura, largura = mapa.shape
+    tamanho = max(1, round(TAMANHO_OBSTACULO*altura/60))
+    y = altura//2
+
+    quadros = []
+    for quadro in range(N_QUADROS):
+        x = largura//6 + quadro
+        mapa_quadro = mapa.copy()
+        mapa_quadro[y:y+tamanho, x:x+tamanho] = 1
+        quadros.append(mapa_quadro)
+
+    return quadros
+
+
+def gera_grupos(gerador):
+    """Retorna os grupos de mapas do benchmark, como uma lista de (nome, lista de mapas).
+    """
+    grupos = []
+
+    for formato in FORMATOS_MAPA:
+        for densidade in DENSIDADES:
+            mapas = [gera_mapa_sintetico(formato, densidade, gerador) for _ in range(N_MAPAS_SINTETICOS)]
+            grupos.append(("sintetico-{}x{}-d{}".format(*formato, densidade), mapas))
+
+        # Máscaras gravadas
+        mapas = []
+        for caminho in sorted(glob.glob(os.path.join(MASCARAS_PATH, "*.png"))):
+            imagem = cv.imread(caminho, cv.IMREAD_GRAYSCALE)
+            if imagem is not None:
+                mapas.append(cv.resize(imagem, formato[::-1])//255)
+
+        if mapas:
+            grupos.append(("gravado-{}x{}".format(*formato), mapas))
+
+    return grupos
+
+
+def resume(latencias, expandidos, custos):
+    """Resume as amostras de um grupo de mapas e traçador.
+    """
+    latencias = np.array(latencias)*1e-6  # ns para ms
+
+    resumo = {
+            "n": len(latencias),
+            "latencia_ms": {
+                "p50": float(np.percentile(latencias, 50)),
+                "p95": float(np.percentile(latencias, 95)),
+                "p99": float(np.percentile(latencias, 99)),
+                "media": float(latencias.mean()),
+                },
+            "sem_caminho": sum(custo is None for custo in custos),
+            }
+
+    if expandidos:
+        resumo["expandidos"] = {
+                "p50": float(np.percentile(expandidos, 50)),
+                "p95": float(np.percentile(expandidos, 95)),
+                "media": float(np.mean(expandidos)),
+                }
+
+    custos = [custo for custo in custos if custo is not None]
+    resumo["custo_medio"] = float(np.mean(custos)) if custos else None
+
+    return resumo
+
+
+if __name__ == "__main__":
+    gerador = np.random.default_rng(SEMENTE)
+    resultados = []
+
+    for nome_grupo, mapas in gera_grupos(gerador):
+        formato = mapas[0].shape
+        pos_inicial = (formato[0]-1, formato[1]//2)
+
+        amostras = {}
+        for mapa in mapas:
+            quadros = gera_quadros(mapa)
+            ctrl = test.cria_controlador(formato)
+            mapas_processados = [test.processa_mapa(quadro, ctrl) for quadro in quadros]
+
+            destinos = [(int(gerador.integers(formato[0])), int(gerador.integers(formato[1]))) for _ in range(N_DESTINOS)]
+
+            # Traçadores de caminho
+            for nome, tracador in cria_tracadores().items():
+                latencias, expandidos, custos = amostras.setdefault(nome, ([], [], []))
+
+                for pos_final in destinos:
+                    for mapa_expandido, custo in mapas_processados:
+                        inicio = time.perf_counter_ns()
+                        tracador.define_mapas(mapa_expandido, custo)
+                        vetor_caminho = tracador.gera_caminho(pos_inicial, pos_final)
+                        latencias.append(time.perf_counter_ns() - inicio)
+
+                        expandidos.append(tracador.retorna_n_expandidos())
+                        custos.append(test.custo_caminho(vetor_caminho, custo, pos_final))
+
+            # Controlador completo. O objeto é dado no formato (cy, cx, altura, largura)
+            ctrl = test.cria_controlador(formato)
+            latencias, _, custos = amostras.setdefault("controlador", ([], [], []))
+
+            for pos_final in destinos:
+                for quadro in quadros:
+                    inicio = time.perf_counter_ns()
+                    ctrl.define_mapa(quadro)
+                    ctrl.calcula_direcao(None, pos_final + (4, 4))
+                    latencias.append(time.perf_counter_ns() - inicio)
+                    custos.append(None)
+
+        for nome, (latencias, expandidos, custos) in amostras.items():
+            resultado = {"grupo": nome_grupo, "tracador": nome}
+            resultado.update(resume(latencias, expandidos, custos))
+
+            # O controlador não traça caminhos em todos os frames (pode estar evitando colisões)
+            if nome == "controlador":
+                del resultado["sem_caminho"], resultado["custo_medio"]
+
+            resultados.append(resultado)
+
+            print("{:<28} {:<12} p50 {:8.2f} ms  p95 {:8.2f} ms  p99 {:8.2f} ms  expandidos {:8.1f}".format(
+                nome_grupo, nome, resultado["latencia_ms"]["p50"], resultado["latencia_ms"]["p95"],
+                resultado["latencia_ms"]["p99"], resultado.get("expandidos", {}).get("media", float("nan"))))
+
+    saida = {
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "plataforma": platform.platform(),
+            "python": platform.python_version(),
+            "parametros": {
+                "formatos_mapa": FORMATOS_MAPA,
+                "densidades": DENSIDADES,
+                "n_mapas_sinteticos": N_MAPAS_SINTETICOS,
+                "n_destinos": N_DESTINOS,
+                "n_quadros": N_QUADROS,
+                "tamanho_obstaculo": TAMANHO_OBSTACULO,
+                "semente": SEMENTE,
+                },
+            "resultados": resultados,
+            }
+
+    with open(SAIDA_PATH, "w") as arquivo:
+        json.dump(saida, arquivo, indent=4)
+
+    print("Resultados salvos em", SAIDA_PATH)
+
+    # Comparação com uma versão anterior
+    if os.path.exists(REFERENCIA_PATH):
+        with open(REFERENCIA_PATH) as arquivo:
+            referencia = json.load(arquivo)
+
+        referencia = {(r["grupo"], r["tracador"]): r for r in referencia["resultados"]}
+
+        print("Latência p50 relativa à referência:")
+        for resultado in resultados:
+            chave = (resultado["grupo"], resultado["tracador"])
+            if chave in referencia:
+                razao = resultado["latencia_ms"]["p50"]/referencia[chave]["latencia_ms"]["p50"]
+                print("    {:<28} {:<12} {:.2f}".format(*chave, razao))
@@ -0,0 +1,64 @@
+#!/bin/env python3
+
+
+"""Compara os métodos de expansão do mapa e de geração do mapa de custo do controlador.
+
+Utiliza a imagem definida pelo parâmetro *IMAGEM_PATH* como mapa, redimensionada para cada um dos
+formatos de *FORMATOS_MAPA*. Para cada formato e método ("gaussiano" e "distancia"), o mapa é processado
+*N_FRAMES* vezes pelo método :meth:`~codigo.controlador.modulos.controlador.Controlador.define_mapa()`,
+com os parâmetros padrão do controlador (escalados para o formato).
+
+É mostrado o tempo médio por frame e a fração do mapa considerada colidível. Ao final, são mostrados
+o mapa expandido e o mapa de custo do último formato para cada método.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.controlador as controlador
+import numpy as np
+import cv2 as cv
+import time
+
+
+IMAGEM_PATH = "imagens-teste/mapa.png"
+FORMATOS_MAPA = [(60, 60), (120, 120), (240, 240)]
+METODOS = ["gaussiano", "distancia"]
+N_FRAMES = 50
+
+
+if __name__ == "__main__":
+    imagem = cv.imread(IMAGEM_PATH)
+
+    if imagem is None:
+        print("Não é possível carregar a imagem! abortando programa...")
+        exit(1)
+
+    imagem = cv.cvtColor(imagem, cv.COLOR_BGR2GRAY)
+
+    for formato in FORMATOS_MAPA:
+        mapa = cv.resize(imagem, formato[::-1])//255
+        print("Mapa {}x{}:".format(*formato))
+
+        imagens = []
+        for metodo in METODOS:
+            ctrl = controlador.Controlador(formato, [(-5, -15)], 4, 15)
+            ctrl.parametros_expansao(metodo=metodo)
+            ctrl.parametros_custo(metodo=metodo)
+
+            inicio = time.perf_counter()
+            for _ in range(N_FRAMES):
+                ctrl.define_mapa(mapa)
+            tempo = (time.perf_counter() - inicio)/N_FRAMES
+
+            mapa_expandido = ctrl._mapa_expandido
+            custo = ctrl._custo
+            print("    {}: {:.3f} ms por frame, {:.1f}% do mapa colidível".format(
+                metodo, 1000*tempo, 100*mapa_expandido.mean()))
+
+            imagens.append(cv.hconcat([mapa_expandido*255, np.uint8(255*custo/max(custo.max(), 1))]))
+
+    cv.imshow("gaussiano (acima) e distancia (abaixo)", cv.vconcat(imagens))
+    cv.waitKey(0)
+    cv.destroyAllWindows()
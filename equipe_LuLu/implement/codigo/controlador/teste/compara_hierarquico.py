@@ -0,0 +1,81 @@
+#!/bin/env python3
+
+
+"""Compara o A* com o traçador hierárquico em mapas de resoluções maiores.
+
+Utiliza a imagem definida pelo parâmetro *IMAGEM_PATH* como mapa, redimensionada para cada um dos
+formatos de *FORMATOS_MAPA*. O mapa é expandido e o mapa de custo é computado pelo controlador (ver
+:func:`test.processa_mapa`), com os kernels escalados para o formato do mapa. O caminho é traçado da região inferior
+central do mapa até *N_DESTINOS* destinos alcançáveis sorteados.
+
+Para cada formato de mapa e traçador, é mostrado o tempo médio por frame (preparação dos mapas e
+traçado do caminho), a quantidade média de posições expandidas (no traçador hierárquico, somando as do
+mapa reduzido) e a razão entre o custo do caminho obtido e o custo do caminho do A*.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.aestrela as aestrela
+import modulos.hierarquico as hierarquico
+import numpy as np
+import cv2 as cv
+import time
+
+
+IMAGEM_PATH = "imagens-teste/mapa.png"
+FORMATOS_MAPA = [(60, 60), (120, 120), (240, 240)]
+N_DESTINOS = 20
+FATOR = 4
+RAIO_CORREDOR = 1
+
+
+if __name__ == "__main__":
+    imagem = cv.imread(IMAGEM_PATH)
+
+    if imagem is None:
+        print("Não é possível carregar a imagem! abortando programa...")
+        exit(1)
+
+    imagem = cv.cvtColor(imagem, cv.COLOR_BGR2GRAY)
+    gerador = np.random.default_rng(0)
+
+    for formato in FORMATOS_MAPA:
+        mapa = cv.resize(imagem, formato[::-1])//255
+        mapa_expandido, custo = test.processa_mapa(mapa)
+        pos_inicial = (formato[0]-1, formato[1]//2)
+
+        tracadores = {
+                "A*": aestrela.AEstrela(),
+                "hierárquico": hierarquico.AEstrelaHierarquico(fator=FATOR, raio_corredor=RAIO_CORREDOR),
+                }
+
+        # Sorteia destinos alcançáveis
+        tracadores["A*"].define_mapas(mapa_expandido, custo)
+        destinos = []
+        while len(destinos) < N_DESTINOS:
+            pos_final = (int(gerador.integers(formato[0])), int(gerador.integers(formato[1])))
+            if tracadores["A*"].destino_alcancavel(pos_inicial, pos_final):
+                destinos.append(pos_final)
+
+        print("Mapa {}x{}:".format(*formato))
+
+        custos = {}
+        for nome, tracador in tracadores.items():
+            tempo_total = 0
+            expandidos_total = 0
+            custos[nome] = []
+
+            for pos_final in destinos:
+                inicio = time.perf_counter()
+                tracador.define_mapas(mapa_expandido, custo)
+                vetor_caminho = tracador.gera_caminho(pos_inicial, pos_final)
+                tempo_total += time.perf_counter() - inicio
+
+                expandidos_total += tracador.retorna_n_expandidos()
+                custos[nome].append(test.custo_caminho(vetor_caminho, custo, pos_final))
+
+            razao = np.array(custos[nome])/np.array(custos["A*"])
+            print("    {}: {:.2f} ms por frame, {:.1f} posições expandidas, custo relativo médio {:.4f} (máximo {:.4f})".format(
+                nome, 1000*tempo_total/N_DESTINOS, expandidos_total/N_DESTINOS, razao.mean(), razao.max()))
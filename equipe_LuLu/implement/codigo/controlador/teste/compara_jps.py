@@ -0,0 +1,76 @@
+#!/bin/env python3
+
+
+"""Compara o A* com o Jump Point Search (JPS) nos mapas de teste.
+
+Utiliza a imagem definida pelo parâmetro *IMAGEM_PATH* como mapa, redimensionada para cada um dos
+formatos de *FORMATOS_MAPA*. O mapa é expandido e o mapa de custo é computado pelo controlador (ver
+:func:`test.processa_mapa`), com os parâmetros padrão do formato do mapa. O caminho é traçado da região inferior central do mapa até cada um dos destinos de
+*DESTINOS*, dados em frações das dimensões do mapa.
+
+Para cada formato de mapa e método de busca, é mostrado o tempo médio por caminho, a quantidade média de
+posições expandidas e se os custos dos caminhos obtidos pelos dois métodos são iguais.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.aestrela as aestrela
+import cv2 as cv
+import time
+
+
+IMAGEM_PATH = "imagens-teste/mapa.png"
+FORMATOS_MAPA = [(50, 50), (60, 60), (100, 100), (150, 150)]
+DESTINOS = [(0.02, 0.02), (0.1, 0.9), (0.5, 0.5), (0.2, 0.3), (0.05, 0.5)]
+N_REPETICOES = 5
+
+
+if __name__ == "__main__":
+    imagem = cv.imread(IMAGEM_PATH)
+
+    if imagem is None:
+        print("Não é possível carregar a imagem! abortando programa...")
+        exit(1)
+
+    imagem = cv.cvtColor(imagem, cv.COLOR_BGR2GRAY)
+
+    for formato in FORMATOS_MAPA:
+        mapa = cv.resize(imagem, formato[::-1])//255
+        mapa_expandido, custo = test.processa_mapa(mapa)
+
+        pos_inicial = (formato[0]-1, formato[1]//2)
+        destinos = [(int(y*(formato[0]-1)), int(x*(formato[1]-1))) for y, x in DESTINOS]
+
+        custos = {}
+        print("Mapa {}x{}:".format(*formato))
+
+        for metodo in ("aestrela", "jps"):
+            tracador = aestrela.AEstrela(metodo=metodo)
+            tracador.define_mapas(mapa_expandido, custo)
+
+            tempo_total = 0
+            expandidos_total = 0
+            custos[metodo] = []
+
+            for pos_final in destinos:
+                for _ in range(N_REPETICOES):
+                    # Troca o mapa para que o caminho não seja reaproveitado
+                    tracador.define_mapas(mapa_expandido, custo)
+
+                    inicio = time.perf_counter()
+                    vetor_caminho = tracador.gera_caminho(pos_inicial, pos_final)
+                    tempo_total += time.perf_counter() - inicio
+
+                expandidos_total += tracador.retorna_n_expandidos()
+                custos[metodo].append(test.custo_caminho(vetor_caminho, custo, pos_final))
+
+            print("    {}: {:.2f} ms por caminho, {:.1f} posições expandidas por caminho".format(
+                metodo, 1000*tempo_total/(len(destinos)*N_REPETICOES), expandidos_total/len(destinos)))
+
+        iguais = all(
+                (c0 is None and c1 is None) or (c0 is not None and c1 is not None and abs(c0 - c1) < 1e-6*max(c0, 1))
+                for c0, c1 in zip(custos["aestrela"], custos["jps"])
+                )
+        print("    custos iguais:", iguais)
@@ -0,0 +1,81 @@
+#!/bin/env python3
+
+
+"""Compara o controlador com e sem a fusão temporal dos mapas (grade de ocupação).
+
+Utiliza a imagem definida pelo parâmetro *IMAGEM_PATH* como mapa base. A cada frame, *N_MANCHAS*
+manchas quadradas de lado *TAMANHO_MANCHA* são invertidas em posições sorteadas, simulando os erros de
+segmentação de um único frame. O objeto fica fixo na posição *POS_OBJETO*, dada no formato
+(cy, cx, altura, largura).
+
+Para cada configuração, é mostrado o tempo médio por frame, a quantidade de frames em que a direção
+mudou mais que *LIMIAR_MUDANCA* radianos em relação ao frame anterior e a quantidade de frames em que o
+processamento do mapa foi reaproveitado (nenhuma posição alterada).
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.controlador as controlador
+import numpy as np
+import cv2 as cv
+import time
+
+
+IMAGEM_PATH = "imagens-teste/mapa.png"
+FORMATO_MAPA = (60, 60)
+POS_OBJETO = (10, 50, 4, 4)
+N_MANCHAS = 3
+TAMANHO_MANCHA = 6
+N_FRAMES = 200
+LIMIAR_MUDANCA = 0.1
+SEMENTE = 0
+
+
+if __name__ == "__main__":
+    imagem = cv.imread(IMAGEM_PATH)
+
+    if imagem is None:
+        print("Não é possível carregar a imagem! abortando programa...")
+        exit(1)
+
+    imagem = cv.cvtColor(imagem, cv.COLOR_BGR2GRAY)
+    mapa_base = cv.resize(imagem, FORMATO_MAPA[::-1])//255
+
+    # Sequência de mapas com ruído
+    gerador = np.random.default_rng(SEMENTE)
+    mapas = []
+    for _ in range(N_FRAMES):
+        mapa = mapa_base.copy()
+        for _ in range(N_MANCHAS):
+            y = int(gerador.integers(FORMATO_MAPA[0] - TAMANHO_MANCHA))
+            x = int(gerador.integers(FORMATO_MAPA[1] - TAMANHO_MANCHA))
+            mapa[y:y+TAMANHO_MANCHA, x:x+TAMANHO_MANCHA] ^= 1
+        mapas.append(mapa)
+
+    for fusao in (False, True):
+        ctrl = controlador.Controlador(FORMATO_MAPA, [(-5, -15), (-10, -12)], 4, 15)
+        ctrl.parametros_ocupacao(fusao)
+
+        tempo_total = 0
+        mudancas = 0
+        reaproveitados = 0
+        direcao_anterior = None
+
+        for mapa in mapas:
+            inicio = time.perf_counter()
+            ctrl.calcula_direcao(mapa, POS_OBJETO)
+            tempo_total += time.perf_counter() - inicio
+
+            direcao = ctrl._direcao
+            if direcao is not None and direcao_anterior is not None and abs(direcao - direcao_anterior) > LIMIAR_MUDANCA:
+                mudancas += 1
+            direcao_anterior = direcao
+
+            alteradas = ctrl.retorna_posicoes_alteradas()
+            if alteradas is not None and not alteradas.any():
+                reaproveitados += 1
+
+        print("{}: {:.2f} ms por frame, {} mudanças de direção, {} frames reaproveitados".format(
+            "com fusão" if fusao else "sem fusão", 1000*tempo_total/N_FRAMES, mudancas, reaproveitados))
@@ -0,0 +1,75 @@
+#!/bin/env python3
+
+
+"""Compara o A* com o LPA* em uma sequência de mapas que mudam pouco entre frames.
+
+Utiliza a imagem definida pelo parâmetro *IMAGEM_PATH* como mapa base. A cada frame, um obstáculo de
+tamanho *TAMANHO_OBSTACULO* se desloca uma posição na horizontal, simulando o que acontece com o mapa
+segmentado durante a movimentação do robô. Os mapas são expandidos e o mapa de custo é computado pelo
+controlador (ver :func:`test.processa_mapa`).
+
+Para cada traçador de caminho, é mostrado o tempo médio por frame e a quantidade média de posições
+expandidas.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.aestrela as aestrela
+import modulos.lpaestrela as lpaestrela
+import cv2 as cv
+import time
+
+
+IMAGEM_PATH = "imagens-teste/mapa.png"
+FORMATO_MAPA = (60, 60)
+POS_FINAL = (5, 5)
+TAMANHO_OBSTACULO = (4, 4)
+N_FRAMES = 40
+
+
+if __name__ == "__main__":
+    imagem = cv.imread(IMAGEM_PATH)
+
+    if imagem is None:
+        print("Não é possível carregar a imagem! abortando programa...")
+        exit(1)
+
+    # Cria o mapa com base na imagem
+    imagem = cv.cvtColor(imagem, cv.COLOR_BGR2GRAY)
+    imagem = cv.resize(imagem, FORMATO_MAPA)
+    mapa_base = imagem//255
+
+    # Posição de início
+    pos_inicial = (mapa_base.shape[0]-1, mapa_base.shape[1]//2)
+
+    # Sequência de mapas com o obstáculo em movimento
+    ctrl = test.cria_controlador(FORMATO_MAPA)
+    mapas = []
+    y = mapa_base.shape[0]//2
+    for frame in range(N_FRAMES):
+        x = 10 + frame % 20
+        mapa = mapa_base.copy()
+        mapa[y:y+TAMANHO_OBSTACULO[0], x:x+TAMANHO_OBSTACULO[1]] = 1
+        mapas.append(test.processa_mapa(mapa, ctrl))
+
+    tracadores = {
+            "A*": aestrela.AEstrela(),
+            "LPA*": lpaestrela.LPAEstrela(),
+            }
+
+    for nome, tracador in tracadores.items():
+        tempo_total = 0
+        expandidos_total = 0
+
+        for mapa_expandido, custo in mapas:
+            inicio = time.perf_counter()
+            tracador.define_mapas(mapa_expandido, custo)
+            tracador.gera_caminho(pos_inicial, POS_FINAL)
+            tempo_total += time.perf_counter() - inicio
+
+            expandidos_total += tracador.retorna_n_expandidos()
+
+        print("{}: {:.2f} ms por frame, {:.1f} posições expandidas por frame".format(
+            nome, 1000*tempo_total/N_FRAMES, expandidos_total/N_FRAMES))
@@ -0,0 +1,74 @@
+#!/bin/env python3
+
+
+"""Mede as alocações de memória do processamento do mapa no controlador.
+
+Utiliza a imagem definida pelo parâmetro *IMAGEM_PATH* como mapa, redimensionada para cada um dos formatos
+de *FORMATOS_MAPA*. O método :meth:`~codigo.controlador.modulos.controlador.Controlador.define_mapa()` é
+executado *N_FRAMES* vezes com o :mod:`tracemalloc` ativo, que registra as alocações do Python e dos arrays
+do Numpy.
+
+Para cada formato, é mostrada a quantidade de blocos e de bytes alocados que continuam vivos após os
+frames, o pico de memória de um frame e o tempo médio por frame (medido sem o :mod:`tracemalloc`).
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.controlador as controlador
+import cv2 as cv
+import time
+import tracemalloc
+
+
+IMAGEM_PATH = "imagens-teste/mapa.png"
+FORMATOS_MAPA = [(60, 60), (120, 120)]
+N_FRAMES = 200
+
+
+if __name__ == "__main__":
+    imagem = cv.imread(IMAGEM_PATH)
+
+    if imagem is None:
+        print("Não é possível carregar a imagem! abortando programa...")
+        exit(1)
+
+    imagem = cv.cvtColor(imagem, cv.COLOR_BGR2GRAY)
+    mapa = imagem//255
+
+    for formato in FORMATOS_MAPA:
+        escala = formato[0]/60
+        ctrl = controlador.Controlador(formato, [(round(-5*escala), round(-15*escala))], round(4*escala), round(15*escala))
+
+        # O primeiro frame não é medido
+        ctrl.define_mapa(mapa)
+
+        tracemalloc.start()
+        inicial = tracemalloc.take_snapshot()
+
+        for _ in range(N_FRAMES):
+            ctrl.define_mapa(mapa)
+
+        final = tracemalloc.take_snapshot()
+
+        # Pico de memória de um único frame
+        tracemalloc.reset_peak()
+        atual, _ = tracemalloc.get_traced_memory()
+        ctrl.define_mapa(mapa)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Desconsidera as alocações do próprio tracemalloc
+        filtro = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        diferencas = final.filter_traces(filtro).compare_to(inicial.filter_traces(filtro), "lineno")
+        n_blocos = sum(diferenca.count_diff for diferenca in diferencas)
+        n_bytes = sum(diferenca.size_diff for diferenca in diferencas)
+
+        inicio = time.perf_counter()
+        for _ in range(N_FRAMES):
+            ctrl.define_mapa(mapa)
+        tempo = (time.perf_counter() - inicio)/N_FRAMES
+
+        print("Mapa {}x{}: {} blocos ({} bytes) retidos em {} frames, pico de {} bytes por frame, {:.3f} ms por frame".format(
+            *formato, n_blocos, n_bytes, N_FRAMES, pico - atual, 1000*tempo))
@@ -1,13 +1,63 @@
 #!/bin/env python3
 
-
 """Módulo necessário para executar os scripts de teste.
 
-Inclua ele no início do script.
+Inclua ele no início do script. Também fornece as funções comuns aos scripts que comparam os traçadores
+de caminho, para que os mapas sejam preparados exatamente como no controlador.
 """
 
-
 import sys
 
-
 sys.path.append("../")
+
+import modulos.controlador as controlador
+
+
+def cria_controlador(formato, tracador=None):
+    """Cria um controlador com os blocos de colisão dos scripts de teste, escalados para o formato.
+    """
+    escala = formato[0]/60
+    posicoes_esquerda = [
+            (-5, -15),
+            (-10, -12),
+            (-15, -10),
+            (-17, -3)
+            ]
+    posicoes_esquerda = [(round(y*escala), round(x*escala)) for y, x in posicoes_esquerda]
+
+    return controlador.Controlador(formato, posicoes_esquerda, round(4*escala), round(15*escala), tracador)
+
+
+def processa_mapa(mapa, ctrl=None):
+    """Retorna o mapa expandido e o mapa de custo, como são entregues pelo controlador ao traçador de caminho.
+
+    O processamento é feito pelo controlador *ctrl*, com os parâmetros de expansão e de custo que estiverem
+    configurados nele. Se for None, é usado um controlador padrão no formato do mapa (ver
+    :func:`cria_controlador`). O controlador reaproveita os buffers a cada mapa, então são retornadas cópias.
+    """
+    if ctrl is None:
+        ctrl = cria_controlador(mapa.shape)
+
+    mapa_expandido = ctrl._expande_mapa(mapa)
+    custo = ctrl._computa_custo(mapa_expandido)
+
+    return mapa_expandido.copy(), custo.copy()
+
+
+def custo_caminho(vetor_caminho, custo, pos_final, passo=10):
+    """Soma o custo dos passos e do mapa de custo de um caminho, até o ponto final.
+
+    Retorna None se não houver caminho.
+    """
+    if vetor_caminho is None:
+        return None
+
+    total = 0
+    for p0, p1 in zip(vetor_caminho, vetor_caminho[1:] + [pos_final]):
+        diagonal = p0[0] != p1[0] and p0[1] != p1[1]
+        total += passo*1.414 if diagonal else passo
+
+        if p1 != pos_final:
+            total += custo[p1]
+
+    return float(total)
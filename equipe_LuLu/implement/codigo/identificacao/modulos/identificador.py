@@ -8,6 +8,7 @@ utilize a classe :class:`Identificador`.
 """
 
 
+from time import perf_counter_ns
 import numpy as np
 import cv2 as cv
 
@@ -20,6 +21,8 @@ class Identificador():
     Veja o método :meth:`identifica_lixo_proximo` para mais informações.
 
     Se deseja identificar todos os lixos do frame, utilize o método :meth:`identifica_lixos`.
+
+    O tempo da identificação do último frame é retornado pelo método :meth:`retorna_tempos()`.
     """
  
     def __init__(self, path_modelo : str, formato_imagem : tuple = None):
@@ -49,13 +52,17 @@ class Identificador():
         self._formato_imagem = formato_imagem
         self._classificador = cv.CascadeClassifier(path_modelo)
 
+        # Tempo das etapas da última identificação (ns)
+        self._tempos = {}
+
     def define_frame(self, frame : np.ndarray, imagem_debug : np.ndarray = None):
         """Define o frame usado na identificação.
 
-        É possível definir uma imagem para ser a inicial de debug. Se receber um frame com tamanho diferente,
-        ele será redimensionado para o definido ao instanciar a classe. Veja o método :meth:`__init__()` para
-        informações de como fazer isso. O frame apenas é usado na identificação do lixo após ser redimensionado
-        para o formato correto.
+        É possível definir uma imagem para ser a inicial de debug. Se não for definida, a imagem de debug será
+        uma cópia do frame, feita apenas quando for necessária (ver :meth:`_obtem_imagem_debug()`). Se receber
+        um frame com tamanho diferente, ele será redimensionado para o definido ao instanciar a classe. Veja o
+        método :meth:`__init__()` para informações de como fazer isso. O frame apenas é usado na identificação
+        do lixo após ser redimensionado para o formato correto.
 
         Parameters
         ----------
@@ -71,6 +78,7 @@ class Identificador():
 
             # Frame original
             self._frame = frame
+            self._frame_original = frame
             self._formato_frame_original = frame.shape
 
             # Ajuste de formato
@@ -79,10 +87,9 @@ class Identificador():
 
             self._formato_frame = self._frame.shape
 
-            # Imagem de debug
+            # Imagem de debug. A cópia do frame só é feita quando for necessária.
             if imagem_debug is None:
-                self._img_debug = frame.copy()
-                self._formato_img_debug = self._img_debug.shape
+                self._formato_img_debug = frame.shape
 
         # Definindo uma imagem de debug manualmente
         if imagem_debug is not None:
@@ -185,6 +192,35 @@ class Identificador():
         numpy.ndarray
             Imagem de debug.
         """
+        return self._obtem_imagem_debug()
+
+    def retorna_tempos(self):
+        """Retorna o tempo de cada etapa da identificação do último frame.
+
+        A única etapa é "haar", que inclui a conversão para cinza e a classificação pelo Haar Cascade. Ela só
+        está presente se a identificação foi feita no último frame.
+
+        Returns
+        -------
+        dict
+            Dicionário com o nome de cada etapa e sua duração em nanossegundos.
+        """
+        return self._tempos
+
+    def _obtem_imagem_debug(self):
+        """Retorna a imagem de debug, criando-a se necessário.
+
+        Se nenhuma imagem de debug foi definida em :meth:`define_frame()`, a imagem de debug é uma cópia do
+        frame original. A cópia é feita apenas no primeiro uso, então não há cópia se o debug não for usado.
+
+        Returns
+        -------
+        numpy.ndarray
+            Imagem de debug.
+        """
+        if self._img_debug is None:
+            self._img_debug = self._frame_original.copy()
+
         return self._img_debug
 
     def _reinicia_iteracao(self):
@@ -205,9 +241,13 @@ class Identificador():
         self._debug_lixo_proximo_feito = False
 
         # Imagem de debug
+        self._frame_original = None
         self._img_debug = None
         self._formato_img_debug = None
 
+        # Tempo das etapas
+        self._tempos.clear()
+
     def _pos_frame2debug(self, pos: tuple):
         """Transforma as coordenadas do frame usado na identificação para as coordenadas da imagem de debug.
 
@@ -283,10 +323,12 @@ class Identificador():
             return self._classificacao
 
         # Transformando a imagem da câmera em cinza (o Haar cascade opera com grayscale)
+        inicio = perf_counter_ns()
         cinza = cv.cvtColor(self._frame, cv.COLOR_BGR2GRAY)
 
         # Identifica todos os lixos
         self._classificacao = self._classificador.detectMultiScale(cinza, minNeighbors=1, minSize=(10,10))
+        self._tempos["haar"] = perf_counter_ns() - inicio
 
         return self._classificacao
 
@@ -305,13 +347,14 @@ class Identificador():
             return self._img_debug
 
         self._debug_todos_lixos_feito = True
+        img_debug = self._obtem_imagem_debug()
 
         for (x, y, l, a) in self._classificacao:
             # As posições iniciais e finais devem ser convertidas para a imagem de debug
             pos_inicial = self._pos_frame2debug((x, y))
             pos_final = self._pos_frame2debug((x + l, y + a))
 
-            cv.rectangle(self._img_debug, pos_inicial, pos_final, (255, 255, 0), 2)
+            cv.rectangle(img_debug, pos_inicial, pos_final, (255, 255, 0), 2)
 
         return self._img_debug
 
@@ -372,10 +415,11 @@ class Identificador():
             return self._img_debug
 
         self._debug_lixo_proximo_feito = True
+        img_debug = self._obtem_imagem_debug()
 
         # Retorna nada se não encontrou nenhum lixo
         if self._pos_mais_proxima is None:
-            return self._img_debug
+            return img_debug
 
         # Posição onde deve desenhar o círculo
         (x, y, l, a, cx, cy) = self._pos_mais_proxima
@@ -384,6 +428,6 @@ class Identificador():
         raio = (formato[0] + formato[1]) // 4
 
         # Desenha o círculo
-        cv.circle(self._img_debug, pos, raio, (100, 100, 255), 2)
+        cv.circle(img_debug, pos, raio, (100, 100, 255), 2)
 
         return self._img_debug
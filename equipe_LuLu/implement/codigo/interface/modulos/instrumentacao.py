@@ -0,0 +1,257 @@
+#!/bin/env python3
+
+
+"""Medição do tempo das etapas do processamento.
+
+Implementa a classe :class:`Instrumentacao`, que guarda os tempos das últimas execuções de cada etapa do
+processamento (decodificação do JPG, segmentação, controlador, etc.) e resume esses tempos pelos percentis
+p50 e p95. É usada pela interface e pelo modo autônomo.
+"""
+
+
+from time import perf_counter_ns
+import numpy as np
+import json
+import time
+
+
+class Instrumentacao():
+    """Mede o tempo de cada etapa do processamento.
+
+    Os tempos de cada etapa são guardados em um buffer circular com capacidade para as últimas *capacidade*
+    execuções. O buffer é criado na primeira medição da etapa, e as medições seguintes apenas sobrescrevem
+    as posições do buffer. Os tempos são medidos em nanossegundos com :func:`time.perf_counter_ns()`.
+
+    Há duas formas de medir uma etapa. A primeira é delimitar o trecho com a etapa retornada por
+    :meth:`etapa()`:
+
+    >>> instrumentacao = Instrumentacao()
+    >>> with instrumentacao.etapa("segmentacao"):
+    >>>     mascara = segmentador.retorna_mascara(imagem)
+
+    A segunda é registrar um tempo já medido (por exemplo, pelo método ``retorna_tempos()`` do segmentador,
+    do identificador ou do controlador) com o método :meth:`registra()`:
+
+    >>> instrumentacao.registra("controlador.tracador", duracao_ns)
+
+    O resumo dos tempos (p50, p95, média e última medição de cada etapa) é obtido por :meth:`resumo()`, por
+    :meth:`texto()`, formatado para ser mostrado ao usuário, ou salvo em um arquivo JSON por :meth:`salva()`.
+
+    Uma etapa não pode ser aninhada nela mesma, mas etapas diferentes podem. O custo de uma medição é pouco
+    maior que o de duas chamadas de :func:`time.perf_counter_ns()` (ver o script ``teste/mede_instrumentacao.py``).
+    """
+
+    def __init__(self, capacidade : int = 512):
+        """Inicialização da instrumentação.
+
+        Parameters
+        ----------
+        capacidade : int, default 512
+            Quantidade de medições guardadas de cada etapa. As medições mais antigas são descartadas.
+        """
+        self._capacidade = capacidade
+        self._etapas = {}
+
+    def etapa(self, nome : str):
+        """Retorna a etapa com o nome fornecido, criando-a se necessário.
+
+        A etapa pode ser usada como gerenciador de contexto (bloco *with*) para medir um trecho de código. O
+        mesmo objeto é retornado para o mesmo nome, então pode ser guardado para evitar a busca pelo nome.
+
+        Parameters
+        ----------
+        nome : str
+            Nome da etapa.
+
+        Returns
+        -------
+        _Etapa
+            Etapa com o nome fornecido.
+        """
+        etapa = self._etapas.get(nome)
+
+        if etapa is None:
+            etapa = self._etapas[nome] = _Etapa(self._capacidade)
+
+        return etapa
+
+    def registra(self, nome : str, duracao_ns : int):
+        """Registra um tempo medido de uma etapa.
+
+        Parameters
+        ----------
+        nome : str
+            Nome da etapa.
+
+        duracao_ns : int
+            Duração da etapa, em nanossegundos.
+        """
+        self.etapa(nome).registra(duracao_ns)
+
+    def registra_tempos(self, tempos : dict, prefixo : str = ""):
+        """Registra os tempos de várias etapas.
+
+        Parameters
+        ----------
+        tempos : dict
+            Dicionário com o nome de cada etapa e sua duração em nanossegundos.
+
+        prefixo : str, default ""
+            Prefixo adicionado ao nome das etapas.
+        """
+        for nome, duracao_ns in tempos.items():
+            self.etapa(prefixo + nome).registra(duracao_ns)
+
+    def retorna_tempos(self, nome : str):
+        """Retorna as medições guardadas de uma etapa, sem ordem definida.
+
+        Parameters
+        ----------
+        nome : str
+            Nome da etapa.
+
+        Returns
+        -------
+        numpy.ndarray
+            Tempos da etapa (int64), em nanossegundos. Vazio se a etapa não foi medida.
+        """
+        etapa = self._etapas.get(nome)
+
+        if etapa is None:
+            return np.zeros(0, dtype=np.int64)
+
+        return etapa.retorna_tempos()
+
+    def limpa(self):
+        """Descarta todas as medições.
+
+        As etapas continuam existindo, então as retornadas por :meth:`etapa()` continuam válidas.
+        """
+        for etapa in self._etapas.values():
+            etapa.limpa()
+
+    def resumo(self):
+        """Resume as medições de cada etapa.
+
+        Returns
+        -------
+        dict
+            Dicionário indexado pelo nome da etapa. Cada valor é um dicionário com a quantidade de medições
+            guardadas ("n") e os tempos em milissegundos: "p50", "p95", "media" e "ultimo".
+        """
+        resumo = {}
+
+        for nome, etapa in self._etapas.items():
+            tempos = etapa.retorna_tempos()
+
+            if tempos.size == 0:
+                continue
+
+            tempos = tempos*1e-6  # ns para ms
+            resumo[nome] = {
+                    "n": int(tempos.size),
+                    "p50": float(np.percentile(tempos, 50)),
+                    "p95": float(np.percentile(tempos, 95)),
+                    "media": float(tempos.mean()),
+                    "ultimo": etapa.retorna_ultimo()*1e-6,
+                    }
+
+        return resumo
+
+    def texto(self):
+        """Retorna o resumo das medições formatado como texto, uma etapa por linha.
+
+        Returns
+        -------
+        str
+            Resumo das medições.
+        """
+        linhas = ["{:<32} {:>10} {:>10} {:>6}".format("etapa", "p50 (ms)", "p95 (ms)", "n")]
+
+        for nome, info in self.resumo().items():
+            linhas.append("{:<32} {:>10.3f} {:>10.3f} {:>6}".format(nome, info["p50"], info["p95"], info["n"]))
+
+        return "\n".join(linhas)
+
+    def salva(self, path_arquivo : str):
+        """Salva o resumo das medições em um arquivo JSON.
+
+        Parameters
+        ----------
+        path_arquivo : str
+            Arquivo onde o resumo será salvo.
+        """
+        saida = {
+                "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "capacidade": self._capacidade,
+                "etapas": self.resumo(),
+                }
+
+        with open(path_arquivo, "w") as arquivo:
+            json.dump(saida, arquivo, indent=4)
+
+
+class _Etapa():
+    """Buffer circular com as medições de uma etapa.
+
+    Essa classe é usada apenas pela :class:`Instrumentacao` e não deve ser instanciada diretamente.
+    """
+
+    __slots__ = ("_tempos", "_capacidade", "_indice", "_cheio", "_inicio")
+
+    def __init__(self, capacidade):
+        self._tempos = [0]*capacidade
+        self._capacidade = capacidade
+        self._indice = 0
+        self._cheio = False
+        self._inicio = 0
+
+    def __enter__(self):
+        self._inicio = perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        # Mesmo código de registra(), repetido para evitar uma chamada de método
+        indice = self._indice
+        self._tempos[indice] = perf_counter_ns() - self._inicio
+        indice += 1
+
+        if indice == self._capacidade:
+            indice = 0
+            self._cheio = True
+
+        self._indice = indice
+
+    def registra(self, duracao_ns):
+        """Registra uma medição no buffer, sobrescrevendo a mais antiga se estiver cheio.
+        """
+        indice = self._indice
+        self._tempos[indice] = duracao_ns
+        indice += 1
+
+        if indice == self._capacidade:
+            indice = 0
+            self._cheio = True
+
+        self._indice = indice
+
+    def limpa(self):
+        """Descarta as medições.
+        """
+        self._indice = 0
+        self._cheio = False
+
+    def retorna_tempos(self):
+        """Retorna as medições guardadas (em ns), sem ordem definida.
+        """
+        n = self._capacidade if self._cheio else self._indice
+
+        return np.array(self._tempos[:n], dtype=np.int64)
+
+    def retorna_ultimo(self):
+        """Retorna a última medição (em ns). Se não houver medições, retorna 0.
+        """
+        if not self._cheio and self._indice == 0:
+            return 0
+
+        return self._tempos[self._indice - 1]
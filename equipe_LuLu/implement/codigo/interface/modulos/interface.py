@@ -13,6 +13,7 @@ ser usada pelo usuário final.
 
 from .TLSstream import TLSclient
 from .video import decodifica_frame
+from .instrumentacao import Instrumentacao
 import PySide6.QtWidgets as QtWidgets
 import PySide6.QtCore as QtCore
 import PySide6.QtGui as QtGui
@@ -32,6 +33,11 @@ class Interface(QtWidgets.QMainWindow):
     Deve ser fornecido um recebedor de vídeo para que a interface receba os frames do Wall-e e
     apresente ao usuário. Para enviar os comandos do usuário para o Wall-e, deve ser fornecido um
     recebedor de comandos. Ambos são da classe :class:`TLSclient`.
+
+    A interface mede o tempo da decodificação e da conversão de cor de cada frame recebido. Essas medições
+    são feitas pela :class:`~codigo.interface.modulos.instrumentacao.Instrumentacao` retornada por
+    :meth:`retorna_instrumentacao()`, que pode ser usada pelas funções de callback para medir as suas próprias
+    etapas. O resumo dos tempos é mostrado ao apertar a tecla 'i' (ver :meth:`mostra_instrumentacao()`).
     """
 
     def __init__(self, arquivo_ui: str, recebedor_video: TLSclient = None, enviador_comandos: TLSclient = None):
@@ -76,6 +82,13 @@ class Interface(QtWidgets.QMainWindow):
         # Esse atributo determina o tempo em segundos entre cada um desses envios.
         self.delay_enviador = 0.1
 
+        # Medição do tempo das etapas do processamento dos frames. Se o arquivo for definido, o resumo
+        # dos tempos é salvo nele a cada vez que for mostrado.
+        self._instrumentacao = Instrumentacao()
+        self._etapa_decodificacao = self._instrumentacao.etapa("decodificacao")
+        self._etapa_conversao_cor = self._instrumentacao.etapa("conversao_cor")
+        self.arquivo_instrumentacao = None
+
         # Carrega o arquivo de interface do Qt Designer
         loader = QtUiTools.QUiLoader()
         arquivo_da_interface = QtCore.QFile(arquivo_ui)
@@ -203,6 +216,27 @@ class Interface(QtWidgets.QMainWindow):
         """
         self._video_callback_lista.append(callback)
 
+    def retorna_instrumentacao(self):
+        """Retorna a instrumentação usada para medir o tempo das etapas do processamento dos frames.
+
+        Returns
+        -------
+        Instrumentacao
+            Instrumentação da interface.
+        """
+        return self._instrumentacao
+
+    def mostra_instrumentacao(self):
+        """Mostra o resumo dos tempos das etapas do processamento dos frames.
+
+        O resumo é impresso no terminal. Se o atributo *arquivo_instrumentacao* for definido, o resumo também
+        é salvo nesse arquivo (formato JSON).
+        """
+        print(self._instrumentacao.texto())
+
+        if self.arquivo_instrumentacao is not None:
+            self._instrumentacao.salva(self.arquivo_instrumentacao)
+
     def atualiza_direcao_keyboard(self):
         """Atualiza a direção de movimento do Wall-e com base na tecla pressionada.
 
@@ -272,9 +306,12 @@ class Interface(QtWidgets.QMainWindow):
             return -1
 
         # Conversão dos bytes recebidos para imagem RGB
-        jpg = np.frombuffer(recebedor_video.dados, np.uint8)
-        BGR = cv.imdecode(jpg, cv.IMREAD_COLOR)
-        RGB = cv.cvtColor(BGR, cv.COLOR_BGR2RGB)
+        with self._etapa_decodificacao:
+            jpg = np.frombuffer(recebedor_video.dados, np.uint8)
+            BGR = cv.imdecode(jpg, cv.IMREAD_COLOR)
+
+        with self._etapa_conversao_cor:
+            RGB = cv.cvtColor(BGR, cv.COLOR_BGR2RGB)
 
         # Atualiza o frame automaticamente
         if self.atualiza_frame_automaticamente:
@@ -445,7 +482,8 @@ class _FiltroDeEventos(QtCore.QObject):
     def eventFilter(self, widget, event):
         """Filtra os eventos e lê apenas os caracteres do teclado e os eventos do mouse.
 
-        Os carácteres 'a', 's', 'w' e 'd' são usados para controlar a direção do joystick.
+        Os carácteres 'a', 's', 'w' e 'd' são usados para controlar a direção do joystick. O carácter 'i'
+        mostra o resumo dos tempos das etapas do processamento (ver :meth:`Interface.mostra_instrumentacao()`).
         Os eventos do mouse são usados para controlar tanto a direção do joystick, quanto a
         barra de velocidade.
         """
@@ -473,6 +511,10 @@ class _FiltroDeEventos(QtCore.QObject):
                 self.ultima_atualizacao_eixo_x = time.time()
                 widget.pode_checar_eixo_x = False
 
+            elif key == 'i':
+                widget.mostra_instrumentacao()
+                return False
+
             else:
                 return False
 
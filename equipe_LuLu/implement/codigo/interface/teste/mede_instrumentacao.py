@@ -0,0 +1,56 @@
+#!/bin/env python3
+
+
+"""Mede o custo da instrumentação das etapas do processamento.
+
+Executa *N_MEDICOES* medições vazias de três formas: apenas duas chamadas de :func:`time.perf_counter_ns()`
+(referência), com uma etapa da :class:`~codigo.interface.modulos.instrumentacao.Instrumentacao` usada
+como gerenciador de contexto (bloco *with*) e com o método
+:meth:`~codigo.interface.modulos.instrumentacao.Instrumentacao.registra()`.
+
+É mostrado o custo médio de cada medição, em nanossegundos, já descontado o custo do laço.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.instrumentacao as instrumentacao
+from time import perf_counter_ns
+import time
+
+
+N_MEDICOES = 1000000
+
+
+if __name__ == "__main__":
+    medidor = instrumentacao.Instrumentacao()
+    etapa = medidor.etapa("vazia")
+
+    # Custo do laço
+    inicio = time.perf_counter()
+    for _ in range(N_MEDICOES):
+        pass
+    laco = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(N_MEDICOES):
+        t0 = perf_counter_ns()
+        t1 = perf_counter_ns()
+    referencia = time.perf_counter() - inicio - laco
+
+    inicio = time.perf_counter()
+    for _ in range(N_MEDICOES):
+        with etapa:
+            pass
+    contexto = time.perf_counter() - inicio - laco
+
+    inicio = time.perf_counter()
+    for _ in range(N_MEDICOES):
+        t0 = perf_counter_ns()
+        medidor.registra("registrada", perf_counter_ns() - t0)
+    registra = time.perf_counter() - inicio - laco
+
+    print("duas chamadas de perf_counter_ns: {:.0f} ns".format(1e9*referencia/N_MEDICOES))
+    print("etapa (bloco with): {:.0f} ns".format(1e9*contexto/N_MEDICOES))
+    print("registra(): {:.0f} ns".format(1e9*registra/N_MEDICOES))
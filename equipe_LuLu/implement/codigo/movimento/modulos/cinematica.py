@@ -0,0 +1,46 @@
+#!/bin/env python3
+
+
+"""Cinemática do Wall-e.
+
+Implementa a função :func:`mistura_velocidades`, que converte a velocidade linear e angular do Wall-e nas
+velocidades dos motores direito e esquerdo. Ela é usada pela classe
+:class:`~codigo.movimento.modulos.movimentacao.Movimento` e pode ser usada fora da Raspberry Pi (por exemplo,
+em simulações), pois não depende do GPIO.
+"""
+
+
+def mistura_velocidades(velocidade_linear: float, velocidade_angular: float):
+    """Converte a velocidade linear e angular nas velocidades dos motores esquerdo e direito.
+
+    As velocidades linear e angular são números de -100 a 100, como no método
+    :meth:`~codigo.movimento.modulos.movimentacao.Movimento.define_velocidade()`. Se a soma dos seus módulos
+    for maior que 100, elas são normalizadas para que as velocidades dos motores não ultrapassem 100%.
+
+    Parameters
+    ----------
+    velocidade_linear : float
+        A velocidade linear de movimento do Wall-e.
+
+    velocidade_angular : float
+        A velocidade angular de movimento do Wall-e. Positiva no sentido anti-horário.
+
+    Returns
+    -------
+    float
+        Velocidade do motor esquerdo (-100 a 100).
+
+    float
+        Velocidade do motor direito (-100 a 100).
+    """
+    # Caso PWM maior seja maior que 100, precisa-se normalizar os duty-cycles, para não utrapassar o limite de 100%.
+    mod_vel = abs(velocidade_linear) + abs(velocidade_angular)
+    if mod_vel > 100:
+        velocidade_linear = velocidade_linear/mod_vel * 99.99999
+        velocidade_angular = velocidade_angular/mod_vel * 99.9999
+
+    # Cinemática do motor (direito e esquerdo)
+    pe = velocidade_linear - velocidade_angular
+    pd = velocidade_linear + velocidade_angular
+
+    return pe, pd
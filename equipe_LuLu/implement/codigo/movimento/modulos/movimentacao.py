@@ -9,6 +9,7 @@ Basta fornecer a velocidade linear e angular.
 
 
 from .motores import DC, Servo, configura_GPIO
+from .cinematica import mistura_velocidades
 import RPi.GPIO as GPIO
 import time
 
@@ -89,6 +90,9 @@ class Movimento():
         se mover o máximo possível no sentido horário (visualizando de cima para baixo). 100 significa o máximo
         possível no sentido anti-horário (visualizando de cima para baixo).
 
+        As velocidades dos motores são obtidas pela função
+        :func:`~codigo.movimento.modulos.cinematica.mistura_velocidades()`.
+
         Parameters
         ----------
         velocidade_linear : float
@@ -101,15 +105,8 @@ class Movimento():
         if self._sinaliza_lixo:
             return
 
-        # Caso PWM maior seja maior que 100, precisa-se normalizar os duty-cycles, para não utrapassar o limite de 100%.
-        mod_vel = abs(velocidade_linear) + abs(velocidade_angular)
-        if mod_vel > 100:
-            velocidade_linear = velocidade_linear/mod_vel * 99.99999
-            velocidade_angular = velocidade_angular/mod_vel * 99.9999
-
         # Cinemática do motor (direito e esquerdo)
-        pe = velocidade_linear - velocidade_angular
-        pd = velocidade_linear + velocidade_angular
+        pe, pd = mistura_velocidades(velocidade_linear, velocidade_angular)
 
         self._DC.velocidade_motor_D(pd)
         self._DC.velocidade_motor_E(pe)
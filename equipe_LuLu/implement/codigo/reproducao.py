@@ -0,0 +1,247 @@
+#!/bin/env python3
+
+
+"""Reprodução de vídeos gravados no modo autônomo, sem interface gráfica.
+
+Permite medir o desempenho do modo autônomo (:class:`~codigo.autonomo.Auto` ou
+:class:`~codigo.autonomo.AutoConcorrente`) fora do Wall-e. A interface e o enviador de comandos são
+substituídos por :class:`InterfaceFalsa` e :class:`EnviadorFalso`, que apenas guardam o que receberam. Os
+frames são lidos de um vídeo ou de uma pasta de imagens JPG pela função :func:`le_frames` e fornecidos ao modo
+autônomo pela função :func:`reproduz`.
+
+>>> interface = InterfaceFalsa()
+>>> enviador = EnviadorFalso()
+>>> auto = Auto(interface, enviador, segmentador, ctrl, PATH_HAAR, Instrumentacao(10000))
+>>> resultado = reproduz(auto, enviador, le_frames("video-test/video.mp4"), taxa=30)
+>>> print(resultado["frames_por_segundo"])
+"""
+
+
+from autonomo import AutoConcorrente
+from time import perf_counter
+import numpy as np
+import cv2 as cv
+import time
+import os
+
+
+class InterfaceFalsa():
+    """Substitui a :class:`~codigo.interface.modulos.interface.Interface` na reprodução.
+
+    Apenas conta os frames apresentados e guarda o último.
+    """
+
+    def __init__(self):
+        """Inicialização da interface falsa.
+        """
+        self.n_frames = 0
+        self.ultimo_frame = None
+
+    def atualiza_frame(self, imagem : np.ndarray, BGR=False):
+        """Recebe o frame que seria apresentado ao usuário.
+
+        Parameters
+        ----------
+        imagem : numpy.ndarray
+            Frame apresentado.
+
+        BGR : bool, default False
+            Se o frame está no formato BGR. Ignorado.
+        """
+        self.n_frames += 1
+        self.ultimo_frame = imagem
+
+
+class EnviadorFalso():
+    """Substitui o enviador de comandos (:class:`~codigo.interface.modulos.TLSstream.TLSclient`) na reprodução.
+
+    Guarda os comandos enviados e o instante (:func:`time.perf_counter()`) de cada envio. Se for fornecida
+    uma função de callback, ela é chamada a cada comando com o texto do comando.
+    """
+
+    def __init__(self, callback : callable = None):
+        """Inicialização do enviador falso.
+
+        Parameters
+        ----------
+        callback : callable, default None
+            Função chamada a cada comando enviado, com a assinatura *callback(texto)*.
+        """
+        self.comandos = []
+        self.instantes = []
+        self._callback = callback
+
+    def send(self, dados : bytes):
+        """Recebe um comando que seria enviado ao Wall-e.
+
+        Parameters
+        ----------
+        dados : bytes
+            Comando codificado.
+        """
+        texto = dados.decode()
+
+        self.instantes.append(perf_counter())
+        self.comandos.append(texto)
+
+        if self._callback is not None:
+            self._callback(texto)
+
+
+def le_frames(path : str, n_max : int = None):
+    """Lê os frames de um vídeo ou de uma pasta de imagens.
+
+    Se *path* for uma pasta, são lidas as imagens JPG dela em ordem alfabética. Caso contrário, é lido como
+    vídeo pelo OpenCV. Os frames são retornados no formato BGR.
+
+    Parameters
+    ----------
+    path : str
+        Arquivo de vídeo ou pasta com imagens JPG.
+
+    n_max : int, default None
+        Quantidade máxima de frames lidos. Se None, lê todos.
+
+    Returns
+    -------
+    list
+        Lista de frames (BGR).
+    """
+    frames = []
+
+    if os.path.isdir(path):
+        arquivos = sorted(
+                arquivo for arquivo in os.listdir(path)
+                if arquivo.lower().endswith((".jpg", ".jpeg"))
+                )
+
+        for arquivo in arquivos[:n_max]:
+            frames.append(cv.imread(os.path.join(path, arquivo)))
+
+    else:
+        entrada = cv.VideoCapture(path)
+
+        while n_max is None or len(frames) < n_max:
+            ret, frame = entrada.read()
+
+            if not ret:
+                break
+
+            frames.append(frame)
+
+        entrada.release()
+
+    return frames
+
+
+def reproduz(auto, enviador : EnviadorFalso, frames : list, taxa : float = None, debug=False):
+    """Fornece os frames ao modo autônomo e mede o desempenho.
+
+    Se *taxa* for None, os frames são fornecidos o mais rápido possível. Com o :class:`~codigo.autonomo.Auto`,
+    cada frame é processado antes do próximo ser fornecido. Com o :class:`~codigo.autonomo.AutoConcorrente`,
+    o próximo frame é fornecido assim que o anterior começa a ser processado, então nenhum é descartado.
+
+    Se *taxa* for definida, os frames são fornecidos nessa taxa (frames por segundo), simulando a câmera.
+    Nesse caso, o :class:`~codigo.autonomo.AutoConcorrente` descarta os frames que chegam enquanto outro
+    aguarda o processamento. O :class:`~codigo.autonomo.Auto` processa cada frame na chamada, então os frames
+    atrasam se o processamento for mais lento que a câmera.
+
+    A latência de cada frame é o tempo entre o início do processamento e a apresentação do resultado, medido
+    pela etapa "frame" da instrumentação do modo autônomo. As medições da instrumentação são apagadas antes da
+    reprodução, e apenas as últimas são guardadas (ver a capacidade da
+    :class:`~codigo.interface.modulos.instrumentacao.Instrumentacao`).
+
+    Parameters
+    ----------
+    auto : Auto
+        Modo autônomo, criado com :class:`InterfaceFalsa` e :class:`EnviadorFalso`.
+
+    enviador : EnviadorFalso
+        Enviador de comandos do modo autônomo.
+
+    frames : list
+        Frames no formato BGR (ver :func:`le_frames`).
+
+    taxa : float, default None
+        Taxa de frames por segundo. Se None, fornece os frames o mais rápido possível.
+
+    debug : bool, default False
+        Se o modo autônomo deve gerar as imagens de debug.
+
+    Returns
+    -------
+    dict
+        Resultado da reprodução: "n_frames" (fornecidos), "n_processados", "duracao" (s),
+        "frames_por_segundo" (processados por segundo), "latencias" (ms, ordenadas) e "comandos" (lista
+        de comandos enviados pelo modo autônomo).
+    """
+    concorrente = isinstance(auto, AutoConcorrente)
+    n_comandos_inicial = len(enviador.comandos)
+
+    instrumentacao = auto.retorna_instrumentacao()
+    instrumentacao.limpa()
+
+    inicio = perf_counter()
+
+    for i, frame in enumerate(frames):
+        # Espera o instante do frame
+        if taxa is not None:
+            espera = inicio + i/taxa - perf_counter()
+
+            if espera > 0:
+                time.sleep(espera)
+
+        elif concorrente:
+            auto.aguarda_vaga()
+
+        auto.processa_imagem(frame, BGR=True, debug=debug)
+
+    if concorrente:
+        auto.aguarda_conclusao()
+
+    duracao = perf_counter() - inicio
+
+    comandos = enviador.comandos[n_comandos_inicial:]
+    latencias = np.sort(instrumentacao.retorna_tempos("frame"))*1e-6
+
+    return {
+            "n_frames": len(frames),
+            "n_processados": len(comandos),
+            "duracao": duracao,
+            "frames_por_segundo": len(comandos)/duracao,
+            "latencias": latencias,
+            "comandos": comandos,
+            }
+
+
+def histograma(valores : np.ndarray, n_intervalos : int = 10, largura : int = 40):
+    """Retorna o histograma dos valores como texto, um intervalo por linha.
+
+    Parameters
+    ----------
+    valores : numpy.ndarray
+        Valores do histograma (por exemplo, as latências em ms).
+
+    n_intervalos : int, default 10
+        Quantidade de intervalos.
+
+    largura : int, default 40
+        Quantidade de caracteres da maior barra.
+
+    Returns
+    -------
+    str
+        Histograma.
+    """
+    if len(valores) == 0:
+        return ""
+
+    contagem, limites = np.histogram(valores, n_intervalos)
+    maximo = contagem.max()
+
+    linhas = []
+    for n, inferior, superior in zip(contagem, limites[:-1], limites[1:]):
+        barra = "#"*int(round(largura*n/maximo))
+        linhas.append(f"{inferior:9.2f} - {superior:9.2f} | {barra} {n}")
+
+    return "\n".join(linhas)
@@ -6,9 +6,23 @@
 O diretório onde está o modelo original deve ser informado pelo parâmetro 'MODELO_PATH'.
 O arquivo de destino (onde será salvo o modelo no formato tflite) deve ser informado pelo
 parâmetro 'MODELO_TFLITE_PATH'.
+
+O parâmetro 'QUANTIZACAO' define o tipo dos pesos do modelo convertido:
+
+- None: float32, sem quantização.
+- "float16": os pesos são salvos em float16. A entrada e a saída continuam em float32.
+- "int8": quantização completa para inteiros de 8 bits (pesos, ativações, entrada e saída). As faixas
+  de valores das ativações são estimadas com as primeiras 'N_AMOSTRAS_REPRESENTATIVAS' imagens do dataset
+  de validação ('DATASET_VALIDACAO_PATH'), padronizadas como no treinamento.
+
+Os modelos quantizados são salvos com o tipo da quantização no nome (por exemplo,
+"modelo-segmentacao-int8.tflite"). O :class:`~codigo.segmentacao.modulos.interpretador.Segmentador` converte a
+entrada e a saída dos modelos int8 automaticamente. Para comparar a acurácia e o tempo de segmentação dos
+modelos, use o script 'teste/compara_quantizacao.py'.
 """
 
 
+from modulos.padronizacao import padroniza_imagem
 import tensorflow as tf
 import tensorflow.lite as tflite
 
@@ -16,14 +30,48 @@ import tensorflow.lite as tflite
 # Parâmetros do script
 MODELO_PATH = "modelo-segmentacao/modelo"
 MODELO_TFLITE_PATH = "modelo-segmentacao.tflite"
+QUANTIZACAO = None  # None, "float16" ou "int8"
+DATASET_VALIDACAO_PATH = "datasets/validacao"
+N_AMOSTRAS_REPRESENTATIVAS = 200
+
+
+def dataset_representativo():
+    """Fornece as imagens usadas para estimar as faixas de valores da quantização int8.
+
+    As imagens são as do dataset de validação, uma por vez, padronizadas como no treinamento.
+    """
+    dataset = tf.data.Dataset.load(DATASET_VALIDACAO_PATH).unbatch()
+
+    for imagem, mascara in dataset.take(N_AMOSTRAS_REPRESENTATIVAS):
+        imagem = padroniza_imagem(imagem)
+        yield [tf.expand_dims(imagem, axis=0)]
 
 
 if __name__ == "__main__":
     # Converte o modelo para o formato tflite. O arquivo será salvo na variável
     # 'modelo_tflite' em formato binário. Deve ser salvo em um arquivo posteriormente.
     conversor = tflite.TFLiteConverter.from_saved_model(MODELO_PATH)
+
+    if QUANTIZACAO == "float16":
+        conversor.optimizations = [tflite.Optimize.DEFAULT]
+        conversor.target_spec.supported_types = [tf.float16]
+
+    elif QUANTIZACAO == "int8":
+        conversor.optimizations = [tflite.Optimize.DEFAULT]
+        conversor.representative_dataset = dataset_representativo
+        conversor.target_spec.supported_ops = [tflite.OpsSet.TFLITE_BUILTINS_INT8]
+        conversor.inference_input_type = tf.int8
+        conversor.inference_output_type = tf.int8
+
+    elif QUANTIZACAO is not None:
+        raise ValueError(f"Quantização desconhecida: {QUANTIZACAO}")
+
     modelo_tflite = conversor.convert()
 
-    # Salva o modelo no arquivo definido por 'MODELO_TFLITE_PATH'
-    with open(MODELO_TFLITE_PATH, "wb") as f:
+    # Salva o modelo no arquivo definido por 'MODELO_TFLITE_PATH', com o tipo da quantização no nome
+    path = MODELO_TFLITE_PATH
+    if QUANTIZACAO is not None:
+        path = path.replace(".tflite", f"-{QUANTIZACAO}.tflite")
+
+    with open(path, "wb") as f:
         f.write(modelo_tflite)
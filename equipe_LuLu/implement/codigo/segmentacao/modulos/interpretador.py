@@ -4,13 +4,20 @@
 """Interpretadores de modelos do tensorflow lite.
 
 Está disponível, neste módulo, um modelo de segmentador semântico de imagens
-usado para obter a máscara de uma imagem: :class:`Segmentador`.
+usado para obter a máscara de uma imagem: :class:`Segmentador`. A classe :class:`SegmentadorAssincrono` executa
+o segmentador em uma thread própria, sem bloquear quem fornece as imagens.
+
+O interpretador é o do ``tflite_runtime`` ou, se ele não estiver instalado, o do ``tensorflow.lite`` (ver o
+módulo :mod:`~codigo.segmentacao.modulos.runtime`). O pré e o pós-processamento usam apenas o Numpy e o OpenCV.
 """
 
 
-from .padronizacao import padroniza_imagem
-from tensorflow.math import round as tf_round
-import tensorflow.lite as tfl
+from .padronizacao import padroniza_imagem_numpy
+from .runtime import Interpreter
+from concurrent.futures import Future
+from time import perf_counter_ns
+import threading
+import logging
 import cv2 as cv
 import numpy as np
 
@@ -43,6 +50,16 @@ class Segmentador():
     Essa abordagem é mais eficiente, visto que utiliza o resultado do último processamento ao invés de
     re-segmentar a imagem.
 
+    A máscara é obtida diretamente da saída do modelo: cada pixel recebe a classe de maior probabilidade (argmax),
+    e a máscara vale 1 nos pixels da classe de objetos colidíveis. Se for pedida redimensionada, a máscara (uint8)
+    é redimensionada pelo vizinho mais próximo. O resultado completo do modelo (float com 3 canais) apenas é
+    computado se for pedido por :meth:`segmenta_imagem()` ou pela imagem com a segmentação.
+
+    Modelos quantizados para inteiros (ver o script ``converte_tflite.py``) são usados da mesma forma. A imagem
+    padronizada é quantizada com a escala e o ponto zero da entrada do modelo, e o resultado é convertido para
+    float com a escala e o ponto zero da saída. A máscara é obtida diretamente dos valores quantizados, já que a
+    conversão não altera a classe de maior valor.
+
     Notes
     -----
     A imagem de entrada deve estar no formato RGB. Atenção porque o OpenCV usa o formato BGR. Para converter
@@ -50,6 +67,13 @@ class Segmentador():
     for chamado da seguinte forma, a imagem será convertida de BGR para RGB antes de ser segmentada.
 
     >>> imagem_segmentadaa = segmentador.segmenta_imagem(imagem, BGR=True)
+
+    O tempo de cada etapa da última segmentação é retornado pelo método :meth:`retorna_tempos()`.
+
+    A imagem padronizada é escrita diretamente no tensor de entrada do interpretador, e a saída do modelo é lida
+    diretamente do tensor de saída. Os resultados são escritos em arrays criados na instanciação (ou no primeiro
+    frame de cada formato), então nenhum array é criado a cada frame para obter a máscara. Por isso, os arrays
+    retornados são sobrescritos na próxima segmentação. Copie-os se precisar deles depois disso.
     """
 
     def __init__(self, arquivo_ftlite: str, n_threads=1):
@@ -67,7 +91,7 @@ class Segmentador():
             O número de threads que serão usadas para processar o modelo. O valor padrão é 1.
         """
         # Carrega o modelo (será usado apenas uma thread para o teste)
-        self._interpretador = tfl.Interpreter(model_path=arquivo_ftlite, num_threads=n_threads)
+        self._interpretador = Interpreter(model_path=arquivo_ftlite, num_threads=n_threads)
 
         # Configuração básica do modelo, e informação da entrada e saída do modelo
         self._interpretador.allocate_tensors()
@@ -84,13 +108,58 @@ class Segmentador():
         formato = formato[1:]  # Remove o primeiro eixo (ele é sempre 1 para esse modelo)
         self._formato_saida = tuple(formato)
 
-        # Camada vazia (para completar os canais RGB)
-        self._vazio = np.zeros(self._formato_saida[0:2] + (1,), dtype=np.float32)
-
         # Índice do tensor de entrada e de saída
         self._tensor_entrada_indice = self._entrada_info[0]['index']
         self._tensor_saida_indice = self._saida_info[0]['index']
 
+        # Acesso direto aos tensores de entrada e de saída, sem cópias. As funções retornam arrays que apontam
+        # para a memória do interpretador. O interpretador não permite que esses arrays existam durante o
+        # invoke(), então eles são obtidos a cada uso e não são guardados.
+        self._tensor_entrada = self._interpretador.tensor(self._tensor_entrada_indice)
+        self._tensor_saida = self._interpretador.tensor(self._tensor_saida_indice)
+
+        # Quantização da entrada e da saída: (escala, ponto_zero), ou None se o tensor for float. Um valor
+        # quantizado q corresponde ao valor real escala*(q - ponto_zero).
+        self._quantizacao_entrada = self._quantizacao(self._entrada_info[0])
+        self._quantizacao_saida = self._quantizacao(self._saida_info[0])
+
+        # Buffers dos resultados, reaproveitados a cada frame. O buffer da saída possui pelo menos 3 canais
+        # (RGB). Os canais que o modelo não preenche permanecem zerados.
+        self._n_canais_saida = self._formato_saida[2]
+        formato_resultado = self._formato_saida[:2] + (max(self._n_canais_saida, 3),)
+
+        self._buffer_imagem = np.empty(self._formato_entrada, dtype=np.uint8)
+        self._buffer_mascara = np.empty(self._formato_saida[:2], dtype=np.bool_)
+        self._buffer_rotulos = np.empty(self._formato_saida[:2], dtype=np.intp)
+        self._buffer_saida = np.zeros(formato_resultado, dtype=np.float32)
+        self._buffer_arredondado = np.empty(formato_resultado, dtype=np.float32)
+
+        # Modelo quantizado: a imagem é padronizada nesse buffer e depois quantizada no tensor de entrada
+        self._buffer_padronizado = None
+        if self._quantizacao_entrada is not None:
+            self._buffer_padronizado = np.empty(self._formato_entrada, dtype=np.float32)
+            self._limites_entrada = np.iinfo(self._entrada_info[0]["dtype"])
+
+        # Buffers do resultado redimensionado. Dependem do formato do frame, então são criados no primeiro frame
+        # e sempre que o formato mudar.
+        self._buffer_redimensionado = None
+        self._buffer_redimensionado_arredondado = None
+        self._buffer_mascara_redimensionada = None
+
+        # Tempo das etapas da última segmentação (ns)
+        self._tempos = {}
+
+    @staticmethod
+    def _quantizacao(info : dict):
+        """Retorna a escala e o ponto zero de um tensor quantizado, ou None se o tensor for float.
+        """
+        if not np.issubdtype(info["dtype"], np.integer):
+            return None
+
+        escala, ponto_zero = info["quantization"]
+
+        return np.float32(escala), np.float32(ponto_zero)
+
     def retorna_formato_entrada(self):
         """Retorna o formato de entrada do modelo de segmentadoção.
 
@@ -106,11 +175,26 @@ class Segmentador():
         """
         return self._formato_entrada
 
+    def retorna_tempos(self):
+        """Retorna o tempo de cada etapa da segmentação da última imagem.
+
+        As etapas são "redimensionamento" (da imagem para a entrada do modelo), "padronizacao", "inferencia",
+        "mascara" (argmax da saída), "redimensionamento_mascara" e "redimensionamento_saida" (do resultado
+        completo para o formato do frame). Apenas as etapas executadas para a última imagem estão presentes.
+
+        Returns
+        -------
+        dict
+            Dicionário com o nome de cada etapa e sua duração em nanossegundos.
+        """
+        return self._tempos
+
     def redimensiona_para_entrada(self, imagem : np.ndarray):
         """Redimensiona a imagem para o formato de entrada do segmentador.
 
         A imagem apenas é redimensionada se não estiver no formato de entrada do modelo.
-        A imagem de entrada deve estar no formato (linhas, colunas, canais).
+        A imagem de entrada deve estar no formato (linhas, colunas, canais). A imagem redimensionada é escrita
+        em um buffer do segmentador, sobrescrito na próxima chamada.
 
         Parameters
         ----------
@@ -123,7 +207,7 @@ class Segmentador():
             A imagem redimensionada para o formato de entrada do segmentador.
         """
         if imagem.shape != self._formato_entrada:
-            imagem = cv.resize(imagem, self._formato_entrada[:2][::-1])
+            imagem = cv.resize(imagem, self._formato_entrada[:2][::-1], dst=self._buffer_imagem)
 
         return imagem
 
@@ -155,7 +239,9 @@ class Segmentador():
             self._formato_imagem = imagem.shape
 
             # Redimensionamento
+            inicio = perf_counter_ns()
             self._imagem = self.redimensiona_para_entrada(imagem)
+            self._tempos["redimensionamento"] = perf_counter_ns() - inicio
 
     def segmenta_imagem(self, imagem : np.ndarray = None, BGR=False, redimensiona=False):
         """Segmenta a imagem recebida.
@@ -213,7 +299,7 @@ class Segmentador():
         Returns
         -------
         numpy.ndarray
-            Máscara resultada da segmentação.
+            Máscara resultada da segmentação (uint8, 1 nos objetos colidíveis e 0 no resto).
         """
         self.define_imagem(imagem, BGR)
 
@@ -270,6 +356,8 @@ class Segmentador():
         self._imagem = None
 
         # Segmentação
+        self._entrada_definida = False
+        self._inferencia_feita = False
         self._resultado_segmentacao = None
         self._resultado_segmentacao_sem_arredondamento = None
         self._resultado_segmentacao_redimensionada = None
@@ -282,6 +370,81 @@ class Segmentador():
         self._imagem_segmentada = None
         self._imagem_segmentada_redimensionada = None
 
+        # Tempo das etapas
+        self._tempos.clear()
+
+    def _preprocessa(self, imagem : np.ndarray, destino : np.ndarray, buffer_padronizado : np.ndarray = None):
+        """Converte a imagem (no formato de entrada do modelo) para a entrada do modelo.
+
+        A imagem é padronizada em *destino*, que possui o formato e o tipo do tensor de entrada (sem o eixo do
+        batch). Em modelos quantizados, a imagem é padronizada em *buffer_padronizado* (float32) e quantizada em
+        *destino*. Não usa nenhum buffer do segmentador, então pode ser executado por outra thread enquanto o
+        interpretador segmenta outra imagem (ver :class:`SegmentadorAssincrono`).
+        """
+        if self._quantizacao_entrada is None:
+            padroniza_imagem_numpy(imagem, destino)
+            return
+
+        # Modelo quantizado: q = round(x/escala + ponto_zero), limitado aos valores do tipo da entrada
+        escala, ponto_zero = self._quantizacao_entrada
+        buffer = padroniza_imagem_numpy(imagem, buffer_padronizado)
+
+        np.divide(buffer, escala, out=buffer)
+        np.add(buffer, ponto_zero, out=buffer)
+        np.rint(buffer, out=buffer)
+        np.clip(buffer, self._limites_entrada.min, self._limites_entrada.max, out=buffer)
+        np.copyto(destino, buffer, casting="unsafe")
+
+    def _define_entrada_preprocessada(self, entrada : np.ndarray, formato_imagem : tuple):
+        """Inicia uma nova segmentação com uma entrada já preprocessada por :meth:`_preprocessa()`.
+
+        A entrada é copiada para o tensor de entrada do modelo. Apenas a máscara e o resultado do modelo podem
+        ser obtidos depois disso, já que o segmentador não possui a imagem original.
+
+        Parameters
+        ----------
+        entrada : numpy.ndarray
+            Entrada do modelo, sem o eixo do batch.
+
+        formato_imagem : tuple
+            Formato do frame original, usado para redimensionar os resultados.
+        """
+        self._reinicia_iteracao()
+        self._formato_imagem = formato_imagem
+
+        inicio = perf_counter_ns()
+        np.copyto(self._tensor_entrada()[0], entrada)
+        self._tempos["copia_entrada"] = perf_counter_ns() - inicio
+
+        self._entrada_definida = True
+
+    def _computa_inferencia(self):
+        """Executa o modelo de segmentação na imagem recebida.
+
+        O resultado fica no tensor de saída do interpretador, lido por :meth:`_computa_segmentacao()` e
+        :meth:`_computa_mascara()`.
+        """
+        # Não é necessário executar esse processo se já foi feito nessa iteração
+        if self._inferencia_feita:
+            return
+
+        # Preprocessamento da imagem. A imagem é padronizada diretamente no tensor de entrada do modelo, que
+        # possui o formato (1, linhas, colunas, canais). Como há apenas uma imagem, é usado o primeiro elemento.
+        # Não é feito se a entrada já foi definida por _define_entrada_preprocessada().
+        if not self._entrada_definida:
+            inicio = perf_counter_ns()
+            self._preprocessa(self._imagem, self._tensor_entrada()[0], self._buffer_padronizado)
+            self._tempos["padronizacao"] = perf_counter_ns() - inicio
+
+            self._entrada_definida = True
+
+        # Segmenta a imagem
+        inicio = perf_counter_ns()
+        self._interpretador.invoke()
+        self._tempos["inferencia"] = perf_counter_ns() - inicio
+
+        self._inferencia_feita = True
+
     def _computa_segmentacao(self):
         """Computa a segmentação da imagem recebida.
 
@@ -297,36 +460,24 @@ class Segmentador():
         if self._resultado_segmentacao is not None:
             return self._resultado_segmentacao
 
-        imagem = self._imagem
-
-        # Preprocessamento da imagem
-        imagem = np.array(imagem, dtype=np.float32)
-        imagem = padroniza_imagem(imagem)
+        self._computa_inferencia()
 
-        # Preprocessamento da imagem. É necessário normalizar e formatar a saída. O formato de entrada
-        # do modelo de segmentação tem a dimensão (1, linhas, colunas, canais), A imagem processada possui
-        # formato (linhas, colunas, canais), então é necessário adicionar mais um eixo no começo da imagem.
-        imagem = np.expand_dims(imagem, axis=0)
+        # Lê a saída (1, linhas, colunas, canais) diretamente do tensor e a copia para os primeiros canais do
+        # buffer. Os demais canais do buffer são zerados, para completar o RGB.
+        canais = self._buffer_saida[:, :, :self._n_canais_saida]
+        np.copyto(canais, self._tensor_saida()[0])
 
-        # Segmenta a imagem do dataset. Define o tensor de entrada e realiza a segmentação. O resultado é posto
-        # no atributo 'resultado_segmentacao'
-        self._interpretador.set_tensor(self._tensor_entrada_indice, imagem)
-        self._interpretador.invoke()
-        saida = self._interpretador.get_tensor(self._tensor_saida_indice)
-
-        # A máscara é retornada no formato (1, linhas, colunas, canais).
-        # Como há apenas uma imagem, é necessário selecionar o primeiro elemento.
-        saida = saida[0]
-        
-        # Cria o canal faltando para ser um RGB
-        if self._formato_saida[2] < 3:
-            saida = np.concatenate([saida, self._vazio], axis=2)
+        # Modelo quantizado: converte a saída para o valor real, escala*(q - ponto_zero)
+        if self._quantizacao_saida is not None:
+            escala, ponto_zero = self._quantizacao_saida
+            np.subtract(canais, ponto_zero, out=canais)
+            np.multiply(canais, escala, out=canais)
 
         # Salva a versão sem arredondamento da imagem
-        self._resultado_segmentacao_sem_arredondamento = saida
+        self._resultado_segmentacao_sem_arredondamento = self._buffer_saida
 
-        # Salva a versão com arredondamento da imagem
-        self._resultado_segmentacao = tf_round(saida)
+        # Salva a versão com arredondamento da imagem (arredonda para o par mais próximo, como o tf.round)
+        self._resultado_segmentacao = np.rint(self._buffer_saida, out=self._buffer_arredondado)
 
         return self._resultado_segmentacao
 
@@ -347,9 +498,22 @@ class Segmentador():
 
         self._computa_segmentacao()
 
+        # Buffers no formato do frame
+        formato = self._formato_imagem[:2] + self._buffer_saida.shape[2:]
+        if self._buffer_redimensionado is None or self._buffer_redimensionado.shape != formato:
+            self._buffer_redimensionado = np.empty(formato, dtype=np.float32)
+            self._buffer_redimensionado_arredondado = np.empty(formato, dtype=np.float32)
+
         # Redimensiona a imagem e arredonda
-        segmentacao = cv.resize(self._resultado_segmentacao_sem_arredondamento, (self._formato_imagem[:2][::-1]))
-        self._resultado_segmentacao_redimensionada = tf_round(segmentacao)
+        inicio = perf_counter_ns()
+        cv.resize(
+                self._resultado_segmentacao_sem_arredondamento, (self._formato_imagem[:2][::-1]),
+                dst=self._buffer_redimensionado
+                )
+        self._resultado_segmentacao_redimensionada = np.rint(
+                self._buffer_redimensionado, out=self._buffer_redimensionado_arredondado
+                )
+        self._tempos["redimensionamento_saida"] = perf_counter_ns() - inicio
 
         return self._resultado_segmentacao_redimensionada
 
@@ -366,11 +530,28 @@ class Segmentador():
         # Não é necessário executar esse processo se já foi feito nessa iteração
         if self._mascara is not None:
             return self._mascara
-        
-        self._computa_segmentacao()
 
-        # Remove os canais indesejados. Apenas o segundo canal da imagem (índice 1) contém a máscara desejada (colisões).
-        self._mascara = self._resultado_segmentacao[:, :, 1]
+        self._computa_inferencia()
+
+        # Classe de cada pixel, lida diretamente do tensor de saída. Apenas a segunda classe (índice 1) é a de
+        # objetos colidíveis. Com duas classes, o argmax é 1 onde a segunda supera a primeira (empate é 0).
+        # Em modelos quantizados, a comparação é feita nos valores quantizados (a escala é positiva).
+        inicio = perf_counter_ns()
+        saida = self._tensor_saida()[0]
+
+        if self._n_canais_saida == 2:
+            np.greater(saida[:, :, 1], saida[:, :, 0], out=self._buffer_mascara)
+
+        else:
+            np.argmax(saida, axis=2, out=self._buffer_rotulos)
+            np.equal(self._buffer_rotulos, 1, out=self._buffer_mascara)
+
+        # A referência ao tensor não pode existir durante o próximo invoke()
+        del saida
+
+        # Máscara uint8 (0 ou 1), sem cópia do buffer
+        self._mascara = self._buffer_mascara.view(np.uint8)
+        self._tempos["mascara"] = perf_counter_ns() - inicio
 
         return self._mascara
 
@@ -378,7 +559,8 @@ class Segmentador():
         """Computa a máscara de objetos colidíveis e redimensiona ela para o tamanho do frame original.
 
         Semelhante ao método :meth:`_computa_segmentacao_redimensionada()`, mas retorna apenas máscara de
-        objetos colidíveis. 
+        objetos colidíveis. A máscara é redimensionada pelo vizinho mais próximo, então continua com valores
+        0 ou 1.
 
         Returns
         -------
@@ -386,13 +568,21 @@ class Segmentador():
             A máscara de objetos colidíveis (redimensionada para o formato do frame original).
         """
         # Não é necessário executar esse processo se já foi feito nessa iteração
-        if self._mascara is not None:
-            return self._mascara
-        
-        self._computa_segmentacao_redimensionada()
+        if self._mascara_redimensionada is not None:
+            return self._mascara_redimensionada
 
-        # Remove os canais indesejados. Apenas o segundo canal da imagem (índice 1) contém a máscara desejada (colisões).
-        self._mascara_redimensionada = self._resultado_segmentacao_redimensionada[:, :, 1]
+        mascara = self._computa_mascara()
+
+        # Buffer no formato do frame
+        formato = self._formato_imagem[:2]
+        if self._buffer_mascara_redimensionada is None or self._buffer_mascara_redimensionada.shape != formato:
+            self._buffer_mascara_redimensionada = np.empty(formato, dtype=np.uint8)
+
+        inicio = perf_counter_ns()
+        self._mascara_redimensionada = cv.resize(
+                mascara, formato[::-1], dst=self._buffer_mascara_redimensionada, interpolation=cv.INTER_NEAREST
+                )
+        self._tempos["redimensionamento_mascara"] = perf_counter_ns() - inicio
 
         return self._mascara_redimensionada
 
@@ -448,3 +638,325 @@ class Segmentador():
                 )
 
         return self._imagem_segmentada_redimensionada
+
+
+class SegmentadorAssincrono():
+    """Segmentador executado em uma thread própria.
+
+    O método :meth:`envia_imagem()` não segmenta a imagem: apenas a preprocessa e retorna um
+    :class:`~concurrent.futures.Future` com a máscara, que é segmentada pela thread do segmentador. Quem
+    fornece as imagens (por exemplo, a thread que recebe os frames do Wall-e) não espera a inferência.
+
+    Há apenas uma vaga para a imagem à espera da segmentação. Se uma imagem chegar enquanto outra espera, a
+    mais antiga é descartada e seu futuro é cancelado ("a mais recente vence").
+
+    O preprocessamento (redimensionamento, conversão de cores e padronização) é feito na thread que envia a
+    imagem, em um de dois buffers de entrada, alternados. Enquanto a thread do segmentador executa o modelo
+    com um buffer, a próxima imagem é preprocessada no outro. O buffer é copiado para o tensor de entrada do
+    modelo imediatamente antes da inferência.
+
+    O resultado é uma cópia da máscara (ver :meth:`Segmentador.retorna_mascara()`), então não é sobrescrito
+    pelas próximas segmentações. Também é possível fornecer uma função de callback, chamada na thread do
+    segmentador a cada máscara. Os erros da segmentação são publicados no futuro da imagem, e os do callback
+    são registrados no log (:mod:`logging`), sem finalizar a thread.
+
+    A thread é iniciada na instanciação. Para finalizá-la, use o método :meth:`finaliza()`.
+
+    >>> segmentador = SegmentadorAssincrono(MODELO_TFLITE_PATH, redimensiona=True)
+    >>> futuro = segmentador.envia_imagem(imagem, BGR=True)  # Retorna imediatamente
+    >>> mascara = futuro.result()
+    >>> segmentador.finaliza()
+    """
+
+    def __init__(self, arquivo_ftlite : str, n_threads=1, redimensiona=False, callback : callable = None):
+        """Carrega o modelo de segmentação e inicia a thread do segmentador.
+
+        Parameters
+        ----------
+        arquivo_ftlite : str
+            O arquivo do modelo de segmentação convertido para o Tensorflow Lite.
+
+        n_threads : int, default 1
+            O número de threads que serão usadas para processar o modelo.
+
+        redimensiona : bool, default False
+            Se True, a máscara é redimensionada para o formato da imagem enviada.
+
+        callback : callable, default None
+            Função chamada, na thread do segmentador, a cada máscara obtida, com a assinatura
+            *callback(mascara)*.
+        """
+        # O segmentador só é usado pela thread do segmentador (exceto pelo preprocessamento, que não altera
+        # o segmentador)
+        self._segmentador = Segmentador(arquivo_ftlite, n_threads)
+        self._redimensiona = redimensiona
+        self._callback = callback
+
+        # Buffers de entrada, alternados entre a thread que envia as imagens e a do segmentador
+        self._buffers = (_BufferEntrada(self._segmentador), _BufferEntrada(self._segmentador))
+        self._em_copia = None  # Buffer sendo copiado para o tensor de entrada
+
+        # Buffer mais recente à espera da segmentação
+        self._condicao = threading.Condition()
+        self._proxima = None
+        self._ativo = True
+
+        # Apenas uma thread pode preprocessar uma imagem por vez
+        self._envio = threading.Lock()
+
+        self._n_recebidos = 0
+        self._n_processados = 0
+        self._n_descartados = 0
+
+        # Tempo das etapas da última segmentação (ns)
+        self._tempos_ultima = {}
+
+        self._thread = threading.Thread(target=self._loop_segmentacao, daemon=True)
+        self._thread.start()
+
+    def retorna_formato_entrada(self):
+        """Retorna o formato de entrada do modelo de segmentação (ver :meth:`Segmentador.retorna_formato_entrada()`).
+
+        Returns
+        -------
+        tuple
+            O formato de entrada do segmentador.
+        """
+        return self._segmentador.retorna_formato_entrada()
+
+    def envia_imagem(self, imagem : np.ndarray, BGR=False):
+        """Preprocessa a imagem e a envia para a segmentação.
+
+        Se outra imagem estava à espera da segmentação, ela é descartada e seu futuro é cancelado. A imagem
+        pode ser alterada após o retorno do método.
+
+        Parameters
+        ----------
+        imagem : numpy.ndarray
+            A imagem a ser segmentada.
+
+        BGR : bool, default False
+            Se a imagem for fornecida no formato BGR. Caso False, considera que foi fornecido no RGB.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Futuro com a máscara da imagem (uint8). É cancelado se a imagem for descartada ou se o segmentador
+            for finalizado antes de segmentá-la.
+        """
+        futuro = Future()
+
+        with self._envio:
+            # Escolhe o buffer. Se houver uma imagem à espera, ela é descartada e seu buffer é reaproveitado.
+            # Caso contrário, usa o buffer que não está sendo copiado pela thread do segmentador.
+            with self._condicao:
+                if not self._ativo:
+                    futuro.cancel()
+                    return futuro
+
+                self._n_recebidos += 1
+
+                if self._proxima is not None:
+                    buffer, self._proxima = self._proxima, None
+                    buffer.futuro.cancel()
+                    self._n_descartados += 1
+
+                else:
+                    buffer = self._buffers[0] if self._buffers[0] is not self._em_copia else self._buffers[1]
+
+            # Preprocessamento, em paralelo com a inferência da imagem anterior
+            buffer.preprocessa(imagem, BGR)
+            buffer.futuro = futuro
+
+            with self._condicao:
+                # O segmentador pode ter sido finalizado durante o preprocessamento
+                if not self._ativo:
+                    futuro.cancel()
+                    self._n_descartados += 1
+
+                else:
+                    self._proxima = buffer
+
+                self._condicao.notify_all()
+
+        return futuro
+
+    def retorna_tempos(self):
+        """Retorna o tempo de cada etapa da última segmentação (ver :meth:`Segmentador.retorna_tempos()`).
+
+        A etapa "copia_entrada" é a cópia do buffer de entrada para o tensor de entrada. O preprocessamento é
+        feito por :meth:`envia_imagem()` e não é medido.
+
+        Returns
+        -------
+        dict
+            Dicionário com o nome de cada etapa e sua duração em nanossegundos.
+        """
+        with self._condicao:
+            return dict(self._tempos_ultima)
+
+    def retorna_contadores(self):
+        """Retorna a quantidade de imagens segmentadas e descartadas.
+
+        Returns
+        -------
+        int
+            Quantidade de imagens segmentadas.
+
+        int
+            Quantidade de imagens descartadas por terem sido substituídas por uma mais recente.
+        """
+        with self._condicao:
+            return self._n_processados, self._n_descartados
+
+    def aguarda_conclusao(self):
+        """Espera até que todas as imagens enviadas sejam segmentadas ou descartadas.
+        """
+        with self._condicao:
+            self._condicao.wait_for(
+                    lambda: self._n_processados + self._n_descartados == self._n_recebidos or not self._ativo
+                    )
+
+    def finaliza(self, espera=True):
+        """Finaliza a thread do segmentador.
+
+        A imagem à espera da segmentação é descartada e seu futuro é cancelado.
+
+        Parameters
+        ----------
+        espera : bool, default True
+            Se True, espera a thread terminar a imagem em segmentação.
+        """
+        with self._condicao:
+            self._ativo = False
+
+            if self._proxima is not None:
+                self._proxima.futuro.cancel()
+                self._proxima = None
+                self._n_descartados += 1
+
+            self._condicao.notify_all()
+
+        if espera:
+            self._thread.join()
+
+    def _loop_segmentacao(self):
+        """Loop da thread do segmentador.
+
+        Aguarda uma imagem preprocessada, copia o buffer dela para o tensor de entrada (liberando o buffer para
+        a próxima imagem), segmenta e publica a máscara no futuro da imagem. Os erros da segmentação são
+        publicados no futuro, e os do callback são registrados no log. Nenhum deles finaliza a thread.
+        """
+        try:
+            while True:
+                with self._condicao:
+                    while self._ativo and self._proxima is None:
+                        self._condicao.wait()
+
+                    if not self._ativo:
+                        break
+
+                    buffer, self._proxima = self._proxima, None
+                    self._em_copia = buffer
+                    self._condicao.notify_all()
+
+                # O futuro pode ter sido cancelado por quem enviou a imagem
+                futuro = buffer.futuro
+
+                if not futuro.set_running_or_notify_cancel():
+                    with self._condicao:
+                        self._em_copia = None
+                        self._n_descartados += 1
+                        self._condicao.notify_all()
+
+                    continue
+
+                try:
+                    # Libera o buffer logo após a cópia, mesmo se ela falhar
+                    try:
+                        self._segmentador._define_entrada_preprocessada(buffer.entrada, buffer.formato)
+
+                    finally:
+                        with self._condicao:
+                            self._em_copia = None
+
+                    if self._redimensiona:
+                        mascara = self._segmentador._computa_mascara_redimensionada()
+
+                    else:
+                        mascara = self._segmentador._computa_mascara()
+
+                    # Cópia, já que o segmentador sobrescreve a máscara na próxima segmentação
+                    mascara = mascara.copy()
+
+                except Exception as erro:
+                    futuro.set_exception(erro)
+
+                else:
+                    futuro.set_result(mascara)
+
+                    if self._callback is not None:
+                        try:
+                            self._callback(mascara)
+
+                        except Exception:
+                            logging.exception("Erro no callback do segmentador assíncrono!")
+
+                with self._condicao:
+                    self._tempos_ultima = dict(self._segmentador.retorna_tempos())
+                    self._n_processados += 1
+                    self._condicao.notify_all()
+
+        except Exception:
+            logging.exception("Erro na thread do segmentador assíncrono! Finalizando a thread...")
+
+        finally:
+            # Cancela a imagem à espera e libera quem aguarda a thread. As próximas imagens são canceladas em
+            # envia_imagem().
+            with self._condicao:
+                self._ativo = False
+
+                if self._proxima is not None:
+                    self._proxima.futuro.cancel()
+                    self._proxima = None
+                    self._n_descartados += 1
+
+                self._condicao.notify_all()
+
+
+class _BufferEntrada():
+    """Buffer de entrada do :class:`SegmentadorAssincrono`.
+
+    Guarda a imagem preprocessada (no formato e no tipo do tensor de entrada), o formato da imagem original e
+    o futuro do resultado. Essa classe é usada apenas pelo :class:`SegmentadorAssincrono` e não deve ser
+    instanciada diretamente.
+    """
+
+    __slots__ = ("_segmentador", "_imagem", "_RGB", "_padronizado", "entrada", "formato", "futuro")
+
+    def __init__(self, segmentador : Segmentador):
+        self._segmentador = segmentador
+
+        formato = segmentador.retorna_formato_entrada()
+        self._imagem = np.empty(formato, dtype=np.uint8)
+        self._RGB = np.empty(formato, dtype=np.uint8)
+        self._padronizado = np.empty(formato, dtype=np.float32)
+
+        self.entrada = np.empty(formato, dtype=segmentador._entrada_info[0]["dtype"])
+        self.formato = None
+        self.futuro = None
+
+    def preprocessa(self, imagem, BGR):
+        """Preprocessa a imagem no buffer.
+        """
+        self.formato = imagem.shape
+        formato_entrada = self._imagem.shape
+
+        # Redimensiona antes de converter as cores, para converter menos pixels. O resultado é o mesmo.
+        if imagem.shape != formato_entrada:
+            imagem = cv.resize(imagem, formato_entrada[:2][::-1], dst=self._imagem)
+
+        if BGR:
+            imagem = cv.cvtColor(imagem, cv.COLOR_BGR2RGB, dst=self._RGB)
+
+        self._segmentador._preprocessa(imagem, self.entrada, self._padronizado)
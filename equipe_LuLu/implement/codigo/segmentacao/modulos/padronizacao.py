@@ -5,13 +5,16 @@
 
 Não foi colocado junto ao módulo :mod:`~codigo.segmentacao.modulos.preprocessamento` porque o módulo atual será
 importado pelo segmentador. Separar ele do de preprocessamento evitar carregar todo o Tensorflow durante a
-execução do segmentador.
+execução do segmentador. Pelo mesmo motivo, o Tensorflow apenas é importado na primeira chamada de
+:func:`padroniza_imagem`, usada no treinamento.
 
-Para padronizar as imagens, use a função :func:`padroniza_imagem`
+Para padronizar as imagens, use a função :func:`padroniza_imagem`. O segmentador usa a função
+:func:`padroniza_imagem_numpy`, equivalente, que escreve o resultado diretamente no tensor de entrada do modelo.
 """
 
 
-from tensorflow.image import per_image_standardization
+import numpy as np
+import math
 
 
 def padroniza_imagem(imagem):
@@ -34,6 +37,48 @@ def padroniza_imagem(imagem):
     -----
     Não utilize essa função na máscara de segmentação. Apenas na imagem original.
     """
+    # Importado aqui para que o segmentador não carregue o Tensorflow (ver a descrição do módulo)
+    from tensorflow.image import per_image_standardization
+
     imagem = per_image_standardization(imagem)
 
     return imagem
+
+
+def padroniza_imagem_numpy(imagem : np.ndarray, saida : np.ndarray):
+    """Padroniza a imagem com o Numpy, escrevendo o resultado em um array existente.
+
+    Equivalente a :func:`padroniza_imagem` (:func:`tf.image.per_image_standardization`): subtrai a média dos
+    valores da imagem e divide pelo desvio padrão, limitado inferiormente a 1/sqrt(N), em que N é a
+    quantidade de valores da imagem. Nenhum array do tamanho da imagem é criado.
+
+    Parameters
+    ----------
+    imagem : numpy.ndarray
+        A imagem a ser padronizada (por exemplo, uint8).
+
+    saida : numpy.ndarray
+        Array float32 contíguo, com o formato da imagem, onde o resultado é escrito. Pode ser o tensor de
+        entrada do modelo.
+
+    Returns
+    -------
+    numpy.ndarray
+        O array *saida*.
+    """
+    n = imagem.size
+
+    # Converte para float32 no próprio array de saída. Operações entre tipos diferentes criariam buffers.
+    np.copyto(saida, imagem)
+
+    # Centraliza a imagem e usa o resultado para calcular a variância (produto interno, sem arrays temporários)
+    media = saida.mean()
+    np.subtract(saida, media, out=saida)
+
+    plano = saida.reshape(-1)
+    desvio = math.sqrt(float(np.dot(plano, plano))/n)
+    desvio = max(desvio, 1/math.sqrt(n))
+
+    np.multiply(saida, np.float32(1/desvio), out=saida)
+
+    return saida
@@ -0,0 +1,26 @@
+#!/bin/env python3
+
+
+"""Interpretador do Tensorflow Lite sem o Tensorflow completo.
+
+Disponibiliza a classe ``Interpreter`` usada pelo :class:`~codigo.segmentacao.modulos.interpretador.Segmentador`.
+Ela é importada do pacote ``tflite_runtime``, que contém apenas o interpretador do Tensorflow Lite. Se ele não
+estiver instalado, é usado o ``tensorflow.lite`` do Tensorflow completo.
+
+Importar o Tensorflow completo leva alguns segundos e ocupa centenas de MB de memória, enquanto o
+``tflite_runtime`` é carregado quase instantaneamente. O pacote usado é informado pela variável
+:data:`RUNTIME` ("tflite_runtime" ou "tensorflow"). A diferença pode ser medida com o script
+``teste/mede_inicializacao.py``.
+
+O ``tflite_runtime`` pode ser instalado pelo PIP3 (``pip3 install tflite-runtime``). Para a Raspberry Pi, há
+uma versão pré-compilada no diretório ``raspberry/``.
+"""
+
+
+try:
+    from tflite_runtime.interpreter import Interpreter
+    RUNTIME = "tflite_runtime"
+
+except ImportError:
+    from tensorflow.lite import Interpreter
+    RUNTIME = "tensorflow"
@@ -0,0 +1,131 @@
+#!/bin/env python3
+
+
+"""Compara a acurácia e o tempo de segmentação dos modelos float32, float16 e int8.
+
+Os modelos quantizados são gerados pelo script 'converte_tflite.py' com o parâmetro 'QUANTIZACAO'. Os paths
+dos modelos são definidos pelo parâmetro 'MODELOS'. Os modelos cujo arquivo não existe são ignorados.
+
+Cada modelo segmenta as primeiras 'N_IMAGENS' imagens do dataset de validação ('DATASET_PATH') no processador
+da máquina atual, com 'N_THREADS' threads. Para cada modelo, são apresentados:
+
+- O tamanho do arquivo do modelo.
+- A acurácia por pixel e o IoU (intersecção sobre união) da classe de objetos colidíveis, em relação às
+  máscaras do dataset.
+- A concordância com a máscara do primeiro modelo (float32): fração dos pixels com a mesma classe.
+- As latências p50 e p95 da obtenção da máscara (:meth:`~codigo.segmentacao.modulos.interpretador.Segmentador.retorna_mascara()`).
+
+O relatório é mostrado no terminal e salvo no arquivo 'RELATORIO_PATH', em Markdown.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.interpretador as interpretador
+import modulos.runtime as runtime
+from tensorflow.data import Dataset
+from time import perf_counter_ns
+import numpy as np
+import cv2 as cv
+import platform
+import time
+import os
+
+
+# Parâmetros do script
+MODELOS = {
+        "float32": "../modelo-segmentacao.tflite",
+        "float16": "../modelo-segmentacao-float16.tflite",
+        "int8": "../modelo-segmentacao-int8.tflite",
+        }
+DATASET_PATH = "../datasets/validacao"
+N_IMAGENS = 1000
+N_THREADS = 1
+N_AQUECIMENTO = 10
+RELATORIO_PATH = "relatorio-quantizacao.md"
+
+
+def carrega_dataset():
+    """Carrega as imagens (uint8, RGB) e as máscaras (bool, True nos objetos colidíveis) do dataset.
+    """
+    imagens = []
+    mascaras = []
+
+    for imagem, mascara in Dataset.load(DATASET_PATH).unbatch().take(N_IMAGENS):
+        imagens.append(imagem.numpy().astype(np.uint8))
+        mascaras.append(mascara.numpy()[:, :, 0] > 127)
+
+    return imagens, mascaras
+
+
+def avalia_modelo(path, imagens, mascaras):
+    """Segmenta as imagens com o modelo e retorna as máscaras obtidas e as latências (ms).
+    """
+    segmentador = interpretador.Segmentador(path, N_THREADS)
+    formato_saida = segmentador.retorna_mascara(imagens[0]).shape
+
+    # As primeiras segmentações costumam ser mais lentas
+    for imagem in imagens[:N_AQUECIMENTO]:
+        segmentador.retorna_mascara(imagem)
+
+    obtidas = []
+    latencias = []
+
+    for imagem in imagens:
+        inicio = perf_counter_ns()
+        mascara = segmentador.retorna_mascara(imagem)
+        latencias.append((perf_counter_ns() - inicio)*1e-6)
+
+        obtidas.append(mascara.astype(np.bool_))
+
+    # Máscaras esperadas no formato da saída do modelo
+    esperadas = [
+            cv.resize(np.uint8(mascara), formato_saida[::-1], interpolation=cv.INTER_NEAREST) > 0
+            for mascara in mascaras
+            ]
+
+    return np.array(obtidas), np.array(esperadas), np.array(latencias)
+
+
+if __name__ == "__main__":
+    imagens, mascaras = carrega_dataset()
+
+    linhas = [
+            "# Comparação dos modelos quantizados\n",
+            f"- Data: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"- Processador: {platform.processor() or platform.machine()} ({os.cpu_count()} núcleos), "
+            f"{N_THREADS} thread(s)",
+            f"- Interpretador: {runtime.RUNTIME}",
+            f"- Imagens de validação: {len(imagens)}\n",
+            "| Modelo | Tamanho (MiB) | Acurácia | IoU colidível | Concordância float32 | p50 (ms) | p95 (ms) |",
+            "|---|---|---|---|---|---|---|",
+            ]
+
+    referencia = None
+
+    for nome, path in MODELOS.items():
+        if not os.path.exists(path):
+            print(f"Modelo {nome} não encontrado: {path}")
+            continue
+
+        obtidas, esperadas, latencias = avalia_modelo(path, imagens, mascaras)
+
+        acuracia = (obtidas == esperadas).mean()
+        iou = (obtidas & esperadas).sum()/max((obtidas | esperadas).sum(), 1)
+
+        if referencia is None:
+            referencia = obtidas
+
+        concordancia = (obtidas == referencia).mean() if obtidas.shape == referencia.shape else float("nan")
+
+        linhas.append("| {} | {:.2f} | {:.4f} | {:.4f} | {:.4f} | {:.2f} | {:.2f} |".format(
+            nome, os.path.getsize(path)/2**20, acuracia, iou, concordancia,
+            np.percentile(latencias, 50), np.percentile(latencias, 95)
+            ))
+
+    relatorio = "\n".join(linhas) + "\n"
+    print(relatorio)
+
+    with open(RELATORIO_PATH, "w") as arquivo:
+        arquivo.write(relatorio)
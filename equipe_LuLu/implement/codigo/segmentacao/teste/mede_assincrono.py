@@ -0,0 +1,110 @@
+#!/bin/env python3
+
+
+"""Compara o segmentador síncrono com o assíncrono ao receber frames na taxa da câmera.
+
+Os frames do vídeo 'VIDEO_PATH' são fornecidos na taxa 'TAXA_FRAMES' (frames por segundo), como os frames
+recebidos do Wall-e. Para cada segmentador, são apresentados:
+
+- O tempo que a thread que fornece os frames fica bloqueada a cada frame (p50 e p95).
+- A quantidade de frames segmentados e descartados.
+- A taxa de frames segmentados por segundo.
+
+O segmentador síncrono (:class:`~codigo.segmentacao.modulos.interpretador.Segmentador`) bloqueia até a
+máscara ficar pronta, então atrasa os frames seguintes se for mais lento que a câmera. O assíncrono
+(:class:`~codigo.segmentacao.modulos.interpretador.SegmentadorAssincrono`) apenas preprocessa o frame e
+descarta os que chegam enquanto outro aguarda a segmentação.
+
+O path do modelo usado é definido pelo parâmetro 'MODELO_TFLITE_PATH'.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import modulos.interpretador as interpretador
+from time import perf_counter
+import numpy as np
+import cv2 as cv
+import time
+
+
+# Parâmetros do script
+MODELO_TFLITE_PATH = "../modelo-segmentacao.tflite"
+VIDEO_PATH = "video-test/video.mp4"
+N_FRAMES = 300
+TAXA_FRAMES = 30
+N_THREADS = 1
+
+
+def le_frames():
+    """Lê os primeiros 'N_FRAMES' frames do vídeo (BGR).
+    """
+    entrada = cv.VideoCapture(VIDEO_PATH)
+    frames = []
+
+    while len(frames) < N_FRAMES:
+        ret, frame = entrada.read()
+
+        if not ret:
+            break
+
+        frames.append(frame)
+
+    entrada.release()
+
+    return frames
+
+
+def fornece_frames(frames, segmenta):
+    """Fornece os frames na taxa da câmera e retorna o tempo bloqueado em cada frame (ms) e a duração (s).
+    """
+    bloqueios = []
+    inicio = perf_counter()
+
+    for i, frame in enumerate(frames):
+        espera = inicio + i/TAXA_FRAMES - perf_counter()
+
+        if espera > 0:
+            time.sleep(espera)
+
+        antes = perf_counter()
+        segmenta(frame)
+        bloqueios.append((perf_counter() - antes)*1e3)
+
+    return np.array(bloqueios), inicio
+
+
+def mostra(nome, bloqueios, n_segmentados, n_descartados, duracao):
+    """Mostra os resultados de um segmentador.
+    """
+    print("{:<12} {:>10.2f} {:>10.2f} {:>12} {:>12} {:>10.1f}".format(
+        nome, np.percentile(bloqueios, 50), np.percentile(bloqueios, 95), n_segmentados, n_descartados,
+        n_segmentados/duracao
+        ))
+
+
+if __name__ == "__main__":
+    frames = le_frames()
+
+    print("{:<12} {:>10} {:>10} {:>12} {:>12} {:>10}".format(
+        "segmentador", "p50 (ms)", "p95 (ms)", "segmentados", "descartados", "frames/s"
+        ))
+
+    # Segmentador síncrono
+    segmentador = interpretador.Segmentador(MODELO_TFLITE_PATH, N_THREADS)
+    segmenta = lambda frame: segmentador.retorna_mascara(frame, BGR=True, redimensiona=True)
+
+    bloqueios, inicio = fornece_frames(frames, segmenta)
+    mostra("sincrono", bloqueios, len(frames), 0, perf_counter() - inicio)
+
+    # Segmentador assíncrono
+    assincrono = interpretador.SegmentadorAssincrono(MODELO_TFLITE_PATH, N_THREADS, redimensiona=True)
+    segmenta = lambda frame: assincrono.envia_imagem(frame, BGR=True)
+
+    bloqueios, inicio = fornece_frames(frames, segmenta)
+    assincrono.aguarda_conclusao()
+    n_segmentados, n_descartados = assincrono.retorna_contadores()
+    mostra("assincrono", bloqueios, n_segmentados, n_descartados, perf_counter() - inicio)
+
+    assincrono.finaliza()
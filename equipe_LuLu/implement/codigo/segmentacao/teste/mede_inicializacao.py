@@ -0,0 +1,117 @@
+#!/bin/env python3
+
+
+"""Mede o tempo de inicialização e a memória do segmentador com e sem o Tensorflow completo.
+
+Cada medição é feita em um processo novo, que importa o segmentador, carrega o modelo e segmenta um frame.
+São comparados dois casos:
+
+- "runtime": importa apenas o segmentador, que usa o ``tflite_runtime`` se estiver instalado (ver o módulo
+  :mod:`~codigo.segmentacao.modulos.runtime`).
+- "tensorflow": importa o Tensorflow completo antes do segmentador, como era feito antes do ``tflite_runtime``.
+
+São apresentados, para cada caso, as medianas do tempo total do processo (incluindo a inicialização do Python),
+do tempo de importação, de carregamento do modelo e da primeira segmentação, e do pico de memória residente
+(RSS) do processo.
+
+O path do modelo usado é específicado pelo parâmetro 'MODELO_TFLITE_PATH'.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+from time import perf_counter
+import subprocess
+import statistics
+import json
+import sys
+import os
+
+
+# Parâmetros do script
+MODELO_TFLITE_PATH = "../modelo-segmentacao.tflite"
+N_REPETICOES = 5
+FORMATO_FRAME = (480, 640, 3)
+
+
+# Código executado em cada processo. Os argumentos são o caso, o modelo e o formato do frame.
+CODIGO_PROCESSO = """
+import time
+inicio = time.perf_counter()
+
+import sys
+import json
+import resource
+import test
+
+caso, modelo, formato = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+
+if caso == "tensorflow":
+    import tensorflow
+
+import modulos.interpretador as interpretador
+import modulos.runtime as runtime
+import numpy as np
+importacao = time.perf_counter()
+
+segmentador = interpretador.Segmentador(modelo, n_threads=1)
+carregamento = time.perf_counter()
+
+segmentador.retorna_mascara(np.zeros(formato, dtype=np.uint8), redimensiona=True)
+segmentacao = time.perf_counter()
+
+print(json.dumps({
+        "runtime": runtime.RUNTIME,
+        "tensorflow_carregado": "tensorflow" in sys.modules,
+        "importacao": importacao - inicio,
+        "carregamento": carregamento - importacao,
+        "segmentacao": segmentacao - carregamento,
+        "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024,
+        }))
+"""
+
+
+def mede(caso):
+    """Executa um processo do caso fornecido e retorna as medições dele.
+    """
+    inicio = perf_counter()
+    processo = subprocess.run(
+            [sys.executable, "-c", CODIGO_PROCESSO, caso, MODELO_TFLITE_PATH, json.dumps(FORMATO_FRAME)],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+            )
+    total = perf_counter() - inicio
+
+    if processo.returncode != 0:
+        print(processo.stderr)
+        return None
+
+    medicoes = json.loads(processo.stdout.splitlines()[-1])
+    medicoes["total"] = total
+
+    return medicoes
+
+
+if __name__ == "__main__":
+    print("{:<12} {:<22} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "caso", "interpretador", "total (s)", "import (s)", "modelo (s)", "frame (s)", "RSS (MiB)"
+        ))
+
+    for caso in ("runtime", "tensorflow"):
+        resultados = [mede(caso) for _ in range(N_REPETICOES)]
+        resultados = [resultado for resultado in resultados if resultado is not None]
+
+        if len(resultados) == 0:
+            print(f"{caso:<12} falhou")
+            continue
+
+        mediana = lambda chave: statistics.median(resultado[chave] for resultado in resultados)
+
+        interpretador = resultados[0]["runtime"]
+        if resultados[0]["tensorflow_carregado"]:
+            interpretador += " (+TF)"
+
+        print("{:<12} {:<22} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.3f} {:>10.1f}".format(
+            caso, interpretador, mediana("total"), mediana("importacao"), mediana("carregamento"),
+            mediana("segmentacao"), mediana("rss")
+            ))
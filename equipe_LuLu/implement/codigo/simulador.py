@@ -0,0 +1,381 @@
+#!/bin/env python3
+
+
+"""Simulação cinemática do Wall-e em malha fechada com o controlador.
+
+Implementa a classe :class:`Simulador`, que move um Wall-e virtual em uma planta baixa (vista de cima) usando o
+:class:`~codigo.controlador.modulos.controlador.Controlador`. A cada passo, a máscara de segmentação é gerada a
+partir da planta e da pose do Wall-e, as velocidades retornadas pelo controlador são convertidas nas dos motores
+por :func:`~codigo.movimento.modulos.cinematica.mistura_velocidades` e a pose é integrada.
+
+A simulação não usa a interface gráfica, o segmentador ou o Wall-e, então pode ser usada para ajustar os
+parâmetros do controlador (ganhos dos PID, posições dos blocos de colisão, etc.) em vários episódios, inclusive
+em processos paralelos. A função :func:`gera_planta` cria plantas aleatórias para esses testes.
+"""
+
+
+from controlador.modulos.controlador import Controlador
+from movimento.modulos.cinematica import mistura_velocidades
+import numpy as np
+import cv2 as cv
+import math
+
+
+class Simulador():
+    """Simulador cinemático do Wall-e.
+
+    A planta é uma matriz (uint8) com 1 nas paredes e 0 no chão livre. Cada posição da planta possui
+    *resolucao* metros de lado. A pose do Wall-e é dada por (x, y, theta): x é a posição na direção das colunas
+    da planta, y na direção das linhas (ambos em metros) e theta é o ângulo da frente do Wall-e em radianos,
+    medido no sentido anti-horário a partir da direção das colunas (vista de cima, com as linhas crescendo para
+    baixo).
+
+    A máscara entregue ao controlador é a região da planta à frente do Wall-e, com *alcance* metros de
+    profundidade e a mesma largura, rotacionada para que a frente do Wall-e seja o topo da máscara e o Wall-e
+    esteja no centro da última linha (a posição inicial do controlador). É uma aproximação da máscara da câmera,
+    sem a perspectiva. As regiões fora da planta são paredes. A máscara é gerada por uma única transformação
+    afim (:func:`cv.warpAffine`), sem laços em Python.
+
+    O lixo é um ponto da planta. Se estiver dentro da máscara, sua posição é fornecida ao controlador. O
+    episódio termina quando o controlador aciona a sinalização (lixo alcançado), quando o Wall-e colide com uma
+    parede (o centro do Wall-e fica a menos de *raio* metros de uma parede) ou após o número máximo de passos.
+
+    O movimento é o de um robô diferencial: as velocidades dos motores esquerdo e direito (-100 a 100) são
+    convertidas em metros por segundo por *velocidade_maxima*, e a velocidade angular depende da distância entre
+    as rodas.
+
+    Os controladores PID do controlador passam a usar o relógio da simulação (ver
+    :meth:`~codigo.controlador.modulos.controlador.Controlador.parametros_relogio_PID()`). Como o controlador
+    guarda o estado dos PID e do mapa, deve ser usado um controlador novo para cada episódio.
+
+    >>> planta = gera_planta((200, 200), 0.02, 8, semente=0)
+    >>> simulador = Simulador(planta, 0.02, ctrl)
+    >>> resultado = simulador.episodio((2.0, 3.5, math.pi/2), (2.0, 0.5), 600)
+    """
+
+    def __init__(
+            self, planta : np.ndarray, resolucao : float, ctrl : Controlador, formato_mapa : tuple = (60, 60),
+            alcance : float = 1.2, velocidade_maxima : float = 0.3, distancia_rodas : float = 0.15,
+            raio : float = 0.08, dt : float = 0.1, tamanho_lixo : float = 0.06
+            ):
+        """Inicialização do simulador.
+
+        Parameters
+        ----------
+        planta : numpy.ndarray
+            Planta baixa (uint8), com 1 nas paredes e 0 no chão livre.
+
+        resolucao : float
+            Tamanho, em metros, de cada posição da planta.
+
+        ctrl : Controlador
+            Controlador usado na simulação.
+
+        formato_mapa : tuple, default (60, 60)
+            Formato (linhas, colunas) da máscara fornecida ao controlador.
+
+        alcance : float, default 1.2
+            Profundidade, em metros, da região vista pela máscara.
+
+        velocidade_maxima : float, default 0.3
+            Velocidade, em metros por segundo, de uma roda com o motor em 100%.
+
+        distancia_rodas : float, default 0.15
+            Distância, em metros, entre as rodas.
+
+        raio : float, default 0.08
+            Raio, em metros, do Wall-e. Usado na detecção de colisão.
+
+        dt : float, default 0.1
+            Duração de cada passo da simulação, em segundos.
+
+        tamanho_lixo : float, default 0.06
+            Tamanho, em metros, do lixo na máscara.
+        """
+        self._planta = np.uint8(planta != 0)
+        self._resolucao = resolucao
+        self._ctrl = ctrl
+        self._formato_mapa = formato_mapa
+        self._velocidade_maxima = velocidade_maxima
+        self._distancia_rodas = distancia_rodas
+        self._dt = dt
+
+        # Tamanho, em metros, de cada posição da máscara
+        self._metros_por_posicao = alcance/formato_mapa[0]
+        self._tamanho_lixo = max(1, round(tamanho_lixo/self._metros_por_posicao))
+
+        # Posições onde o centro do Wall-e colide: as paredes expandidas pelo raio do Wall-e
+        raio_posicoes = max(1, math.ceil(raio/resolucao))
+        kernel = cv.getStructuringElement(cv.MORPH_ELLIPSE, (2*raio_posicoes + 1, 2*raio_posicoes + 1))
+        self._colisao = cv.dilate(self._planta, kernel)
+
+        # Buffer da máscara
+        self._mascara = np.empty(formato_mapa, dtype=np.uint8)
+
+        # Relógio da simulação, usado pelos PID do controlador
+        self._tempo = 0.0
+        ctrl.parametros_relogio_PID(self.retorna_tempo)
+
+        self.define_pose((0.0, 0.0, 0.0))
+        self.define_lixo(None)
+
+    def define_pose(self, pose : tuple):
+        """Define a pose do Wall-e.
+
+        Parameters
+        ----------
+        pose : tuple
+            Pose (x, y, theta), em metros e radianos.
+        """
+        self._x, self._y, self._theta = pose
+
+    def retorna_pose(self):
+        """Retorna a pose do Wall-e.
+
+        Returns
+        -------
+        tuple
+            Pose (x, y, theta), em metros e radianos.
+        """
+        return self._x, self._y, self._theta
+
+    def define_lixo(self, posicao : tuple):
+        """Define a posição do lixo.
+
+        Parameters
+        ----------
+        posicao : tuple or None
+            Posição (x, y) do lixo, em metros. Se None, não há lixo.
+        """
+        self._lixo = posicao
+
+    def retorna_tempo(self):
+        """Retorna o tempo da simulação, em segundos.
+
+        Returns
+        -------
+        float
+            Tempo da simulação.
+        """
+        return self._tempo
+
+    def renderiza_mascara(self):
+        """Gera a máscara de segmentação vista pelo Wall-e na pose atual.
+
+        A máscara é sobrescrita no próximo passo.
+
+        Returns
+        -------
+        numpy.ndarray
+            Máscara (uint8), com 1 nas paredes, no formato do mapa do controlador.
+        """
+        linhas, colunas = self._formato_mapa
+        m = self._metros_por_posicao/self._resolucao
+        cos, sin = math.cos(self._theta), math.sin(self._theta)
+
+        # Posição da máscara (coluna c, linha l) para posição da planta. A frente do Wall-e é o topo da máscara,
+        # e ele está no centro da última linha. A distância à frente é (linhas - 1 - l) e a distância à
+        # esquerda é (colunas//2 - c), em posições da máscara. O OpenCV considera que o centro da posição i
+        # da planta está em i, e não em i + 0.5.
+        x0 = self._x/self._resolucao - 0.5
+        y0 = self._y/self._resolucao - 0.5
+        frente = (linhas - 1)*m
+        esquerda = (colunas//2)*m
+
+        matriz = np.array([
+                [m*sin, -m*cos, x0 + frente*cos - esquerda*sin],
+                [m*cos, m*sin, y0 - frente*sin - esquerda*cos]
+                ])
+
+        cv.warpAffine(
+                self._planta, matriz, (colunas, linhas), dst=self._mascara,
+                flags=cv.INTER_NEAREST | cv.WARP_INVERSE_MAP, borderMode=cv.BORDER_CONSTANT, borderValue=1
+                )
+
+        return self._mascara
+
+    def posicao_lixo_mascara(self):
+        """Retorna a posição do lixo na máscara.
+
+        Returns
+        -------
+        tuple or None
+            Posição (cy, cx, altura, largura) do lixo na máscara, na notação do controlador. Se não houver lixo
+            ou ele não estiver dentro da máscara, retorna None.
+        """
+        if self._lixo is None:
+            return None
+
+        linhas, colunas = self._formato_mapa
+        cos, sin = math.cos(self._theta), math.sin(self._theta)
+
+        # Distâncias à frente e à esquerda do Wall-e, em posições da máscara
+        dx = self._lixo[0] - self._x
+        dy = self._lixo[1] - self._y
+        frente = (dx*cos - dy*sin)/self._metros_por_posicao
+        esquerda = (-dx*sin - dy*cos)/self._metros_por_posicao
+
+        cy = round(linhas - 1 - frente)
+        cx = round(colunas//2 - esquerda)
+
+        if not (0 <= cy < linhas and 0 <= cx < colunas):
+            return None
+
+        return (cy, cx, self._tamanho_lixo, self._tamanho_lixo)
+
+    def colidiu(self):
+        """Retorna se o Wall-e colidiu com uma parede (ou saiu da planta).
+
+        Returns
+        -------
+        bool
+            True se colidiu.
+        """
+        coluna = int(self._x/self._resolucao)
+        linha = int(self._y/self._resolucao)
+
+        if not (0 <= linha < self._colisao.shape[0] and 0 <= coluna < self._colisao.shape[1]):
+            return True
+
+        return bool(self._colisao[linha, coluna])
+
+    def passo(self):
+        """Executa um passo da simulação.
+
+        Gera a máscara, aplica o controlador e move o Wall-e pelas velocidades retornadas. Se o controlador
+        acionar a sinalização, o Wall-e não se move.
+
+        Returns
+        -------
+        int
+            Velocidade linear retornada pelo controlador.
+
+        int
+            Velocidade angular retornada pelo controlador.
+
+        bool
+            Se o controlador acionou a sinalização.
+        """
+        mascara = self.renderiza_mascara()
+        linear, angular, sinalizacao = self._ctrl.calcula_direcao(mascara, self.posicao_lixo_mascara())
+
+        if not sinalizacao:
+            # Velocidade dos motores (-100 a 100) para velocidade das rodas (m/s)
+            pe, pd = mistura_velocidades(linear, angular)
+            ve = pe/100*self._velocidade_maxima
+            vd = pd/100*self._velocidade_maxima
+
+            v = (ve + vd)/2
+            w = (vd - ve)/self._distancia_rodas
+
+            # Integração da pose (a direção y da planta cresce para baixo)
+            theta_medio = self._theta + w*self._dt/2
+            self._x += v*math.cos(theta_medio)*self._dt
+            self._y -= v*math.sin(theta_medio)*self._dt
+            self._theta = (self._theta + w*self._dt + math.pi) % (2*math.pi) - math.pi
+
+        self._tempo += self._dt
+
+        return linear, angular, sinalizacao
+
+    def episodio(self, pose : tuple, lixo : tuple = None, n_passos : int = 600):
+        """Executa um episódio da simulação.
+
+        Parameters
+        ----------
+        pose : tuple
+            Pose inicial (x, y, theta) do Wall-e, em metros e radianos.
+
+        lixo : tuple, default None
+            Posição (x, y) do lixo, em metros. Se None, o Wall-e apenas anda pela planta.
+
+        n_passos : int, default 600
+            Número máximo de passos.
+
+        Returns
+        -------
+        dict
+            Resultado do episódio: "passos" (executados), "tempo" (s, simulado), "alcancou" (se o controlador
+            sinalizou o lixo), "colidiu", "distancia" (m, percorrida) e "distancia_lixo" (m, distância final ao
+            lixo, ou None se não houver lixo).
+        """
+        self.define_pose(pose)
+        self.define_lixo(lixo)
+
+        alcancou = False
+        colidiu = False
+        distancia = 0.0
+        passos = 0
+
+        while passos < n_passos:
+            x, y = self._x, self._y
+            linear, angular, sinalizacao = self.passo()
+            passos += 1
+            distancia += math.hypot(self._x - x, self._y - y)
+
+            if sinalizacao:
+                alcancou = True
+                break
+
+            if self.colidiu():
+                colidiu = True
+                break
+
+        distancia_lixo = None
+        if lixo is not None:
+            distancia_lixo = math.hypot(lixo[0] - self._x, lixo[1] - self._y)
+
+        return {
+                "passos": passos,
+                "tempo": passos*self._dt,
+                "alcancou": alcancou,
+                "colidiu": colidiu,
+                "distancia": distancia,
+                "distancia_lixo": distancia_lixo,
+                }
+
+
+def gera_planta(formato : tuple, resolucao : float, n_obstaculos : int, tamanho_obstaculo : float = 0.3, semente : int = None):
+    """Gera uma planta retangular com paredes nas bordas e obstáculos quadrados aleatórios.
+
+    Parameters
+    ----------
+    formato : tuple
+        Formato (linhas, colunas) da planta.
+
+    resolucao : float
+        Tamanho, em metros, de cada posição da planta.
+
+    n_obstaculos : int
+        Quantidade de obstáculos.
+
+    tamanho_obstaculo : float, default 0.3
+        Lado máximo, em metros, dos obstáculos.
+
+    semente : int, default None
+        Semente do gerador de números aleatórios.
+
+    Returns
+    -------
+    numpy.ndarray
+        Planta (uint8), com 1 nas paredes e 0 no chão livre.
+    """
+    gerador = np.random.default_rng(semente)
+    planta = np.zeros(formato, dtype=np.uint8)
+
+    # Paredes nas bordas
+    borda = max(1, round(0.05/resolucao))
+    planta[:borda, :] = 1
+    planta[-borda:, :] = 1
+    planta[:, :borda] = 1
+    planta[:, -borda:] = 1
+
+    # Obstáculos
+    lado_maximo = max(2, round(tamanho_obstaculo/resolucao))
+    for _ in range(n_obstaculos):
+        lado = gerador.integers(lado_maximo//2, lado_maximo + 1)
+        y = gerador.integers(0, formato[0] - lado)
+        x = gerador.integers(0, formato[1] - lado)
+        planta[y:y+lado, x:x+lado] = 1
+
+    return planta
@@ -0,0 +1,97 @@
+#!/bin/env python3
+
+
+"""Reproduz um vídeo gravado no modo autônomo, sem interface gráfica, e mede o desempenho.
+
+Os frames são lidos de 'ENTRADA_PATH', que pode ser um vídeo ou uma pasta de imagens JPG, e fornecidos ao
+modo autônomo com uma interface e um enviador de comandos falsos (ver o módulo :mod:`~codigo.reproducao`).
+Se 'TAXA' for None, os frames são fornecidos o mais rápido possível. Caso contrário, na taxa 'TAXA' (frames
+por segundo), simulando a câmera. Se 'CONCORRENTE' for True, é usado o modo autônomo com a segmentação e a
+identificação em paralelo (:class:`~codigo.autonomo.AutoConcorrente`).
+
+São mostrados a taxa de frames processados por segundo, o histograma da latência de cada frame e o tempo de
+cada etapa. A sequência de comandos enviados é salva em 'COMANDOS_PATH', um comando por linha.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+from interface.modulos.instrumentacao import Instrumentacao
+import segmentacao.modulos.interpretador as interpretador
+import controlador.modulos.controlador as controlador
+import autonomo
+import reproducao
+import numpy as np
+
+
+# Parâmetros do script
+MODELO_TFLITE_PATH = "../segmentacao/modelo-segmentacao.tflite"
+PATH_HAAR = "../identificacao/cascade-leite.xml"
+ENTRADA_PATH = "video-test/video.mp4"
+COMANDOS_PATH = "video-test/comandos.txt"
+
+N_FRAMES = 300
+TAXA = None
+CONCORRENTE = False
+DEBUG = False
+
+DISTANCIA_MINIMA = 20
+
+
+if __name__ == "__main__":
+    frames = reproducao.le_frames(ENTRADA_PATH, N_FRAMES)
+
+    # Carrega o segmentador de imagens (usa apenas uma thread)
+    segmentador = interpretador.Segmentador(MODELO_TFLITE_PATH, n_threads=1)
+
+    # Controlador (mesma configuração do cliente)
+    posicoes_esquerda = [
+            (-5, -15),
+            (-10, -12),
+            (-15, -10),
+            (-17, -3)
+            ]
+
+    ctrl = controlador.Controlador((60, 60), posicoes_esquerda, 4, DISTANCIA_MINIMA)
+
+    Kp, Ki, Kd = 0.6, 1, 0.003
+    ctrl.parametros_PID_linear(Kp, Ki, Kd)
+
+    Kp, Ki, Kd = 0.4, 1, 0.003
+    ctrl.parametros_PID_angular(Kp, Ki, Kd)
+
+    # Modo autônomo sem interface gráfica. A instrumentação guarda a latência de todos os frames.
+    interface = reproducao.InterfaceFalsa()
+    enviador = reproducao.EnviadorFalso()
+    instrumentacao = Instrumentacao(max(len(frames), 1))
+
+    if CONCORRENTE:
+        auto = autonomo.AutoConcorrente(interface, enviador, segmentador, ctrl, PATH_HAAR, instrumentacao)
+    else:
+        auto = autonomo.Auto(interface, enviador, segmentador, ctrl, PATH_HAAR, instrumentacao)
+
+    resultado = reproducao.reproduz(auto, enviador, frames, TAXA, DEBUG)
+
+    if CONCORRENTE:
+        auto.finaliza()
+
+    latencias = resultado["latencias"]
+
+    print(f"frames: {resultado['n_frames']} (processados: {resultado['n_processados']})")
+    print(f"duração: {resultado['duracao']:.2f} s")
+    print(f"frames por segundo: {resultado['frames_por_segundo']:.2f}")
+
+    if len(latencias) > 0:
+        print(f"latência (ms): p50 {np.percentile(latencias, 50):.2f}, p95 {np.percentile(latencias, 95):.2f}, máxima {latencias[-1]:.2f}")
+        print()
+        print(reproducao.histograma(latencias))
+
+    print()
+    print(instrumentacao.texto())
+
+    with open(COMANDOS_PATH, "w") as arquivo:
+        arquivo.write("\n".join(resultado["comandos"]) + "\n")
+
+    print()
+    print(f"comandos salvos em {COMANDOS_PATH}")
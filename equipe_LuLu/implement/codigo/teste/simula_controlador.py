@@ -0,0 +1,121 @@
+#!/bin/env python3
+
+
+"""Ajusta os ganhos dos PID do controlador por simulação.
+
+Para cada combinação de ganhos de 'GANHOS_LINEAR' e 'GANHOS_ANGULAR', executa 'N_EPISODIOS' episódios do
+simulador cinemático (:class:`~codigo.simulador.Simulador`) em plantas aleatórias, com o Wall-e e o lixo em
+posições aleatórias. Os episódios são os mesmos para todas as combinações. As combinações são distribuídas
+entre 'N_PROCESSOS' processos.
+
+Para cada combinação, é mostrada a taxa de episódios em que o lixo foi alcançado, a taxa de colisões e o tempo
+médio (simulado) até alcançar o lixo. Ao final, é mostrada a quantidade de passos simulados por segundo.
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import controlador.modulos.controlador as controlador
+from simulador import Simulador, gera_planta
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import numpy as np
+import math
+import time
+
+
+# Parâmetros do script
+GANHOS_LINEAR = [(0.6, 1, 0.003), (0.3, 0.5, 0.003), (1.0, 1, 0.003)]
+GANHOS_ANGULAR = [(0.4, 1, 0.003), (0.2, 0.5, 0.003), (0.8, 1, 0.003)]
+
+N_EPISODIOS = 20
+N_PASSOS = 600
+N_PROCESSOS = 4
+SEMENTE = 0
+
+FORMATO_PLANTA = (200, 200)
+RESOLUCAO = 0.02
+N_OBSTACULOS = 8
+
+POSICOES_ESQUERDA = [
+        (-5, -15),
+        (-10, -12),
+        (-15, -10),
+        (-17, -3)
+        ]
+DISTANCIA_MINIMA = 20
+
+
+def gera_episodios(n_episodios, semente):
+    """Gera as plantas, poses iniciais e posições do lixo dos episódios.
+
+    A pose inicial e o lixo são sorteados até estarem fora dos obstáculos.
+    """
+    gerador = np.random.default_rng(semente)
+    altura = FORMATO_PLANTA[0]*RESOLUCAO
+    largura = FORMATO_PLANTA[1]*RESOLUCAO
+    episodios = []
+
+    for i in range(n_episodios):
+        planta = gera_planta(FORMATO_PLANTA, RESOLUCAO, N_OBSTACULOS, semente=semente + i)
+        livre = Simulador(planta, RESOLUCAO, controlador.Controlador())
+
+        posicoes = []
+        while len(posicoes) < 2:
+            x, y = gerador.uniform(0.2, largura - 0.2), gerador.uniform(0.2, altura - 0.2)
+            livre.define_pose((x, y, 0.0))
+
+            if not livre.colidiu():
+                posicoes.append((x, y))
+
+        theta = gerador.uniform(-math.pi, math.pi)
+        episodios.append((planta, posicoes[0] + (theta,), posicoes[1]))
+
+    return episodios
+
+
+def avalia_ganhos(ganhos):
+    """Executa os episódios com os ganhos fornecidos. Executado em um processo de trabalho.
+    """
+    ganhos_linear, ganhos_angular = ganhos
+    resultados = []
+
+    for planta, pose, lixo in gera_episodios(N_EPISODIOS, SEMENTE):
+        # Um controlador novo para cada episódio. O traçador não tem limite de tempo, para que o resultado
+        # não dependa da carga do processador.
+        ctrl = controlador.Controlador((60, 60), POSICOES_ESQUERDA, 4, DISTANCIA_MINIMA)
+        ctrl.parametros_PID_linear(*ganhos_linear)
+        ctrl.parametros_PID_angular(*ganhos_angular)
+        ctrl.parametros_tracador(None, None)
+
+        simulador = Simulador(planta, RESOLUCAO, ctrl)
+        resultados.append(simulador.episodio(pose, lixo, N_PASSOS))
+
+    return ganhos, resultados
+
+
+if __name__ == "__main__":
+    combinacoes = list(itertools.product(GANHOS_LINEAR, GANHOS_ANGULAR))
+
+    inicio = time.perf_counter()
+    n_passos = 0
+
+    print(f"{'PID linear':<20} {'PID angular':<20} {'alcançou':>9} {'colidiu':>8} {'tempo (s)':>10}")
+
+    with ProcessPoolExecutor(N_PROCESSOS) as executor:
+        for (ganhos_linear, ganhos_angular), resultados in executor.map(avalia_ganhos, combinacoes):
+            n_passos += sum(resultado["passos"] for resultado in resultados)
+
+            alcancou = [resultado for resultado in resultados if resultado["alcancou"]]
+            colidiu = [resultado for resultado in resultados if resultado["colidiu"]]
+            tempo = np.mean([resultado["tempo"] for resultado in alcancou]) if alcancou else float("nan")
+
+            print(
+                    f"{str(ganhos_linear):<20} {str(ganhos_angular):<20} "
+                    f"{len(alcancou)/len(resultados):>9.2f} {len(colidiu)/len(resultados):>8.2f} {tempo:>10.1f}"
+                    )
+
+    duracao = time.perf_counter() - inicio
+    print()
+    print(f"{n_passos} passos em {duracao:.1f} s ({n_passos/duracao:.0f} passos por segundo)")
@@ -0,0 +1,73 @@
+#!/bin/env python3
+
+
+"""Varre os parâmetros do controlador em uma sequência gravada e mostra as melhores combinações.
+
+Os frames de 'ENTRADA_PATH' (vídeo ou pasta de imagens JPG) são segmentados e o lixo é identificado uma única
+vez. O resultado é guardado na pasta 'PASTA_CACHE' e reaproveitado nas próximas execuções, enquanto o vídeo e os
+modelos não mudarem. As combinações dos parâmetros definidos em 'GRADE' são avaliadas em 'N_PROCESSOS'
+processos, e as 'N_MELHORES' de menor custo são mostradas. O custo é a soma da taxa de frames com colisão e da
+variação média dos comandos, ponderadas por 'PESOS' (ver o módulo :mod:`~codigo.varredura`).
+
+Fonte: autoria própria.
+"""
+
+
+import test
+import segmentacao.modulos.interpretador as interpretador
+from identificacao.modulos.identificador import Identificador
+import reproducao
+import varredura
+import time
+
+
+# Parâmetros do script
+MODELO_TFLITE_PATH = "../segmentacao/modelo-segmentacao.tflite"
+PATH_HAAR = "../identificacao/cascade-leite.xml"
+ENTRADA_PATH = "video-test/video.mp4"
+PASTA_CACHE = "video-test/cache"
+
+N_FRAMES = 300
+N_PROCESSOS = 4
+N_MELHORES = 10
+TAXA_CAMERA = 30
+PESOS = (1.0, 1.0)
+
+GRADE = {
+        "expansao": [{}, {"metodo": "distancia"}],
+        "custo": [{}, {"multiplicador": 3.0}, {"metodo": "distancia"}],
+        "pid_linear": [(0.6, 1, 0.003), (0.3, 0.5, 0.003)],
+        "pid_angular": [(0.4, 1, 0.003), (0.2, 0.5, 0.003)],
+        "blocos_tamanho": [3, 4],
+        }
+
+
+if __name__ == "__main__":
+    # Segmentação e identificação (apenas se não estiverem no cache)
+    chave = varredura.chave_cache(ENTRADA_PATH, MODELO_TFLITE_PATH, PATH_HAAR)
+    chave = f"{chave}-{N_FRAMES}"
+
+    inicio = time.perf_counter()
+    frames = reproducao.le_frames(ENTRADA_PATH, N_FRAMES)
+    segmentador = interpretador.Segmentador(MODELO_TFLITE_PATH)
+    identificador = Identificador(PATH_HAAR, (128, 128))
+
+    arquivo_cache = varredura.processa_sequencia(frames, chave, segmentador, identificador, PASTA_CACHE)
+    print(f"sequência processada: {arquivo_cache} ({time.perf_counter() - inicio:.1f} s)")
+
+    # Varredura
+    configuracoes = varredura.gera_grade(**GRADE)
+
+    inicio = time.perf_counter()
+    resultados = varredura.varre(configuracoes, arquivo_cache, N_PROCESSOS, 1/TAXA_CAMERA, PESOS)
+    print(f"{len(configuracoes)} combinações avaliadas em {time.perf_counter() - inicio:.1f} s")
+    print()
+
+    for configuracao, metricas in resultados[:N_MELHORES]:
+        parametros = ", ".join(f"{nome}={configuracao[nome]}" for nome in GRADE)
+
+        print(
+                f"custo {metricas['custo']:.3f} (colisão {metricas['taxa_colisao']:.2f}, "
+                f"suavidade {metricas['suavidade']:.3f}, sinalização {metricas['taxa_sinalizacao']:.2f})"
+                )
+        print(f"    {parametros}")
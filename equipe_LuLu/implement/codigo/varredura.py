@@ -0,0 +1,326 @@
+#!/bin/env python3
+
+
+"""Varredura de parâmetros do controlador em sequências gravadas.
+
+Avalia combinações de parâmetros do :class:`~codigo.controlador.modulos.controlador.Controlador` (expansão,
+custo, ganhos dos PID, blocos de colisão, etc.) aplicando-as aos frames de uma sequência gravada, sem o Wall-e.
+
+A segmentação e a identificação do lixo de cada frame não dependem dos parâmetros do controlador, então são
+feitas uma única vez pela função :func:`processa_sequencia` e guardadas em um arquivo de cache. As combinações
+são geradas por :func:`gera_grade` e avaliadas em processos paralelos por :func:`varre`, que ordena as
+combinações pelo custo (ver :func:`avalia_configuracao`).
+
+A reprodução é em malha aberta: os comandos do controlador não alteram os frames seguintes. Para avaliar o
+comportamento em malha fechada, use o simulador (:mod:`~codigo.simulador`).
+
+>>> arquivo = processa_sequencia(frames, chave_cache(VIDEO, MODELO), segmentador, identificador, "cache")
+>>> configuracoes = gera_grade(pid_linear=[(0.6, 1, 0.003), (0.3, 0.5, 0.003)], blocos_tamanho=[3, 4])
+>>> resultados = varre(configuracoes, arquivo, n_processos=4)
+"""
+
+
+from controlador.modulos.controlador import Controlador
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import hashlib
+import numpy as np
+import cv2 as cv
+import os
+
+
+# Configuração padrão do controlador (a mesma do cliente). As combinações de gera_grade() alteram esses valores.
+CONFIGURACAO_PADRAO = {
+        "formato_mapa": (60, 60),
+        "posicoes_esquerda": ((-5, -15), (-10, -12), (-15, -10), (-17, -3)),
+        "blocos_tamanho": 4,
+        "distancia_minima": 20,
+        "expansao": {},
+        "custo": {},
+        "pid_linear": (0.6, 1, 0.003),
+        "pid_angular": (0.4, 1, 0.003),
+        "tracador": (None, None),
+        }
+
+
+def chave_cache(*paths):
+    """Retorna a chave do cache de uma sequência.
+
+    A chave depende dos caminhos, tamanhos e datas de modificação dos arquivos fornecidos (por exemplo, o vídeo,
+    o modelo de segmentação e o modelo do Haar Cascade). Se algum deles mudar, a sequência é processada de novo.
+
+    Parameters
+    ----------
+    *paths : str
+        Arquivos ou pastas usados no processamento da sequência.
+
+    Returns
+    -------
+    str
+        Chave do cache.
+    """
+    resumo = hashlib.sha1()
+
+    for path in paths:
+        info = os.stat(path)
+        resumo.update(f"{os.path.abspath(path)}:{info.st_size}:{info.st_mtime_ns};".encode())
+
+    return resumo.hexdigest()
+
+
+def processa_sequencia(frames : list, chave : str, segmentador, identificador = None, pasta_cache : str = "cache"):
+    """Segmenta e identifica o lixo em todos os frames de uma sequência, usando o cache se disponível.
+
+    O processamento é o mesmo do modo autônomo (:meth:`~codigo.autonomo.Auto.processa_imagem()`): a máscara é
+    a do segmentador redimensionada para o formato do frame, e a posição do lixo é a do identificador na notação
+    do controlador. O resultado é salvo em '<pasta_cache>/<chave>.npz'. Se o arquivo já existir, os frames não
+    são processados.
+
+    Parameters
+    ----------
+    frames : list
+        Frames da sequência, no formato BGR.
+
+    chave : str
+        Chave do cache (ver :func:`chave_cache`).
+
+    segmentador : Segmentador
+        Segmentador de imagens.
+
+    identificador : Identificador, default None
+        Identificador de lixo. Se None, nenhum lixo é identificado.
+
+    pasta_cache : str, default "cache"
+        Pasta do cache.
+
+    Returns
+    -------
+    str
+        Arquivo do cache com a sequência processada.
+    """
+    arquivo = os.path.join(pasta_cache, chave + ".npz")
+
+    if os.path.exists(arquivo):
+        return arquivo
+
+    mascaras = []
+    posicoes = np.full((len(frames), 4), -1, dtype=np.int32)
+
+    for i, BGR in enumerate(frames):
+        RGB = cv.cvtColor(BGR, cv.COLOR_BGR2RGB)
+        # Cópia da máscara, que é sobrescrita pelo segmentador na próxima segmentação
+        mascaras.append(np.array(segmentador.retorna_mascara(RGB, redimensiona=True), dtype=np.uint8))
+
+        if identificador is not None:
+            posicao = identificador.identifica_lixo_mais_proximo(BGR)
+
+            if posicao is not None:
+                x, y, l, a, cx, cy = posicao
+                posicoes[i] = (cy, cx, l, a)
+
+    os.makedirs(pasta_cache, exist_ok=True)
+
+    # Salva em um arquivo temporário e renomeia, para que um processamento interrompido não deixe um cache inválido
+    temporario = arquivo + ".tmp.npz"
+    np.savez_compressed(temporario, mascaras=np.array(mascaras), posicoes=posicoes)
+    os.replace(temporario, arquivo)
+
+    return arquivo
+
+
+def gera_grade(**valores):
+    """Gera todas as combinações dos valores fornecidos para cada parâmetro.
+
+    Os parâmetros são as chaves de :data:`CONFIGURACAO_PADRAO`. Os não fornecidos mantêm o valor padrão.
+    "expansao" e "custo" são dicionários com os argumentos de
+    :meth:`~codigo.controlador.modulos.controlador.Controlador.parametros_expansao()` e
+    :meth:`~codigo.controlador.modulos.controlador.Controlador.parametros_custo()`. "pid_linear" e
+    "pid_angular" são tuplas (Kp, Ki, Kd), ou None para desativar o PID. "tracador" é a tupla
+    (max_expansoes, tempo_maximo) de
+    :meth:`~codigo.controlador.modulos.controlador.Controlador.parametros_tracador()`.
+
+    >>> gera_grade(blocos_tamanho=[3, 4], custo=[{}, {"metodo": "distancia"}])  # 4 combinações
+
+    Parameters
+    ----------
+    **valores : list
+        Lista de valores de cada parâmetro.
+
+    Returns
+    -------
+    list
+        Lista de configurações (dicionários com todos os parâmetros).
+    """
+    for nome in valores:
+        if nome not in CONFIGURACAO_PADRAO:
+            raise ValueError(f"Parâmetro desconhecido: {nome}")
+
+    nomes = list(valores)
+    configuracoes = []
+
+    for combinacao in itertools.product(*(valores[nome] for nome in nomes)):
+        configuracao = dict(CONFIGURACAO_PADRAO)
+        configuracao.update(zip(nomes, combinacao))
+        configuracoes.append(configuracao)
+
+    return configuracoes
+
+
+def cria_controlador(configuracao : dict):
+    """Cria um controlador com a configuração fornecida.
+
+    Parameters
+    ----------
+    configuracao : dict
+        Configuração do controlador (ver :func:`gera_grade`).
+
+    Returns
+    -------
+    Controlador
+        Controlador configurado.
+    """
+    ctrl = Controlador(
+            configuracao["formato_mapa"], list(configuracao["posicoes_esquerda"]),
+            configuracao["blocos_tamanho"], configuracao["distancia_minima"]
+            )
+
+    ctrl.parametros_expansao(**configuracao["expansao"])
+    ctrl.parametros_custo(**configuracao["custo"])
+    ctrl.parametros_tracador(*configuracao["tracador"])
+
+    if configuracao["pid_linear"] is not None:
+        ctrl.parametros_PID_linear(*configuracao["pid_linear"])
+
+    if configuracao["pid_angular"] is not None:
+        ctrl.parametros_PID_angular(*configuracao["pid_angular"])
+
+    return ctrl
+
+
+def avalia_configuracao(configuracao : dict, mascaras : np.ndarray, posicoes : np.ndarray, periodo : float = 1/30, pesos : tuple = (1.0, 1.0)):
+    """Aplica uma configuração do controlador a todos os frames de uma sequência processada.
+
+    São calculadas as métricas:
+
+    - "taxa_colisao": fração dos frames com colisão em algum bloco.
+    - "suavidade": média da variação absoluta das velocidades linear e angular entre frames seguidos,
+      dividida por 100 (0 para comandos constantes).
+    - "taxa_sinalizacao": fração dos frames em que a sinalização foi acionada.
+
+    O custo é ``pesos[0]*taxa_colisao + pesos[1]*suavidade``. Quanto menor, melhor.
+
+    Os PID usam um relógio que avança *periodo* segundos por frame, como se os frames chegassem na taxa da
+    câmera.
+
+    Parameters
+    ----------
+    configuracao : dict
+        Configuração do controlador (ver :func:`gera_grade`).
+
+    mascaras : numpy.ndarray
+        Máscaras dos frames (ver :func:`processa_sequencia`).
+
+    posicoes : numpy.ndarray
+        Posições do lixo nos frames, com -1 nos frames sem lixo.
+
+    periodo : float, default 1/30
+        Tempo, em segundos, entre frames seguidos.
+
+    pesos : tuple, default (1.0, 1.0)
+        Pesos da taxa de colisão e da suavidade no custo.
+
+    Returns
+    -------
+    dict
+        Métricas e custo da configuração, e a sequência de comandos ("comandos": lista de (linear, angular,
+        sinalizacao)).
+    """
+    ctrl = cria_controlador(configuracao)
+
+    relogio = [0.0]
+    ctrl.parametros_relogio_PID(lambda: relogio[0])
+
+    comandos = []
+    n_colisoes = 0
+
+    for mascara, posicao in zip(mascaras, posicoes):
+        relogio[0] += periodo
+        posicao = tuple(int(valor) for valor in posicao) if posicao[0] >= 0 else None
+
+        ctrl.define_mapa(mascara)
+        n_colisoes += any(ctrl.mostra_colisoes(None))
+        comandos.append(ctrl.calcula_direcao(None, posicao))
+
+    velocidades = np.array([comando[:2] for comando in comandos], dtype=np.float64).reshape(-1, 2)
+    variacao = np.abs(np.diff(velocidades, axis=0)).sum(axis=1)
+
+    n_frames = max(len(comandos), 1)
+    taxa_colisao = n_colisoes/n_frames
+    suavidade = float(variacao.mean())/100 if len(variacao) > 0 else 0.0
+    taxa_sinalizacao = sum(comando[2] for comando in comandos)/n_frames
+
+    return {
+            "custo": pesos[0]*taxa_colisao + pesos[1]*suavidade,
+            "taxa_colisao": taxa_colisao,
+            "suavidade": suavidade,
+            "taxa_sinalizacao": taxa_sinalizacao,
+            "comandos": comandos,
+            }
+
+
+# Sequência carregada em cada processo de trabalho (ver _carrega_sequencia())
+_sequencia = None
+
+
+def _carrega_sequencia(arquivo_cache, periodo, pesos):
+    """Carrega a sequência processada no processo de trabalho. Executado uma vez por processo.
+    """
+    global _sequencia
+
+    dados = np.load(arquivo_cache)
+    _sequencia = (dados["mascaras"], dados["posicoes"], periodo, pesos)
+
+
+def _avalia(configuracao):
+    """Avalia uma configuração com a sequência do processo de trabalho.
+    """
+    mascaras, posicoes, periodo, pesos = _sequencia
+
+    return avalia_configuracao(configuracao, mascaras, posicoes, periodo, pesos)
+
+
+def varre(configuracoes : list, arquivo_cache : str, n_processos : int = None, periodo : float = 1/30, pesos : tuple = (1.0, 1.0)):
+    """Avalia as configurações em processos paralelos e as ordena pelo custo.
+
+    Cada processo carrega a sequência do arquivo de cache uma única vez. Apenas as configurações e as
+    métricas são trocadas entre os processos.
+
+    Parameters
+    ----------
+    configuracoes : list
+        Configurações do controlador (ver :func:`gera_grade`).
+
+    arquivo_cache : str
+        Arquivo da sequência processada (ver :func:`processa_sequencia`).
+
+    n_processos : int, default None
+        Quantidade de processos. Se None, usa a quantidade de processadores.
+
+    periodo : float, default 1/30
+        Tempo, em segundos, entre frames seguidos (ver :func:`avalia_configuracao`).
+
+    pesos : tuple, default (1.0, 1.0)
+        Pesos da taxa de colisão e da suavidade no custo.
+
+    Returns
+    -------
+    list
+        Lista de tuplas (configuracao, metricas), da configuração de menor custo para a de maior.
+    """
+    with ProcessPoolExecutor(n_processos, initializer=_carrega_sequencia, initargs=(arquivo_cache, periodo, pesos)) as executor:
+        metricas = list(executor.map(_avalia, configuracoes))
+
+    resultados = list(zip(configuracoes, metricas))
+    resultados.sort(key=lambda resultado: resultado[1]["custo"])
+
+    return resultados